@@ -0,0 +1,186 @@
+r"""Benchmark of the formatter and the line index.
+
+:author: ok97465
+:Date created: 26.10.17 19:20:13
+"""
+# %% Import
+# Standard library imports
+import gc
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+# Local imports
+from benchmarks.documents import make_document
+from json_core.file_reload import ReloadState
+from json_core.index_cache import IndexCache
+from json_core.json_diff import StructuralDiff
+from json_core.json_formatting import PrettyJsonEncoder
+from json_core.json_infos import ContainerLineInfo, ValueKind
+from json_core.json_search import SearchIndex
+
+
+def best_time(func: Callable[[], object], repeat: int) -> float:
+    """Return the best time of func in seconds."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    """Return the peak bytes allocated while func runs."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def bench_document(shape: str, n_bytes: int, repeat: int = 3) -> List[Dict]:
+    """Return the results of the document."""
+    obj = make_document(shape, n_bytes)
+    json_str = json.dumps(obj)
+    case = {"shape": shape, "size": len(json_str)}
+
+    def encode():
+        return json.dumps(obj, cls=PrettyJsonEncoder, indent=2)
+
+    def parse_json():
+        return ContainerLineInfo(json_str, {})
+
+    line_infos = parse_json()
+    lines = line_infos.json_str.splitlines()
+    n_line = len(lines)
+
+    def end_pos_stored():
+        end_pos_of_value = line_infos.end_pos_of_value
+        for line_no in range(n_line):
+            end_pos_of_value(line_no)
+
+    def end_pos_from_text():
+        end_pos_of_value = line_infos.end_pos_of_value
+        for line_no, line in enumerate(lines):
+            end_pos_of_value(line_no, line)
+
+    results = [
+        dict(
+            case,
+            name="PrettyJsonEncoder.encode",
+            seconds=best_time(encode, repeat),
+            peak_bytes=peak_memory(encode),
+        ),
+        dict(
+            case,
+            name="ContainerLineInfo.parse_json",
+            seconds=best_time(parse_json, repeat),
+            peak_bytes=peak_memory(parse_json),
+            lines=n_line,
+        ),
+    ]
+
+    line_infos_other = parse_json()
+    results.append(
+        dict(
+            case,
+            name="StructuralDiff",
+            seconds=best_time(lambda: StructuralDiff(line_infos, line_infos_other), 1),
+        )
+    )
+
+    search_index = SearchIndex(line_infos, lines.__getitem__, lines)
+    results.append(
+        dict(
+            case,
+            name="SearchIndex.build",
+            seconds=best_time(
+                lambda: SearchIndex(line_infos, lines.__getitem__, lines), 1
+            ),
+        )
+    )
+    for query in ("=0", "0..1", "~ai"):
+        results.append(
+            dict(
+                case,
+                name="SearchIndex.search({})".format(query),
+                seconds=best_time(lambda: list(search_index.search(query)), repeat),
+            )
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "document.json")
+        with open(path, "w") as fp:
+            fp.write(json_str)
+        cache = IndexCache(os.path.join(directory, "cache"))
+        cache.open(path)
+        results.append(
+            dict(
+                case,
+                name="IndexCache.load",
+                seconds=best_time(lambda: cache.load(path), repeat),
+                peak_bytes=peak_memory(lambda: cache.load(path)),
+            )
+        )
+
+    results.extend(bench_reload(case, line_infos, lines, repeat))
+
+    for name, func in (
+        ("end_pos_of_value", end_pos_stored),
+        ("end_pos_of_value(line)", end_pos_from_text),
+    ):
+        seconds = best_time(func, repeat)
+        results.append(
+            dict(case, name=name, seconds=seconds, ns_per_call=seconds / n_line * 1e9)
+        )
+    return results
+
+
+
+def changed_value_text(line_infos: ContainerLineInfo, lines: List[str]) -> str:
+    """Return the text of lines whose first number is changed, "" if none."""
+    kinds = line_infos.kinds
+    numbers = (ValueKind.NUM, ValueKind.INT)
+    line_no = next((idx for idx, kind in enumerate(kinds) if kind in numbers), -1)
+    if line_no < 0:
+        return ""
+    value = 97465 if kinds[line_no] == ValueKind.INT else 974.65
+    start, end = line_infos.starts[line_no], line_infos.ends[line_no]
+    lines_new = list(lines)
+    lines_new[line_no] = (
+        lines[line_no][:start]
+        + line_infos.text_of_value(line_no, value)
+        + lines[line_no][end:]
+    )
+    return "\n".join(lines_new)
+
+
+def bench_reload(
+    case: Dict, line_infos: ContainerLineInfo, lines: List[str], repeat: int
+) -> List[Dict]:
+    """Return the time to find the delta of the file changed on disk."""
+    text_value = changed_value_text(line_infos, lines)
+    if not text_value:
+        return []
+    text_structure = "[" + line_infos.json_str + "]"
+    state = ReloadState(line_infos, lines)
+    return [
+        dict(
+            case,
+            name="ReloadState.delta(value)",
+            seconds=best_time(lambda: state.delta(text_value), repeat),
+        ),
+        dict(
+            case,
+            name="ReloadState.delta(structure)",
+            seconds=best_time(lambda: state.delta(text_structure), 1),
+        ),
+    ]
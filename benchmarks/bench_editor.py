@@ -0,0 +1,264 @@
+r"""Latency of JsonValueEditor events on the offscreen platform of Qt.
+
+Keystrokes and mouse clicks on random values are replayed into the editor, and
+the time of each event including the events processed after it is recorded.
+
+:author: ok97465
+:Date created: 26.10.17 19:41:57
+"""
+# %% Import
+# Standard library imports
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+# Local imports
+from benchmarks.documents import make_document
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Return percentiles of latency in milliseconds."""
+    samples = sorted(samples)
+    if len(samples) < 2:
+        samples = samples * 2
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "count": len(samples),
+        "p50_ms": quantiles[49] * 1e3,
+        "p90_ms": quantiles[89] * 1e3,
+        "p99_ms": quantiles[98] * 1e3,
+        "max_ms": samples[-1] * 1e3,
+    }
+
+
+def bench_editor(shape: str, n_bytes: int, n_event: int = 300) -> List[Dict]:
+    """Return the latency of events of the editor for the document."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import QEvent, QPoint, Qt
+    from PyQt5.QtGui import QKeyEvent, QMouseEvent
+    from PyQt5.QtWidgets import QApplication
+
+    from json_core.document_cache import DocumentCache
+    from json_core.json_formatting import ValueKind
+    from ui import JsonValueEditor
+
+    app = QApplication.instance() or QApplication([])
+    json_str = json.dumps(make_document(shape, n_bytes))
+
+    cache = DocumentCache()
+    start = time.perf_counter()
+    editor = JsonValueEditor(json_str, cache=cache)
+    editor.resize(800, 600)
+    editor.show()
+    app.processEvents()
+    seconds_open = time.perf_counter() - start
+
+    rng = random.Random(97465)
+    line_infos = editor.line_infos
+    value_lines = [
+        line_no
+        for line_no in range(len(line_infos))
+        if line_infos.kinds[line_no] != ValueKind.NONE
+    ]
+    keys = [
+        (Qt.Key_1, "1"),
+        (Qt.Key_5, "5"),
+        (Qt.Key_Backspace, "\x08"),
+        (Qt.Key_Delete, "\x7f"),
+        (Qt.Key_Left, ""),
+        (Qt.Key_Right, ""),
+        (Qt.Key_Down, ""),
+    ]
+    latency: Dict[str, List[float]] = {"key": [], "click": []}
+
+    for idx in range(n_event):
+        if idx % 10 == 0:  # Click random value.
+            line_no = rng.choice(value_lines)
+            start_col, end_col = editor.pos_of_value(line_no)
+            editor.ensureLineVisible(line_no)
+            app.processEvents()
+            pos = editor.positionFromLineIndex(line_no, rng.randint(start_col, end_col))
+            point = QPoint(
+                editor.SendScintilla(editor.SCI_POINTXFROMPOSITION, 0, pos),
+                editor.SendScintilla(editor.SCI_POINTYFROMPOSITION, 0, pos) + 2,
+            )
+            start = time.perf_counter()
+            for event_type, handler in (
+                (QEvent.MouseButtonPress, editor.mousePressEvent),
+                (QEvent.MouseButtonRelease, editor.mouseReleaseEvent),
+            ):
+                handler(
+                    QMouseEvent(event_type, point, Qt.LeftButton, Qt.LeftButton,
+                                Qt.NoModifier)
+                )
+            app.processEvents()
+            latency["click"].append(time.perf_counter() - start)
+            editor.selection_widget.hide()
+        else:
+            key, text = rng.choice(keys)
+            start = time.perf_counter()
+            editor.keyPressEvent(QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, text))
+            app.processEvents()
+            latency["key"].append(time.perf_counter() - start)
+
+    editor.close()
+    editor.deleteLater()
+    app.processEvents()
+
+    start = time.perf_counter()  # Attach to the document cached by the first.
+    editor = JsonValueEditor(json_str, cache=cache)
+    seconds_open_cached = time.perf_counter() - start
+    editor.deleteLater()
+    app.processEvents()
+
+    case = {"shape": shape, "size": len(json_str)}
+    results = [
+        dict(case, name="JsonValueEditor.open", seconds=seconds_open),
+        dict(case, name="JsonValueEditor.open_cached", seconds=seconds_open_cached),
+    ]
+    for event, samples in latency.items():
+        results.append(dict(case, name="event." + event, **percentiles(samples)))
+    return results
+
+
+def bench_lexer(shape: str, n_bytes: int, n_scroll: int = 50) -> List[Dict]:
+    """Return first paint and scroll latency of LineIndexLexer and QsciLexerJSON."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    from json_lexer import stock_lexer
+    from ui import JsonValueEditor
+
+    class StockLexerEditor(JsonValueEditor):
+        """Editor of QsciLexerJSON."""
+
+        def create_lexer(self):
+            """."""
+            return stock_lexer(self)
+
+    app = QApplication.instance() or QApplication([])
+    json_str = json.dumps(make_document(shape, n_bytes))
+    case = {"shape": shape, "size": len(json_str)}
+    results = []
+    for name, editor_class in (
+        ("LineIndexLexer", JsonValueEditor),
+        ("QsciLexerJSON", StockLexerEditor),
+    ):
+        editor = editor_class(json_str)
+        editor.resize(800, 600)
+        start = time.perf_counter()
+        editor.show()
+        app.processEvents()  # Layout and paint of the first screen.
+        seconds_first_paint = time.perf_counter() - start
+
+        rng = random.Random(97465)
+        scroll_bar = editor.verticalScrollBar()
+        samples = []
+        for _ in range(n_scroll):
+            line_no = rng.randrange(editor.lines())
+            start = time.perf_counter()
+            scroll_bar.setValue(line_no)
+            editor.viewport().repaint()
+            app.processEvents()
+            samples.append(time.perf_counter() - start)
+
+        results.append(
+            dict(case, name=name + ".first_paint", seconds=seconds_first_paint)
+        )
+        results.append(dict(case, name=name + ".scroll", **percentiles(samples)))
+        editor.close()
+        editor.deleteLater()
+        app.processEvents()
+    return results
+
+
+def bench_startup(n_editors: int = 32, n_bytes: int = 4 << 10) -> List[Dict]:
+    """Return the time to n_editors ready editors in a grid, new and reused.
+
+    Editors are ready when they are loaded and painted.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication, QGridLayout, QWidget
+
+    from ui import EditorPool
+
+    app = QApplication.instance() or QApplication([])
+    json_str = json.dumps(make_document("wide", n_bytes))
+    case = {"shape": "wide", "size": len(json_str), "editors": n_editors}
+    n_col = 8
+    pool = EditorPool(max_size=n_editors)
+    results = []
+    for name in ("startup.new", "startup.pooled"):
+        window = QWidget()
+        layout = QGridLayout(window)
+        window.resize(1600, 900)
+        start = time.perf_counter()
+        editors = []
+        for idx in range(n_editors):
+            editor = pool.acquire(json_str, window)
+            layout.addWidget(editor, idx // n_col, idx % n_col)
+            editors.append(editor)
+        window.show()
+        app.processEvents()
+        seconds = time.perf_counter() - start
+        results.append(dict(case, name=name, seconds=seconds))
+        for editor in editors:
+            pool.release(editor)
+        window.close()
+        window.deleteLater()
+        app.processEvents()
+    pool.clear()
+    app.processEvents()
+    return results
+
+
+def bench_file_reload(shape: str, n_bytes: int, repeat: int = 5) -> List[Dict]:
+    """Return the time to write one value changed on disk into the editor."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    from benchmarks.bench_core import changed_value_text
+    from json_core.file_reload import FileWatcher
+    from ui import JsonValueEditor
+
+    app = QApplication.instance() or QApplication([])
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "document.json")
+        with open(path, "w") as fp:
+            json.dump(make_document(shape, n_bytes), fp)
+        editor = JsonValueEditor.from_file(path)
+        case = {"shape": shape, "size": os.path.getsize(path)}
+        lines = editor.line_infos.json_str.split("\n")
+        texts = [
+            editor.line_infos.json_str,
+            changed_value_text(editor.line_infos, lines),
+        ]
+        if not texts[1]:  # No number to change.
+            editor.deleteLater()
+            app.processEvents()
+            return []
+        watcher = FileWatcher(3600, use_inotify=False)  # Checked by this function.
+        reloader = editor.watch_file(path, watcher)
+        samples_delta, samples_apply = [], []
+        for idx in range(repeat * 2):
+            with open(path, "w") as fp:
+                fp.write(texts[(idx + 1) % 2])
+            start = time.perf_counter()
+            delta = reloader.state.delta(texts[(idx + 1) % 2])
+            samples_delta.append(time.perf_counter() - start)
+            if delta is None:
+                continue
+            start = time.perf_counter()
+            reloader.apply((reloader.state, delta))
+            samples_apply.append(time.perf_counter() - start)
+        watcher.stop()
+        editor.unwatch_file()
+        app.processEvents()
+    results.append(dict(case, name="FileReloader.delta", **percentiles(samples_delta)))
+    results.append(dict(case, name="FileReloader.apply", **percentiles(samples_apply)))
+    return results
@@ -0,0 +1,105 @@
+r"""Cold import time of the headless core against its budget.
+
+Each statement is run in a new interpreter, so nothing is imported before it,
+and the best time of repeat runs is compared with its budget. Importing a Qt or
+NumPy module is a failure regardless of time.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat 10]  # Exit 1 if over budget.
+
+:author: ok97465
+:Date created: 26.10.19 15:40:27
+"""
+# %% Import
+# Standard library imports
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules which the core must not import.
+FORBIDDEN = ("PyQt5", "qdarkstyle", "numpy")
+
+# name: (statement, budget in seconds)
+STATEMENTS = {
+    "import json_core": ("import json_core", 0.010),
+    "import PrettyJsonWriter": (
+        "from json_core import PrettyJsonWriter\nPrettyJsonWriter().encode([1])",
+        0.050,
+    ),
+    "import ContainerLineInfo": (
+        "from json_core import ContainerLineInfo\n"
+        "ContainerLineInfo('{\"a\": [1, 2], \"b\": \"c\"}', {})",
+        0.060,
+    ),
+}
+
+_CHILD = """
+import time
+start = time.perf_counter()
+{}
+seconds = time.perf_counter() - start
+import json, sys
+print(json.dumps([seconds, [m for m in sys.modules if m.split(".")[0] in {!r}]]))
+"""
+
+
+def time_statement(statement: str) -> Dict:
+    """Return the time of statement in a new interpreter and the modules denied."""
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(statement, FORBIDDEN)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    seconds, forbidden = json.loads(output.splitlines()[-1])
+    return {"seconds": seconds, "forbidden": forbidden}
+
+
+def bench_import(repeat: int = 10) -> List[Dict]:
+    """Return the best cold import time of the statements."""
+    results = []
+    for name, (statement, budget) in STATEMENTS.items():
+        runs = [time_statement(statement) for _ in range(repeat)]
+        results.append(
+            {
+                "name": name,
+                "shape": "import",
+                "size": 0,
+                "seconds": min(run["seconds"] for run in runs),
+                "budget": budget,
+                "forbidden": sorted({m for run in runs for m in run["forbidden"]}),
+            }
+        )
+    return results
+
+
+def main():
+    """Run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    n_failure = 0
+    for result in bench_import(args.repeat):
+        flag = ""
+        if result["forbidden"]:
+            flag = "  IMPORTS " + ", ".join(result["forbidden"])
+        elif result["seconds"] > result["budget"]:
+            flag = "  OVER BUDGET"
+        n_failure += bool(flag)
+        print(
+            "{:<26} {:8.2f} ms  budget {:6.1f} ms{}".format(
+                result["name"], result["seconds"] * 1e3, result["budget"] * 1e3, flag
+            )
+        )
+    sys.exit(1 if n_failure else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+r"""Compare the memory of the line index with the LineInfo object per line.
+
+Usage:
+    python -m benchmarks.bench_line_index_memory [--lines 2000000]
+
+:author: ok97465
+:Date created: 26.10.17 14:31:08
+"""
+# %% Import
+# Standard library imports
+import argparse
+import sys
+import tracemalloc
+
+# Local imports
+from json_core.json_formatting import PrettyJsonWriter
+from json_core.json_infos import ContainerLineInfo
+from json_core.value_kinds import KINDS
+
+
+class LegacyLineInfo:
+    """One object per line representation which was replaced by columns."""
+
+    def __init__(self, pos_start_of_value, val_type, val_list=None):
+        """."""
+        self.pos_start = pos_start_of_value
+        self.val_type = val_type
+        self.val_list = val_list
+        self.end_char = KINDS[val_type].end_char
+        self.chars_allowed = KINDS[val_type].chars.chars if val_list is None else ""
+
+
+def make_document(n_lines: int) -> dict:
+    """Make a document with about n_lines lines."""
+    return {
+        "group{}".format(i): {
+            "gain": i * 0.5,
+            "name": "sensor{}".format(i),
+            "coef": [1, 2, 3],
+        }
+        for i in range(n_lines // 5)
+    }
+
+
+def measure(build) -> int:
+    """Return the bytes retained by the object which build returns."""
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if isinstance(obj, ContainerLineInfo):
+        size -= sys.getsizeof(obj.json_str)  # Only the index is compared.
+    del obj
+    return size
+
+
+def main():
+    """Run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    doc = make_document(args.lines)
+    lines_with_index = list(PrettyJsonWriter().iterlines_with_index(doc))
+    n_line = len(lines_with_index)
+
+    def build_legacy():
+        return [
+            LegacyLineInfo(meta.pos_start, meta.val_type)
+            for _, meta in lines_with_index
+        ]
+
+    def build_columns():
+        container = ContainerLineInfo.__new__(ContainerLineInfo)
+        container.key_val_list = {}
+        container.build(lines_with_index)
+        return container
+
+    size_legacy = measure(build_legacy)
+    size_columns = measure(build_columns)
+    print("lines           : {:,}".format(n_line))
+    print("LineInfo objects: {:10.1f} MB".format(size_legacy / 2 ** 20))
+    print("Columns         : {:10.1f} MB".format(size_columns / 2 ** 20))
+    print("Ratio           : {:10.1f} x".format(size_legacy / size_columns))
+
+
+if __name__ == "__main__":
+    main()
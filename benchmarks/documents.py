@@ -0,0 +1,79 @@
+r"""Synthetic json documents for benchmarks.
+
+:author: ok97465
+:Date created: 26.10.17 19:02:44
+"""
+# %% Import
+# Standard library imports
+import json
+import random
+import re
+from typing import Callable, Dict
+
+SHAPES = ("deep", "wide", "numeric", "strings")
+_UNITS = {"B": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+
+
+def parse_size(size: str) -> int:
+    """Return bytes of size such as "1KB", "200MB"."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B)\s*", size.upper())
+    if match is None:
+        raise ValueError("invalid size: {!r}".format(size))
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def _deep(rng: random.Random, idx: int, depth: int = 24) -> dict:
+    """Chain of objects."""
+    node = {"gain": rng.random(), "name": "leaf{}".format(idx), "ids": [idx, depth]}
+    for level in range(depth):
+        node = {"level{}".format(level): node, "flag": level % 2 == 0}
+    return node
+
+
+def _wide(rng: random.Random, idx: int) -> dict:
+    """Many keys in one object."""
+    return {
+        "key{:07d}_{}".format(idx, col): rng.randint(-10 ** 6, 10 ** 6)
+        for col in range(100)
+    }
+
+
+def _numeric(rng: random.Random, idx: int) -> dict:
+    """Long numeric list."""
+    return {"table{}".format(idx): [rng.uniform(-1e3, 1e3) for _ in range(2000)]}
+
+
+def _strings(rng: random.Random, idx: int) -> dict:
+    """Many strings."""
+    words = ("alpha", "beta", "gamma", "delta", "station", "part", "sensor")
+    return {
+        "item{}".format(idx): {
+            "label": " ".join(rng.choice(words) for _ in range(4)),
+            "tags": ["tag{}".format(rng.randrange(1000)) for _ in range(8)],
+            "comment": "text {}".format(idx),
+        }
+    }
+
+
+_MAKERS: Dict[str, Callable[[random.Random, int], dict]] = {
+    "deep": _deep,
+    "wide": _wide,
+    "numeric": _numeric,
+    "strings": _strings,
+}
+
+
+def make_document(shape: str, n_bytes: int, seed: int = 97465) -> dict:
+    """Return a document of the shape whose compact json is about n_bytes."""
+    rng = random.Random(seed)
+    make = _MAKERS[shape]
+    doc: dict = {}
+    size_unit = len(json.dumps(make(random.Random(seed), 0)))
+    n_unit = max(1, n_bytes // size_unit)
+    for idx in range(n_unit):
+        unit = make(rng, idx)
+        if shape == "deep":
+            doc["branch{}".format(idx)] = unit
+        else:
+            doc.update(unit)
+    return doc
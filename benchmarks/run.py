@@ -0,0 +1,134 @@
+r"""Run benchmarks and save the results as json.
+
+Usage:
+    python -m benchmarks.run --sizes 1KB,1MB,10MB --output bench_results.json
+    python -m benchmarks.run --sizes 200MB --shapes numeric --no-editor
+    python -m benchmarks.run --compare base.json bench_results.json
+
+The cold import of the headless core is also measured, see bench_import.
+
+:author: ok97465
+:Date created: 26.10.17 20:03:30
+"""
+# %% Import
+# Standard library imports
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# Local imports
+from benchmarks.documents import SHAPES, parse_size
+
+# Metrics compared between results. Smaller is better.
+METRICS = ("seconds", "peak_bytes", "ns_per_call", "p50_ms", "p99_ms")
+
+
+def git_revision() -> str:
+    """Return the git revision of the tree."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(sizes: List[str], shapes: List[str], editor: bool, repeat: int) -> Dict:
+    """Run benchmarks and return the results."""
+    from benchmarks.bench_core import bench_document
+    from benchmarks.bench_import import bench_import
+
+    results = bench_import()
+    for size in sizes:
+        n_bytes = parse_size(size)
+        for shape in shapes:
+            print("{:>8} {:<8}".format(size, shape), file=sys.stderr, flush=True)
+            results.extend(bench_document(shape, n_bytes, repeat))
+            if editor:
+                from benchmarks.bench_editor import (
+                    bench_editor,
+                    bench_file_reload,
+                    bench_lexer,
+                )
+
+                results.extend(bench_editor(shape, n_bytes))
+                results.extend(bench_lexer(shape, n_bytes))
+                results.extend(bench_file_reload(shape, n_bytes))
+    if editor:
+        from benchmarks.bench_editor import bench_startup
+
+        results.extend(bench_startup())
+    return {
+        "revision": git_revision(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def _key(result: Dict) -> Tuple:
+    """Return the key of result to join results of two runs."""
+    return result["name"], result["shape"], result["size"]
+
+
+def compare(path_base: str, path_new: str, threshold: float) -> int:
+    """Print ratios of metrics, and return the number of regressions."""
+    with open(path_base) as fp:
+        base = {_key(result): result for result in json.load(fp)["results"]}
+    with open(path_new) as fp:
+        new = json.load(fp)["results"]
+
+    n_regression = 0
+    for result in new:
+        result_base = base.get(_key(result), None)
+        if result_base is None:
+            continue
+        for metric in METRICS:
+            if metric not in result or not result_base.get(metric):
+                continue
+            ratio = result[metric] / result_base[metric]
+            flag = ""
+            if ratio > 1 + threshold:
+                flag = "  REGRESSION"
+                n_regression += 1
+            print(
+                "{:<30} {:<8} {:>11,} {:<12} {:6.2f}x{}".format(
+                    result["name"], result["shape"], result["size"], metric, ratio, flag
+                )
+            )
+    return n_regression
+
+
+def main():
+    """Run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1KB,100KB,1MB,10MB")
+    parser.add_argument("--shapes", default=",".join(SHAPES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-editor", action="store_true", help="Skip Qt editor.")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    report = run(
+        args.sizes.split(","), args.shapes.split(","), not args.no_editor, args.repeat
+    )
+    with open(args.output, "w") as fp:
+        json.dump(report, fp, indent=2)
+    print("Saved to {}".format(args.output), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
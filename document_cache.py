@@ -0,0 +1,13 @@
+r"""Old path of json_core.document_cache, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:08:58
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import document_cache
+
+sys.modules[__name__] = document_cache
@@ -0,0 +1,13 @@
+r"""Old path of json_core.file_reload, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:08:15
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import file_reload
+
+sys.modules[__name__] = file_reload
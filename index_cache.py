@@ -0,0 +1,16 @@
+r"""Old path of json_core.index_cache, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:08:41
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import index_cache
+
+if __name__ == "__main__":  # Command line of the old path.
+    sys.exit(index_cache.main())
+
+sys.modules[__name__] = index_cache
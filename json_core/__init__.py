@@ -0,0 +1,79 @@
+r"""Formatter, line index and the services built on them, without Qt.
+
+The modules of the package import nothing out of it, so the directory is used
+without the editor(ui.py and json_lexer.py), which imports the package. The names
+of __all__ are the stable API for the services and batch jobs which do not show
+the editor, and they are kept compatible. The modules of the same names next to
+ui.py are the old paths of the submodules. Nothing here imports PyQt5,
+QScintilla or qdarkstyle, and NumPy is imported by numeric_arrays at its first use.
+
+A name is imported from its submodule at the first access, so importing json_core
+costs nothing and a worker process pays only for what it uses:
+
+    from json_core import ContainerLineInfo, PrettyJsonWriter
+
+The objects of the API can be pickled, so they are sent to and returned from the
+processes of ProcessPoolExecutor. process_files formats and checks files in
+processes.
+
+:author: ok97465
+:Date created: 26.10.19 15:12:36
+"""
+# %% Import
+# Standard library imports
+from importlib import import_module
+
+# typing is not imported, which costs more than the rest of the package.
+
+# Name: submodule defining it.
+_MODULES = {
+    # Formatter
+    "PrettyJsonWriter": "json_formatting",
+    "LineMeta": "json_formatting",
+    "FileResult": "json_formatting",
+    "canonical_text": "json_formatting",
+    "process_file": "json_formatting",
+    "process_files": "json_formatting",
+    "iter_json_files": "json_formatting",
+    # Kinds of values
+    "KINDS": "value_kinds",
+    "INT_SPEC": "value_kinds",
+    "ValueKind": "value_kinds",
+    "ValueKindSpec": "value_kinds",
+    "ValueData": "value_kinds",
+    # Line index
+    "ContainerLineInfo": "json_infos",
+    "JsonPath": "json_infos",
+    "LoadCancelled": "json_infos",
+    "ValueListIndex": "json_infos",
+    "json_pointer": "json_infos",
+    "set_by_path": "json_infos",
+    "PathPatternIndex": "json_patterns",
+    "parse_pattern": "json_patterns",
+    # Services on the line index
+    "DocumentCache": "document_cache",
+    "IndexCache": "index_cache",
+    "LazyDocument": "lazy_document",
+    "SearchIndex": "json_search",
+    "StructuralDiff": "json_diff",
+    "SchemaValidation": "json_schema",
+    "compile_schema": "json_schema",
+    "ReloadState": "file_reload",
+}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name: str) -> object:
+    """Import the name of API from its submodule at the first access."""
+    module = _MODULES.get(name, None)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(import_module("." + module, __name__), name)
+    globals()[name] = value  # Next access does not call __getattr__.
+    return value
+
+
+def __dir__() -> list:
+    """."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,151 @@
+r"""Session cache of parsed documents.
+
+Formatted text, line index and value lists of path patterns are kept for the
+recently used documents, keyed by the hash of json string and the value lists.
+Editors attach to the copy of cached ContainerLineInfo, which shares the text and
+the columns of structure, so opening the same document again skips parsing and
+formatting.
+
+:author: ok97465
+:Date created: 26.10.18 14:02:19
+"""
+# %% Import
+# Standard library imports
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo, ProgressCallback, ValueData
+from json_core.json_patterns import PathPatternIndex
+
+KeyValList = Union[Dict[str, List[ValueData]], PathPatternIndex]
+DEFAULT_MAX_BYTES = 256 << 20
+
+
+def content_hash(json_str: str) -> bytes:
+    """Return the digest of json string."""
+    return hashlib.blake2b(json_str.encode("utf-8"), digest_size=16).digest()
+
+
+class DocumentCache:
+    """LRU cache of ContainerLineInfo within the memory budget of max_bytes.
+
+    Documents are built once even if they are requested from several threads at
+    the same time. Documents larger than max_bytes are built but not kept.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """."""
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.n_hit = self.n_miss = 0
+        self.entries: "OrderedDict[Tuple, Tuple[ContainerLineInfo, int]]" = (
+            OrderedDict()
+        )  # key: (line_infos, nbytes), the most recently used last.
+        # Indexes are dropped when no cached entry or editor refers to them.
+        self._patterns: "weakref.WeakValueDictionary[Hashable, PathPatternIndex]" = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.Lock()
+        self._building: Dict[Tuple, threading.Lock] = {}
+
+    def __len__(self) -> int:
+        """Return the number of documents cached."""
+        return len(self.entries)
+
+    def patterns(self, key_val_list: KeyValList) -> PathPatternIndex:
+        """Return the compiled value lists. Equal dicts share one index."""
+        if isinstance(key_val_list, PathPatternIndex):
+            return key_val_list
+        frozen = tuple((key, tuple(val)) for key, val in key_val_list.items())
+        with self._lock:
+            patterns = self._patterns.get(frozen, None)
+            if patterns is None:
+                patterns = self._patterns[frozen] = PathPatternIndex(key_val_list)
+        return patterns
+
+    def _key(self, json_str: str, patterns: PathPatternIndex) -> Tuple:
+        """Return key of cache.
+
+        The entry refers to patterns, so the id is not reused while it is cached.
+        """
+        return content_hash(json_str), id(patterns)
+
+    def _lookup(self, key: Tuple) -> Optional[ContainerLineInfo]:
+        """Return the cached line info and mark it as recently used."""
+        with self._lock:
+            entry = self.entries.get(key, None)
+            if entry is None:
+                return None
+            self.n_hit += 1
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def _store(self, key: Tuple, line_infos: ContainerLineInfo):
+        """Keep line info, and evict the least recently used beyond the budget."""
+        nbytes = line_infos.nbytes()
+        with self._lock:
+            self.n_miss += 1
+            if nbytes > self.max_bytes:
+                return
+            self.entries[key] = (line_infos, nbytes)
+            self.n_bytes += nbytes
+            while self.n_bytes > self.max_bytes:
+                _, (_, nbytes_old) = self.entries.popitem(last=False)
+                self.n_bytes -= nbytes_old
+
+    def find(
+        self, json_str: str, key_val_list: KeyValList = {}
+    ) -> Optional[ContainerLineInfo]:
+        """Return the copy of cached line info, None if it is not cached."""
+        key = self._key(json_str, self.patterns(key_val_list))
+        line_infos = self._lookup(key)
+        return None if line_infos is None else line_infos.copy()
+
+    def get(
+        self,
+        json_str: str,
+        key_val_list: KeyValList = {},
+        progress: Optional[ProgressCallback] = None,
+    ) -> ContainerLineInfo:
+        """Return the copy of line info, which is built and cached if not found.
+
+        The errors of parsing(and LoadCancelled of progress) are raised, and the
+        other threads requesting the same document build it again.
+        """
+        patterns = self.patterns(key_val_list)
+        key = self._key(json_str, patterns)
+        line_infos = self._lookup(key)
+        if line_infos is not None:
+            return line_infos.copy()
+
+        with self._lock:
+            building = self._building.setdefault(key, threading.Lock())
+        with building:  # Requests of the same document wait for the first.
+            line_infos = self._lookup(key)
+            if line_infos is None:
+                try:
+                    line_infos = ContainerLineInfo(json_str, patterns, progress)
+                    self._store(key, line_infos)
+                finally:
+                    with self._lock:
+                        if self._building.get(key, None) is building:
+                            del self._building[key]
+        return line_infos.copy()
+
+    def discard(self, json_str: str, key_val_list: KeyValList = {}):
+        """Remove the document from the cache."""
+        key = self._key(json_str, self.patterns(key_val_list))
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.n_bytes -= entry[1]
+
+    def clear(self):
+        """Remove all documents."""
+        with self._lock:
+            self.entries.clear()
+            self.n_bytes = 0
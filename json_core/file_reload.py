@@ -0,0 +1,436 @@
+r"""Reload of json files changed on disk into the document being edited.
+
+FileWatcher watches files on its own thread by inotify(Linux) or by polling the
+stat of files, and calls back on that thread when a file is changed. ReloadState
+keeps the lines of the file which the document is based on, and compares the
+text on disk with them in the callback:
+
+* The file written in the format of editor has the same lines, and only the
+  lines which differ are checked. If they differ only in the values, the changes
+  of values are the delta, without parsing the whole file.
+* Otherwise the file is parsed. The changes of values are the delta if the keys
+  are on the same lines, else the new line index replaces the document.
+
+The delta is merged into the document with the lines edited locally: the edits
+are kept, and the values changed both on disk and locally are the conflicts.
+
+:author: ok97465
+:Date created: 26.10.19 09:12:27
+"""
+# %% Import
+# Standard library imports
+import json
+import os
+import select
+import struct
+import sys
+import threading
+from itertools import compress
+from operator import ne
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Local imports
+from json_core.json_diff import same_value
+from json_core.json_infos import ContainerLineInfo, JsonPath, ValueKind
+from json_core.value_kinds import KINDS
+
+GetLine = Callable[[int], str]
+Signature = Tuple[int, int, int]  # inode, size, mtime_ns
+
+IN_CLOSE_WRITE = 0x08
+IN_MOVED_TO = 0x80
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, length of name
+
+
+def signature(path: str) -> Optional[Signature]:
+    """Return the stat of file compared for changes, None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def _libc_inotify():
+    """Return libc which has inotify, None if it is not available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Thread calling back when the watched files are changed.
+
+    Directories of files are watched by inotify, so the files replaced by rename
+    are found. If inotify is not available or use_inotify is False, the stat of
+    files is polled every interval seconds. Callbacks are called on the thread of
+    watcher with the path, and only when the stat of file is changed.
+    """
+
+    _shared: Optional["FileWatcher"] = None
+
+    @classmethod
+    def shared(cls) -> "FileWatcher":
+        """Return the watcher shared by editors."""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def __init__(self, interval: float = 0.5, use_inotify: bool = True):
+        """."""
+        self.interval = interval
+        self.callbacks: Dict[str, List[Callable[[str], None]]] = {}
+        self.signatures: Dict[str, Optional[Signature]] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._libc = _libc_inotify() if use_inotify else None
+        self._fd = -1
+        self._watches: Dict[str, int] = {}  # directory: watch descriptor
+        self._wake_r, self._wake_w = -1, -1
+        if self._libc is not None:
+            self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self._fd < 0:
+                self._libc = None
+            else:
+                self._wake_r, self._wake_w = os.pipe()
+
+    def uses_inotify(self) -> bool:
+        """Return True if files are watched by inotify, False if polled."""
+        return self._libc is not None
+
+    def watch(self, path: str, callback: Callable[[str], None]):
+        """Call callback(path) when the file of path is changed."""
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self.callbacks:
+                self.callbacks[path] = []
+                self.signatures[path] = signature(path)
+                self._add_directory(os.path.dirname(path))
+            self.callbacks[path].append(callback)
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self.run, name="json_file_watcher", daemon=True
+            )
+            self._thread.start()
+
+    def unwatch(self, path: str, callback: Callable[[str], None]):
+        """Stop calling callback for the file of path."""
+        path = os.path.abspath(path)
+        with self._lock:
+            callbacks = self.callbacks.get(path, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks and path in self.callbacks:
+                del self.callbacks[path], self.signatures[path]
+                directory = os.path.dirname(path)
+                if all(os.path.dirname(other) != directory for other in self.callbacks):
+                    self._remove_directory(directory)
+
+    def _add_directory(self, directory: str):
+        """Watch directory by inotify."""
+        if self._libc is None or directory in self._watches:
+            return
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO
+        )
+        if wd >= 0:
+            self._watches[directory] = wd
+
+    def _remove_directory(self, directory: str):
+        """Stop watching directory which has no file watched."""
+        wd = self._watches.pop(directory, None)
+        if wd is not None:
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def stop(self):
+        """Stop the thread. The watcher can not be started again.
+
+        The next call of shared returns a new watcher if this one is shared.
+        """
+        if type(self)._shared is self:
+            type(self)._shared = None
+        self._stopped.set()
+        if self._wake_w >= 0:
+            os.write(self._wake_w, b"\0")
+        if self._thread is not None:
+            self._thread.join()
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            if fd >= 0:
+                os.close(fd)
+        self._fd = self._wake_r = self._wake_w = -1
+        self._watches.clear()
+
+    def run(self):
+        """Wait for the events of inotify or the interval, and check the files."""
+        while not self._stopped.is_set():
+            if self._libc is None:
+                self._stopped.wait(self.interval)
+                paths = None  # All
+            else:
+                readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+                if self._stopped.is_set():
+                    return
+                paths = self._read_events() if self._fd in readable else []
+            self.check(paths)
+
+    def _read_events(self) -> List[str]:
+        """Return the paths of the events of inotify."""
+        with self._lock:
+            directories = {wd: directory for directory, wd in self._watches.items()}
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        paths = []
+        pos = 0
+        while pos < len(data):
+            wd, _, _, n_name = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            name = data[pos : pos + n_name].rstrip(b"\0")
+            pos += n_name
+            if wd in directories:
+                paths.append(os.path.join(directories[wd], os.fsdecode(name)))
+        return paths
+
+    def check(self, paths: Optional[Iterable[str]] = None):
+        """Call back for the files whose stat is changed(all files if None)."""
+        with self._lock:
+            if paths is None:
+                paths = list(self.callbacks)
+            changed = []
+            for path in set(paths):
+                if path not in self.signatures:
+                    continue
+                sig = signature(path)
+                if sig is not None and sig != self.signatures[path]:
+                    self.signatures[path] = sig
+                    changed.append((path, list(self.callbacks[path])))
+        for path, callbacks in changed:
+            for callback in callbacks:
+                callback(path)
+
+
+class ValueChange(NamedTuple):
+    """New line of file whose value is changed, and the span of value in it."""
+
+    line_no: int
+    line: str
+    start: int
+    end: int
+
+
+class Delta(NamedTuple):
+    """Changes of file against version of ReloadState.
+
+    line_infos and lines are the new document if the structure is changed,
+    otherwise changes has the lines whose values are changed.
+    """
+
+    version: int
+    changes: List[ValueChange]
+    line_infos: Optional[ContainerLineInfo] = None
+    lines: Optional[List[str]] = None
+
+
+class Conflict(NamedTuple):
+    """Value changed both on disk and locally. The local value is kept.
+
+    line_no is -1 if the path is removed on disk, and remote is "" then.
+    """
+
+    path: JsonPath
+    line_no: int
+    local: str  # json text
+    remote: str
+
+
+class ReloadState:
+    """Lines on disk which the document of line_infos is based on.
+
+    delta is called on the thread of watcher, and resolve and merge_edits on the
+    thread of document. They are serialized by the lock of state. The starting
+    positions of values are not changed by editing, so the spans in the lines on
+    disk are found from them.
+    """
+
+    def __init__(
+        self, line_infos: ContainerLineInfo, lines: Optional[List[str]] = None
+    ):
+        """lines are the lines of line_infos.json_str, which are split if None."""
+        self.line_infos = line_infos
+        self.lines = lines if lines is not None else line_infos.json_str.split("\n")
+        self.version = 0
+        self.lock = threading.Lock()
+
+    def literal(self, line_no: int, line: str) -> str:
+        """Return the json text of value in the line on disk or in the document."""
+        spec = KINDS[self.line_infos.kinds[line_no]]
+        start = self.line_infos.starts[line_no]
+        end = spec.find_end(line.rstrip("\n"))
+        if spec.end_char:
+            return line[start - 1 : end + 1]
+        return line[start:end]
+
+    def delta(self, text: str) -> Optional[Delta]:
+        """Return the changes of text against the lines, None if nothing changed.
+
+        ValueError is raised if text is not valid json. The line break at the end of
+        file, which the formatter writes, is not a line.
+        """
+        lines_new = (text[:-1] if text.endswith("\n") else text).split("\n")
+        with self.lock:
+            if len(lines_new) == len(self.lines):
+                lines_changed = list(
+                    compress(range(len(lines_new)), map(ne, self.lines, lines_new))
+                )
+                if not lines_changed:
+                    return None
+                changes = self._value_changes(lines_changed, lines_new)
+                if changes is not None:
+                    return Delta(self.version, changes)
+            version, lines = self.version, self.lines
+            line_infos = self.line_infos
+        return self._parsed_delta(text, version, lines, line_infos)
+
+    def _value_changes(
+        self, lines_changed: List[int], lines_new: List[str]
+    ) -> Optional[List[ValueChange]]:
+        """Return the changes if the lines differ in the values only."""
+        line_infos = self.line_infos
+        changes = []
+        for line_no in lines_changed:
+            kind = line_infos.kinds[line_no]
+            if kind == ValueKind.NONE:
+                return None
+            line, line_new = self.lines[line_no], lines_new[line_no]
+            spec = KINDS[kind]
+            n_quote = 1 if spec.end_char else 0
+            start = line_infos.starts[line_no]
+            lead, trail = start - n_quote, spec.find_end(line) + n_quote
+            n_trail = len(line) - trail
+            if len(line_new) < lead + n_trail or not (
+                line_new.startswith(line[:lead]) and line_new.endswith(line[trail:])
+            ):
+                return None
+            try:
+                value = json.loads(line_new[lead : len(line_new) - n_trail])
+                line_infos.text_of_value(line_no, value)  # Fits the kind.
+            except ValueError:
+                return None
+            end = len(line_new) - n_trail - n_quote
+            changes.append(ValueChange(line_no, line_new, start, end))
+        return changes
+
+    @staticmethod
+    def _parsed_delta(
+        text: str, version: int, lines: List[str], line_infos: ContainerLineInfo
+    ) -> Optional[Delta]:
+        """Return the delta by parsing text."""
+        new = ContainerLineInfo(text, line_infos.key_val_list)
+        lines_new = new.json_str.split("\n")
+        if not (
+            new.kinds == line_infos.kinds
+            and new.parents == line_infos.parents
+            and new.key_ids == line_infos.key_ids
+            and new.keys == line_infos.keys
+        ):
+            return Delta(version, [], new, lines_new)
+        starts, ends = new.starts, new.ends
+        changes = [
+            ValueChange(line_no, lines_new[line_no], starts[line_no], ends[line_no])
+            for line_no in compress(range(len(lines_new)), map(ne, lines, lines_new))
+        ]
+        return Delta(version, changes) if changes else None
+
+    def resolve(
+        self, delta: Delta, get_line: GetLine
+    ) -> Tuple[List[Tuple[int, str]], List[Conflict]]:
+        """Move the lines to the changes of delta.
+
+        Return (line_no, text between the start and end of value) to write, which
+        are the lines not edited locally, and the conflicts. get_line returns the
+        line of document.
+        """
+        writes, conflicts = [], []
+        with self.lock:
+            for line_no, line_new, start, end in delta.changes:
+                line = self.lines[line_no]
+                self.lines[line_no] = line_new
+                local = get_line(line_no).rstrip("\n")
+                if local == line:
+                    writes.append((line_no, line_new[start:end]))
+                    continue
+                literal_local = self.literal(line_no, local)
+                literal_remote = self.literal(line_no, line_new)
+                if not same_value(literal_local, literal_remote):
+                    path = self.line_infos.path(line_no)
+                    conflicts.append(
+                        Conflict(path, line_no, literal_local, literal_remote)
+                    )
+            self.version += 1
+        return writes, conflicts
+
+    def local_edits(
+        self, lines_edited: Iterable[int], get_line: GetLine
+    ) -> Dict[JsonPath, Tuple[str, str]]:
+        """Return {path: (local json text, json text on disk)} of edited values."""
+        edits = {}
+        kinds = self.line_infos.kinds
+        with self.lock:
+            for line_no in sorted(lines_edited):
+                if line_no >= len(self.lines) or kinds[line_no] == ValueKind.NONE:
+                    continue
+                local, line = get_line(line_no).rstrip("\n"), self.lines[line_no]
+                if local != line:
+                    edits[self.line_infos.path(line_no)] = (
+                        self.literal(line_no, local),
+                        self.literal(line_no, line),
+                    )
+        return edits
+
+    def merge_edits(
+        self, edits: Dict[JsonPath, Tuple[str, str]]
+    ) -> Tuple[List[Tuple[int, str]], List[Conflict]]:
+        """Return the local edits to write again into the new lines, and conflicts.
+
+        The edits are written unless the path is removed or the value does not fit
+        the new line, and the values changed on disk too are the conflicts.
+        """
+        writes, conflicts = [], []
+        line_infos = self.line_infos
+        with self.lock:
+            for path, (literal_local, literal_base) in edits.items():
+                try:
+                    line_no = line_infos.line_of_path(path)
+                except KeyError:
+                    conflicts.append(Conflict(path, -1, literal_local, ""))
+                    continue
+                literal_remote = ""
+                if line_infos.kinds[line_no] != ValueKind.NONE:
+                    literal_remote = self.literal(line_no, self.lines[line_no])
+                if same_value(literal_local, literal_remote):
+                    continue
+                try:
+                    text = line_infos.text_of_value(line_no, json.loads(literal_local))
+                except ValueError:
+                    conflicts.append(
+                        Conflict(path, line_no, literal_local, literal_remote)
+                    )
+                    continue
+                writes.append((line_no, text))
+                if not same_value(literal_base, literal_remote):
+                    conflicts.append(
+                        Conflict(path, line_no, literal_local, literal_remote)
+                    )
+        return writes, conflicts
@@ -0,0 +1,294 @@
+r"""Sidecar cache of formatted text and line index on disk.
+
+Each json file has one entry in the cache directory, which has the header of the
+source(path, size, mtime and hash of content), the columns of ContainerLineInfo
+in binary and the formatted text. The entry is validated by stat of the source,
+and the content is hashed only if mtime is changed but size is not. On a hit,
+the columns are loaded from the memory-mapped entry without parsing and
+formatting json.
+
+Usage:
+    python -m json_core.index_cache --prune [--cache-dir DIR]
+    python -m json_core.index_cache FILE [FILE ...]  # Build the entries of files.
+
+:author: ok97465
+:Date created: 26.10.18 15:10:36
+"""
+# %% Import
+# Standard library imports
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo, ProgressCallback, ValueData
+from json_core.json_patterns import PathPatternIndex
+
+KeyValList = Union[Dict[str, List[ValueData]], PathPatternIndex]
+
+MAGIC = b"JVEINDEX"
+VERSION = 1
+# magic, version, little endian, size, mtime_ns, digest, number of lines, bytes of
+# source path, keys and text.
+_HEADER = struct.Struct("<8sHH4xQq16sQQQQ")
+N_BYTES_HASH = 1 << 20  # Chunk of reading source to hash.
+SUFFIX = ".jvi"
+
+
+def default_directory() -> str:
+    """Return the cache directory from JSON_VALUE_EDITOR_CACHE or the user cache."""
+    directory = os.environ.get("JSON_VALUE_EDITOR_CACHE", None)
+    if directory:
+        return directory
+    base = os.environ.get("XDG_CACHE_HOME", None) or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "json_value_editor")
+
+
+def file_hash(path: str) -> bytes:
+    """Return the digest of the content of file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(N_BYTES_HASH), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class _Entry:
+    """Header and sections of the entry mapped in memory."""
+
+    def __init__(self, buf):
+        """ValueError is raised if buf is not the entry of this version."""
+        if len(buf) < _HEADER.size:
+            raise ValueError("entry is truncated")
+        (
+            magic,
+            version,
+            little,
+            self.size,
+            self.mtime_ns,
+            self.digest,
+            self.n_line,
+            n_path,
+            n_keys,
+            n_text,
+        ) = _HEADER.unpack_from(buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("entry is not of version {}".format(VERSION))
+        if bool(little) != (sys.byteorder == "little"):
+            raise ValueError("entry is written in the other byte order")
+        n_line = self.n_line
+        sizes = [n_path, 4 * n_line, 4 * n_line, 4 * n_line, 4 * n_line, n_line]
+        sizes += [n_keys, n_text]
+        self.sections: List[Tuple[int, int]] = []
+        pos = _HEADER.size
+        for size in sizes:
+            self.sections.append((pos, pos + size))
+            pos += size
+        if pos != len(buf):
+            raise ValueError("entry is truncated")
+        self.source = bytes(buf[slice(*self.sections[0])]).decode("utf-8")
+
+
+class IndexCache:
+    """Entries of formatted text and line index in directory."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """."""
+        self.directory = directory or default_directory()
+
+    def entry_path(self, path: str) -> str:
+        """Return the path of entry of the json file."""
+        name = hashlib.blake2b(
+            os.path.abspath(path).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        return os.path.join(self.directory, name + SUFFIX)
+
+    def load(
+        self, path: str, key_val_list: KeyValList = {}
+    ) -> Optional[ContainerLineInfo]:
+        """Return line info of the entry, None if there is no valid entry."""
+        try:
+            stat = os.stat(path)
+            with open(self.entry_path(path), "rb") as fp:
+                with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    entry = _Entry(buf)
+                    if entry.source != os.path.abspath(path):
+                        return None
+                    if entry.size != stat.st_size:
+                        return None
+                    is_touched = entry.mtime_ns != stat.st_mtime_ns
+                    if is_touched and entry.digest != file_hash(path):
+                        return None
+                    line_infos = self._line_infos(buf, entry, key_val_list)
+            if is_touched:  # Content is the same.
+                self._touch(path, stat.st_mtime_ns)
+        except (OSError, ValueError):
+            return None
+        return line_infos
+
+    def _touch(self, path: str, mtime_ns: int):
+        """Write mtime of the source to the entry whose content is the same."""
+        with open(self.entry_path(path), "r+b") as fp:
+            header = bytearray(fp.read(_HEADER.size))
+            fields = list(_HEADER.unpack(header))
+            fields[4] = mtime_ns
+            fp.seek(0)
+            fp.write(_HEADER.pack(*fields))
+
+    @staticmethod
+    def _line_infos(
+        buf, entry: _Entry, key_val_list: KeyValList
+    ) -> ContainerLineInfo:
+        """Return line info of the sections of entry."""
+        line_infos = ContainerLineInfo(None, key_val_list)
+        columns = []
+        for (start, end), typecode in zip(entry.sections[1:6], "iiiib"):
+            column = array(typecode)
+            column.frombytes(buf[start:end])
+            columns.append(column)
+        (
+            line_infos.starts,
+            line_infos.ends,
+            line_infos.parents,
+            line_infos.key_ids,
+            line_infos.kinds,
+        ) = columns
+        line_infos.keys = json.loads(buf[slice(*entry.sections[6])])
+        line_infos.key_to_id = {key: idx for idx, key in enumerate(line_infos.keys)}
+        line_infos.json_str = buf[slice(*entry.sections[7])].decode("utf-8")
+        line_infos.bind_value_lists()
+        return line_infos
+
+    def store(
+        self, path: str, line_infos: ContainerLineInfo, stat: os.stat_result, digest
+    ):
+        """Write the entry of line info built from the file of stat and digest."""
+        os.makedirs(self.directory, exist_ok=True)
+        source = os.path.abspath(path).encode("utf-8")
+        keys = json.dumps(line_infos.keys).encode("utf-8")
+        text = line_infos.json_str.encode("utf-8")
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            sys.byteorder == "little",
+            stat.st_size,
+            stat.st_mtime_ns,
+            digest,
+            len(line_infos),
+            len(source),
+            len(keys),
+            len(text),
+        )
+        fd, path_tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                fp.write(header)
+                fp.write(source)
+                for column in (
+                    line_infos.starts,
+                    line_infos.ends,
+                    line_infos.parents,
+                    line_infos.key_ids,
+                    line_infos.kinds,
+                ):
+                    column.tofile(fp)
+                fp.write(keys)
+                fp.write(text)
+            os.replace(path_tmp, self.entry_path(path))
+        except BaseException:
+            if os.path.exists(path_tmp):
+                os.remove(path_tmp)
+            raise
+
+    def open(
+        self,
+        path: str,
+        key_val_list: KeyValList = {},
+        progress: Optional[ProgressCallback] = None,
+    ) -> ContainerLineInfo:
+        """Return line info of the json file, from the entry if it is valid.
+
+        Otherwise the file is parsed and the entry is written. The entry is not
+        written if the file is modified while it is parsed.
+        """
+        line_infos = self.load(path, key_val_list)
+        if line_infos is not None:
+            return line_infos
+        stat = os.stat(path)
+        with open(path, "rb") as fp:
+            data = fp.read()
+        line_infos = ContainerLineInfo(data.decode("utf-8"), key_val_list, progress)
+        stat_after = os.stat(path)
+        if (stat.st_size, stat.st_mtime_ns) == (
+            stat_after.st_size,
+            stat_after.st_mtime_ns,
+        ):
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            try:
+                self.store(path, line_infos, stat, digest)
+            except OSError:
+                pass  # Cache is optional.
+        return line_infos
+
+    def prune(self) -> List[str]:
+        """Remove the entries whose source is changed or removed.
+
+        Return the paths of entries removed.
+        """
+        removed = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return removed
+        for name in names:
+            if not name.endswith(SUFFIX):
+                continue
+            path_entry = os.path.join(self.directory, name)
+            try:
+                with open(path_entry, "rb") as fp:
+                    with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                        entry = _Entry(buf)
+                stat = os.stat(entry.source)
+                is_stale = entry.size != stat.st_size or (
+                    entry.mtime_ns != stat.st_mtime_ns
+                    and entry.digest != file_hash(entry.source)
+                )
+                is_stale = is_stale or self.entry_path(entry.source) != path_entry
+            except (OSError, ValueError):
+                is_stale = True
+            if is_stale:
+                os.remove(path_entry)
+                removed.append(path_entry)
+        return removed
+
+
+def main():
+    """Run."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="Json files to build entries.")
+    parser.add_argument("--cache-dir", default=None)
+    parser.add_argument(
+        "--prune", action="store_true", help="Remove stale entries of cache."
+    )
+    args = parser.parse_args()
+
+    cache = IndexCache(args.cache_dir)
+    for path in args.files:
+        cache.open(path)
+    if args.prune:
+        removed = cache.prune()
+        print("Removed {} entries from {}".format(len(removed), cache.directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+r"""Structural diff of two json documents by their line indexes.
+
+Lines are joined by json path in one pass over each document: the child of a
+matched container is looked up by its key in the other container, so the diff is
+linear in the number of lines and the layout of text does not matter. Values are
+compared by their json text in the lines, so the edits of editors are compared
+without parsing the documents again.
+
+Editing changes only values, so the pairs of lines are fixed after the join and
+the diff is updated for the modified lines only.
+
+:author: ok97465
+:Date created: 26.10.18 16:20:44
+"""
+# %% Import
+# Standard library imports
+import json
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo, JsonPath, ValueKind
+
+GetLine = Callable[[int], str]
+
+CHANGED, ADDED, REMOVED = "changed", "added", "removed"
+
+
+class Difference(NamedTuple):
+    """Difference of a value. The line is -1 on the side which has no value."""
+
+    kind: str  # CHANGED, ADDED or REMOVED
+    path: JsonPath
+    left_line: int
+    right_line: int
+
+
+def same_value(literal_left: str, literal_right: str) -> bool:
+    """Return True if the json texts are the same value(1.50 and 1.5)."""
+    if literal_left == literal_right:
+        return True
+    try:
+        left, right = json.loads(literal_left), json.loads(literal_right)
+    except ValueError:
+        return False
+    return type(left) is type(right) and left == right
+
+
+def end_line(line_infos: ContainerLineInfo, line_no: int) -> int:
+    """Return the line closing the container opened at line_no(line_no for value)."""
+    if line_infos.kinds[line_no] != ValueKind.NONE:
+        return line_no
+    parents, key_ids = line_infos.parents, line_infos.key_ids
+    parent, key_id = parents[line_no], key_ids[line_no]
+    for line_end in range(line_no + 1, len(line_infos)):
+        if parents[line_end] == parent and key_ids[line_end] == key_id:
+            return line_end
+    return line_no
+
+
+class StructuralDiff:
+    """Differences between the documents of two line indexes.
+
+    left_text and right_text return the current text of a line, which is the line
+    of editor while it is edited. left_lines and right_lines are all the lines for
+    the first comparison, which are read by left_text and right_text if not given.
+    """
+
+    def __init__(
+        self,
+        left: ContainerLineInfo,
+        right: ContainerLineInfo,
+        left_text: Optional[GetLine] = None,
+        right_text: Optional[GetLine] = None,
+        left_lines: Optional[List[str]] = None,
+        right_lines: Optional[List[str]] = None,
+    ):
+        """."""
+        self.left, self.right = left, right
+        if left_text is None:
+            left_lines = left_lines or left.json_str.split("\n")
+            left_text = left_lines.__getitem__
+        if right_text is None:
+            right_lines = right_lines or right.json_str.split("\n")
+            right_text = right_lines.__getitem__
+        self.left_text, self.right_text = left_text, right_text
+        self.pairs: Dict[int, int] = {}  # left line: right line of values
+        self.pairs_right: Dict[int, int] = {}  # right line: left line of values
+        self.changed: Set[int] = set()  # Left lines of the pairs which differ.
+        self.added: List[int] = []  # Right lines whose path is not in left.
+        self.removed: List[int] = []  # Left lines whose path is not in right.
+        self.build(
+            left_lines or [left_text(line_no) for line_no in range(len(left))],
+            right_lines or [right_text(line_no) for line_no in range(len(right))],
+        )
+
+    def is_aligned(self) -> bool:
+        """Return True if the documents have the same keys in the same lines."""
+        left, right = self.left, self.right
+        return (
+            left.parents == right.parents
+            and left.key_ids == right.key_ids
+            and left.keys == right.keys
+        )
+
+    def build(self, left_lines: List[str], right_lines: List[str]):
+        """Join the lines by path and compare all the pairs of values."""
+        left, right = self.left, self.right
+        self.removed, self.added = [], []
+        if self.is_aligned():  # Only values differ. Lines are compared in order.
+            kinds = list(zip(left.kinds, right.kinds))
+            lines = [line_no for line_no, pair in enumerate(kinds) if any(pair)]
+            self.pairs = dict(zip(lines, lines))
+            self.pairs_right = self.pairs
+            self.changed = {
+                line_no
+                for line_no, (text_left, text_right) in enumerate(
+                    zip(left_lines, right_lines)
+                )
+                if text_left != text_right and line_no in self.pairs
+            }
+            for line_no in list(self.changed):
+                if ValueKind.NONE not in kinds[line_no] and self._same(
+                    line_no, line_no
+                ):
+                    self.changed.discard(line_no)
+            return
+
+        self.pairs, self.pairs_right, self.changed = {}, {}, set()
+        containers: Dict[int, int] = {}  # left line: right line of containers
+        if left.kinds[0] == ValueKind.NONE and right.kinds[0] == ValueKind.NONE:
+            containers[0] = 0
+        matched = [(0, 0)] + self._join(left, right, containers, self.removed)
+        containers_right = {
+            line_right: line_left for line_left, line_right in containers.items()
+        }
+        self.added = self._unmatched(right, containers_right, matched)
+
+        kinds_left, kinds_right = left.kinds, right.kinds
+        for line_left, line_right in matched:
+            kind_left, kind_right = kinds_left[line_left], kinds_right[line_right]
+            if kind_left == ValueKind.NONE and kind_right == ValueKind.NONE:
+                continue  # Containers
+            self.pairs[line_left] = line_right
+            self.pairs_right[line_right] = line_left
+            if ValueKind.NONE in (kind_left, kind_right):  # Value and container
+                self.changed.add(line_left)
+            elif left_lines[line_left] != right_lines[line_right] and not self._same(
+                line_left, line_right
+            ):
+                self.changed.add(line_left)
+
+    @staticmethod
+    def _join(
+        src: ContainerLineInfo,
+        dst: ContainerLineInfo,
+        containers: Dict[int, int],
+        missing: List[int],
+    ) -> List[Tuple[int, int]]:
+        """Return the pairs of (src line, dst line) of the same path except root.
+
+        The pairs of containers are added to containers. The first lines of src
+        whose path is not in dst are appended to missing, and their children are
+        skipped.
+        """
+        src.child_line(0, 0)  # Build the tables of children.
+        dst.child_line(0, 0)
+        children_src, children_dst = src.child_lines, dst.child_lines
+        key_to_id_dst = dst.key_to_id
+        # key id of src: key id of dst, -1(no key of root) if dst has not the key.
+        key_ids_dst = [key_to_id_dst.get(key, -1) for key in src.keys]
+        matched = []
+        kinds_src, kinds_dst = src.kinds, dst.kinds
+        none = ValueKind.NONE
+        lines = zip(src.parents, src.key_ids, kinds_src)
+        next(lines, None)  # Root
+        for line_no, (parent, key_id, kind) in enumerate(lines, 1):
+            parent_dst = containers.get(parent, -1)
+            if parent_dst < 0:
+                continue  # In container which is missing or is value in dst.
+            # Same as _child_key, which is inlined for speed.
+            if kind == none and (
+                children_src[((parent + 1) << 32) | (key_id & 0xFFFFFFFF)] != line_no
+            ):
+                continue  # Closing line
+            key_id_dst = key_ids_dst[key_id] if key_id >= 0 else key_id
+            line_dst = -1
+            if key_id_dst != -1:
+                line_dst = children_dst.get(
+                    ((parent_dst + 1) << 32) | (key_id_dst & 0xFFFFFFFF), -1
+                )
+            if line_dst < 0:
+                missing.append(line_no)
+                continue
+            matched.append((line_no, line_dst))
+            if kind == none and kinds_dst[line_dst] == none:
+                containers[line_no] = line_dst
+        return matched
+
+    @staticmethod
+    def _unmatched(
+        dst: ContainerLineInfo,
+        containers_dst: Dict[int, int],
+        matched: List[Tuple[int, int]],
+    ) -> List[int]:
+        """Return the first lines of dst which are not in matched."""
+        lines_matched = {line_dst for _, line_dst in matched}
+        children = dst.child_lines
+        unmatched = []
+        lines = zip(dst.parents, dst.key_ids, dst.kinds)
+        next(lines, None)  # Root
+        for line_no, (parent, key_id, kind) in enumerate(lines, 1):
+            if parent not in containers_dst or line_no in lines_matched:
+                continue
+            if kind == ValueKind.NONE and (
+                children[((parent + 1) << 32) | (key_id & 0xFFFFFFFF)] != line_no
+            ):
+                continue  # Closing line
+            unmatched.append(line_no)
+        return unmatched
+
+    def _same(self, line_left: int, line_right: int) -> bool:
+        """Return True if the values of the lines are the same."""
+        text_left, text_right = self.left_text(line_left), self.right_text(line_right)
+        if text_left == text_right:  # Same key, indent and value
+            return True
+        return same_value(
+            self.left.literal_of_value(line_left, text_left),
+            self.right.literal_of_value(line_right, text_right),
+        )
+
+    def update_left(self, line_no: int) -> bool:
+        """Compare the modified line of left again. Return True if it is changed."""
+        line_right = self.pairs.get(line_no, None)
+        if line_right is None:
+            return False
+        return self._update(line_no, line_right)
+
+    def update_right(self, line_no: int) -> bool:
+        """Compare the modified line of right again. Return True if it is changed."""
+        line_left = self.pairs_right.get(line_no, None)
+        if line_left is None:
+            return False
+        return self._update(line_left, line_no)
+
+    def _update(self, line_left: int, line_right: int) -> bool:
+        """Update the state of pair, and return True if the state is changed."""
+        if ValueKind.NONE in (self.left.kinds[line_left], self.right.kinds[line_right]):
+            return False  # Value and container differ regardless of edits.
+        was_changed = line_left in self.changed
+        if self._same(line_left, line_right):
+            self.changed.discard(line_left)
+        else:
+            self.changed.add(line_left)
+        return was_changed != (line_left in self.changed)
+
+    def __len__(self) -> int:
+        """Return the number of differences."""
+        return len(self.changed) + len(self.added) + len(self.removed)
+
+    def differences(self) -> List[Difference]:
+        """Return the differences in the order of lines of left."""
+        diffs = [
+            Difference(CHANGED, self.left.path(line_no), line_no, self.pairs[line_no])
+            for line_no in self.changed
+        ]
+        diffs.extend(
+            Difference(REMOVED, self.left.path(line_no), line_no, -1)
+            for line_no in self.removed
+        )
+        diffs.sort(key=lambda diff: diff.left_line)
+        diffs.extend(
+            Difference(ADDED, self.right.path(line_no), -1, line_no)
+            for line_no in self.added
+        )
+        return diffs
+
+    def lines_of_left(self) -> List[int]:
+        """Return the lines of left which have differences in order."""
+        return sorted(self.changed.union(self.removed))
+
+    def lines_of_right(self) -> List[int]:
+        """Return the lines of right which have differences in order."""
+        return sorted([self.pairs[line_no] for line_no in self.changed] + self.added)
+
+    def partner(self, line_no: int, is_left: bool) -> int:
+        """Return the line of the other side which has the same path, -1 if none."""
+        pairs = self.pairs if is_left else self.pairs_right
+        return pairs.get(line_no, -1)
+
+
+def next_line(lines: List[int], line_no: int, backward: bool = False) -> int:
+    """Return the line after(before if backward) line_no in sorted lines, -1 if none.
+
+    The search wraps around the end.
+    """
+    if not lines:
+        return -1
+    if backward:
+        idx = bisect_left(lines, line_no) - 1
+        return lines[idx]  # lines[-1] if it wraps.
+    idx = bisect_right(lines, line_no)
+    return lines[idx] if idx < len(lines) else lines[0]
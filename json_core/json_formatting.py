@@ -0,0 +1,463 @@
+"""Json formatter.
+
+- No line breaks only when the list is composed of numbers.
+- Line has no more than one value(Number, String, list).
+- Line has no more than one key.
+
+The document is written in a single pass over the tree. Nothing is encoded twice
+and the input object is never modified.
+
+Usage(command line, without Qt; json_formatting is python -m json_core.json_formatting):
+    json_formatting [FILE|DIR ...]  # Write the formatted json to stdout.
+    json_formatting --check [--jobs N] FILE|DIR ...  # Exit 1 if not canonical.
+    json_formatting --in-place [--jobs N] FILE|DIR ...
+    cat a.json | json_formatting > b.json
+
+A file is canonical if it is the formatted json followed by a line break.
+
+References:
+    https://gist.github.com/lwthatcher/cd3f7a0a452147fbaae48730354e9993
+
+:author: ok97465
+:Date created: 21.10.29 11:50:31
+"""
+# %% Import
+# Standard library imports
+import json
+import os
+import sys
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    TextIO,
+    Tuple,
+    Union,
+)
+
+# Local imports
+# KINDS, ValueKind and is_inline_list are re-exported.
+from json_core.value_kinds import KINDS, ValueKind, is_inline_list  # noqa: F401
+
+INFINITY = float("inf")
+_JSON_TYPES = (dict, list, tuple, str, int, float, type(None))  # Not given to default.
+
+
+class LineMeta(NamedTuple):
+    """Position and kind of the value in the formatted line.
+
+    The path of the value is given by the line of its container(parent, -1 for the
+    root) and its key(key of object or index of list). Lines closing a container
+    have the same parent and key as the line opening it.
+    """
+
+    pos_start: int
+    pos_end: int
+    val_type: int
+    parent: int
+    key: Union[str, int, None]
+
+
+def line_meta(
+    pos_value: int, line: str, kind: int, parent: int, key: Union[str, int, None]
+) -> LineMeta:
+    """Return LineMeta of the line whose value starts at pos_value."""
+    if kind == ValueKind.NONE:  # the line has no value.
+        return LineMeta(len(line), len(line), kind, parent, key)
+    pos_start, pos_end = KINDS.specs[kind].span(pos_value, line)
+    return LineMeta(pos_start, pos_end, kind, parent, key)
+
+
+class PrettyJsonWriter:
+    """Single pass json formatter.
+
+    Lines are produced while the tree is walked with an explicit stack, so the
+    cost is linear in the size of the document and deep nesting does not hit the
+    recursion limit. sort_keys and default are those of json.dumps.
+    """
+
+    def __init__(
+        self,
+        indent: Union[int, str, None] = 2,
+        ensure_ascii: bool = True,
+        sort_keys: bool = False,
+        default: Optional[Callable[[Any], Any]] = None,
+    ):
+        """."""
+        if indent is None:
+            indent = 0
+        if isinstance(indent, int):
+            indent = " " * indent
+        self.indent: str = indent
+        self.encode_str = encode_basestring_ascii if ensure_ascii else encode_basestring
+        self.sort_keys = sort_keys
+        self.default = default
+
+    def key(self, key: Any) -> str:
+        """Return the json representation of the key."""
+        if isinstance(key, str):
+            return self.encode_str(key)
+        if isinstance(key, (bool, int, float)) or key is None:
+            return '"{}"'.format(self.scalar(key))
+        raise TypeError(
+            "keys must be str, int, float, bool or None, not {}".format(
+                type(key).__name__
+            )
+        )
+
+    def scalar(self, obj: Any) -> str:
+        """Return the json representation of the value which is not a container."""
+        if isinstance(obj, str):
+            return self.encode_str(obj)
+        if obj is None:
+            return "null"
+        if obj is True:
+            return "true"
+        if obj is False:
+            return "false"
+        if isinstance(obj, int):
+            return int.__repr__(obj)
+        if isinstance(obj, float):
+            if obj != obj:
+                return "NaN"
+            if obj == INFINITY:
+                return "Infinity"
+            if obj == -INFINITY:
+                return "-Infinity"
+            return float.__repr__(obj)
+        raise TypeError(
+            "Object of type {} is not JSON serializable".format(type(obj).__name__)
+        )
+
+    def inline_list(self, obj: Any) -> str:
+        """Return the list of numbers in one line."""
+        return "[" + ", ".join(map(self.scalar, obj)) + "]"
+
+    def iterlines(self, obj: Any) -> Iterator[str]:
+        """Yield the formatted lines without line break."""
+        return self._walk(obj, False)
+
+    def iterlines_with_index(self, obj: Any) -> Iterator[Tuple[str, LineMeta]]:
+        """Yield the formatted lines with the position and kind of value."""
+        return self._walk(obj, True)
+
+    def _walk(self, obj: Any, with_index: bool):
+        """Walk the tree with explicit stack and yield lines."""
+        indent, key_repr, split = self.indent, self.key, self._split
+        default = self.default
+
+        if default is not None and not isinstance(obj, _JSON_TYPES):
+            obj = default(obj)
+        text, items, close, kind = split(obj, False, with_index)
+        yield (text, line_meta(0, text, kind, -1, None)) if with_index else text
+        if items is None:
+            return
+
+        line_no = 0
+        # [items, number of items left, indent of items, closing line, is dict,
+        #  line opening the container, parent of the container, key of the container]
+        stack = [[items, len(obj), indent, close, isinstance(obj, dict), 0, -1, None]]
+        while stack:
+            frame = stack[-1]
+            pad, is_dict = frame[2], frame[4]
+            for key, val in frame[0]:
+                frame[1] -= 1
+                line_no += 1
+                comma = "," if frame[1] else ""
+                prefix = pad + key_repr(key) + ": " if is_dict else pad
+                if default is not None and not isinstance(val, _JSON_TYPES):
+                    val = default(val)
+                text, items, close, kind = split(val, not is_dict, with_index)
+                if items is None:
+                    line = prefix + text + comma
+                else:
+                    line = prefix + text
+                    stack.append(
+                        [items, len(val), pad + indent, pad + close + comma,
+                         isinstance(val, dict), line_no, frame[5], key]
+                    )
+                if with_index:
+                    yield line, line_meta(len(prefix), line, kind, frame[5], key)
+                else:
+                    yield line
+                if items is not None:
+                    break
+            else:
+                stack.pop()
+                line_no += 1
+                if with_index:
+                    yield frame[3], line_meta(
+                        0, frame[3], ValueKind.NONE, frame[6], frame[7]
+                    )
+                else:
+                    yield frame[3]
+
+    def _split(self, obj: Any, in_list: bool = False, with_kind: bool = True):
+        """Return the first line, items, closing char and kind of value of obj.
+
+        Kind of value is given by value_kinds.KINDS. Kind of the value which is not
+        a list is NONE if with_kind is False.
+        """
+        if isinstance(obj, dict):
+            if not obj:
+                return "{}", None, "", ValueKind.NONE
+            items = sorted(obj.items()) if self.sort_keys else obj.items()
+            return "{", iter(items), "}", ValueKind.NONE
+        if isinstance(obj, (list, tuple)):
+            kind = KINDS.classify(obj, in_list)
+            if kind == ValueKind.NONE:
+                return "[", enumerate(obj), "]", ValueKind.NONE
+            return self.inline_list(obj), None, "", kind
+        kind = KINDS.classify(obj, in_list) if with_kind else ValueKind.NONE
+        if isinstance(obj, str):
+            return self.encode_str(obj), None, "", kind
+        return self.scalar(obj), None, "", kind
+
+    def encode(self, obj: Any) -> str:
+        """Return the formatted json string."""
+        return "\n".join(self.iterlines(obj))
+
+    def encode_with_index(self, obj: Any) -> Tuple[str, List[LineMeta]]:
+        """Return the formatted json string and LineMeta of each line."""
+        lines, metas = [], []
+        for line, meta in self.iterlines_with_index(obj):
+            lines.append(line)
+            metas.append(meta)
+        return "\n".join(lines), metas
+
+    def iterencode(self, obj: Any, lines_per_chunk: int = 1024) -> Iterator[str]:
+        """Yield the formatted json string in chunks of lines."""
+        chunk = []
+        for line in self.iterlines(obj):
+            chunk.append(line)
+            if len(chunk) == lines_per_chunk:
+                yield "\n".join(chunk) + "\n"
+                chunk.clear()
+        # The last line has no line break like json.dumps.
+        yield "\n".join(chunk)
+
+    def dump(self, obj: Any, fp: TextIO, lines_per_chunk: int = 1024):
+        """Write the formatted json to the writer."""
+        write = fp.write
+        for chunk in self.iterencode(obj, lines_per_chunk):
+            write(chunk)
+
+
+class PrettyJsonEncoder(json.JSONEncoder):
+    """Json encoder for json.dumps(obj, cls=PrettyJsonEncoder, indent=2).
+
+    sort_keys and default are used by the writer. The separators are those of the
+    layout, and skipkeys and allow_nan=False are not supported, so TypeError is
+    raised for the others.
+    """
+
+    def __init__(self, *, separators=None, **kwargs):
+        """."""
+        if separators is not None and tuple(separators) != (",", ": "):
+            raise TypeError("separators of the layout are (',', ': ')")
+        super().__init__(separators=separators, **kwargs)
+        if self.skipkeys or not self.allow_nan:
+            raise TypeError("skipkeys and allow_nan=False are not supported")
+
+    def _writer(self) -> PrettyJsonWriter:
+        """Return writer with the options of encoder."""
+        default = self.default
+        if getattr(default, "__func__", None) is json.JSONEncoder.default:
+            default = None  # The writer raises the same TypeError.
+        return PrettyJsonWriter(self.indent, self.ensure_ascii, self.sort_keys, default)
+
+    def encode(self, obj):
+        """."""
+        return self._writer().encode(obj)
+
+    def iterencode(self, obj, _one_shot=False):
+        """Return the chunks of lines, or the whole string in one chunk if _one_shot."""
+        if _one_shot:
+            return iter([self.encode(obj)])
+        return self._writer().iterencode(obj)
+
+
+# %% Command line
+FORMAT, CHECK, IN_PLACE = "format", "check", "in-place"
+EXIT_NOT_CANONICAL, EXIT_ERROR = 1, 2
+
+
+class FileResult(NamedTuple):
+    """Result of a file processed by the command line."""
+
+    path: str
+    n_bytes: int
+    changed: bool  # The file is not canonical.
+    text: Optional[str] = None  # Formatted json of FORMAT mode.
+    error: Optional[str] = None
+
+
+def canonical_text(data: bytes, writer: PrettyJsonWriter) -> str:
+    """Return the canonical text of json in data."""
+    return writer.encode(json.loads(data.decode("utf-8"))) + "\n"
+
+
+def write_atomic(path: str, text: str):
+    """Replace the file with text, keeping the permission of the file."""
+    import tempfile
+
+    dir_name = os.path.dirname(os.path.abspath(path))
+    fd, path_tmp = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as fp:
+            fp.write(text)
+        os.chmod(path_tmp, os.stat(path).st_mode & 0o7777)
+        os.replace(path_tmp, path)
+    except BaseException:
+        if os.path.exists(path_tmp):
+            os.remove(path_tmp)
+        raise
+
+
+def process_file(
+    path: str, mode: str, indent: int = 2, ensure_ascii: bool = True
+) -> FileResult:
+    """Format, check or rewrite the file. Errors are returned in FileResult."""
+    n_bytes = 0
+    try:
+        with open(path, "rb") as fp:
+            data = fp.read()
+        n_bytes = len(data)
+        text = canonical_text(data, PrettyJsonWriter(indent, ensure_ascii))
+        changed = text.encode("utf-8") != data
+        if mode == IN_PLACE and changed:
+            write_atomic(path, text)
+        return FileResult(path, n_bytes, changed, text if mode == FORMAT else None)
+    except (OSError, ValueError, RecursionError) as e:  # ValueError of decoding
+        return FileResult(path, n_bytes, False, error="{}: {}".format(path, e))
+
+
+def _process_args(args: Tuple[str, str, int, bool]) -> FileResult:
+    """Call process_file with the tuple of arguments for map of executor."""
+    return process_file(*args)
+
+
+def iter_json_files(paths: Iterable[str]) -> Iterator[str]:
+    """Yield the files, and the json files under the directories."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+
+def process_files(
+    paths: List[str],
+    mode: str,
+    jobs: int = 1,
+    indent: int = 2,
+    ensure_ascii: bool = True,
+) -> Iterator[FileResult]:
+    """Yield the results of files in order, processed by jobs processes."""
+    tasks = [(path, mode, indent, ensure_ascii) for path in paths]
+    if jobs <= 1 or len(tasks) <= 1:
+        yield from map(_process_args, tasks)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, min(64, len(tasks) // (jobs * 4)))
+    with ProcessPoolExecutor(jobs) as executor:
+        yield from executor.map(_process_args, tasks, chunksize=chunksize)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line and return the exit code."""
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Format json files in the layout of PrettyJsonWriter."
+    )
+    parser.add_argument(
+        "paths", nargs="*", help="Files or directories of *.json, stdin if empty."
+    )
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "--check", action="store_true", help="Exit 1 if a file is not canonical."
+    )
+    group.add_argument(
+        "-i", "--in-place", action="store_true", help="Rewrite files atomically."
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count() or 1, help="Processes."
+    )
+    parser.add_argument("--indent", type=int, default=2)
+    parser.add_argument(
+        "--no-ensure-ascii", action="store_true", help="Keep non-ascii characters."
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="No report.")
+    args = parser.parse_args(argv)
+    mode = CHECK if args.check else IN_PLACE if args.in_place else FORMAT
+    ensure_ascii = not args.no_ensure_ascii
+
+    if not args.paths or args.paths == ["-"]:  # Pipeline
+        if mode == IN_PLACE:
+            parser.error("-i/--in-place needs paths")
+        data = sys.stdin.buffer.read()
+        try:
+            text = canonical_text(data, PrettyJsonWriter(args.indent, ensure_ascii))
+        except (ValueError, RecursionError) as e:
+            print("<stdin>: {}".format(e), file=sys.stderr)
+            return EXIT_ERROR
+        if mode == CHECK:
+            return EXIT_NOT_CANONICAL if text.encode("utf-8") != data else 0
+        sys.stdout.write(text)
+        return 0
+
+    start = time.perf_counter()
+    n_file = n_bytes = n_changed = n_error = 0
+    paths = list(iter_json_files(args.paths))
+    for result in process_files(paths, mode, args.jobs, args.indent, ensure_ascii):
+        n_file += 1
+        n_bytes += result.n_bytes
+        if result.error is not None:
+            n_error += 1
+            print(result.error, file=sys.stderr)
+        elif result.text is not None:
+            sys.stdout.write(result.text)
+        elif result.changed:
+            n_changed += 1
+            if mode == CHECK:
+                print("not canonical: {}".format(result.path), file=sys.stderr)
+    seconds = max(time.perf_counter() - start, 1e-9)
+
+    if not args.quiet:
+        changed = ""  # Files are not compared in FORMAT.
+        if mode != FORMAT:
+            changed = "{} {}, ".format(
+                n_changed, "rewritten" if mode == IN_PLACE else "not canonical"
+            )
+        print(
+            "{} files, {:.1f} MB in {:.2f} s ({:.1f} files/s, {:.1f} MB/s), "
+            "{}{} errors".format(
+                n_file,
+                n_bytes / 1e6,
+                seconds,
+                n_file / seconds,
+                n_bytes / 1e6 / seconds,
+                changed,
+                n_error,
+            ),
+            file=sys.stderr,
+        )
+    if n_error:
+        return EXIT_ERROR
+    return EXIT_NOT_CANONICAL if mode == CHECK and n_changed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,553 @@
+r"""Json line info.
+
+:author: ok97465
+:Date created: 21.11.26 20:00:54
+"""
+# %% Import
+# Standard library imports
+import json
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from operator import add
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+# Local imports
+from json_core import perf
+from json_core.json_formatting import LineMeta, PrettyJsonWriter
+from json_core.json_patterns import PathPatternIndex
+# CHARS_NUM and CHARS_STR are re-exported.
+from json_core.value_kinds import (  # noqa: F401
+    CHARS_NUM,
+    CHARS_STR,
+    KINDS,
+    CharClass,
+    ValueData,
+    ValueKind,
+)
+
+
+class LoadCancelled(Exception):
+    """Loading of json is cancelled by the progress callback."""
+
+
+# Called with stage("parse", "index") and the number of lines indexed. It can raise
+# LoadCancelled to stop loading.
+ProgressCallback = Callable[[str, int], None]
+N_LINE_PROGRESS = 1 << 16  # Lines between calls of ProgressCallback.
+
+
+class ValueListIndex:
+    """Case-insensitive prefix index over the display of value list."""
+
+    def __init__(self, val_list: List[ValueData]):
+        """."""
+        self.val_list = val_list
+        lowered = [val_data.display.lower() for val_data in val_list]
+        order = sorted(range(len(lowered)), key=lowered.__getitem__)
+        self.order = array("i", order)  # Rows sorted by display.
+        self.displays_sorted = [lowered[row] for row in order]
+
+    def __len__(self) -> int:
+        """Return the number of values."""
+        return len(self.val_list)
+
+    def filter(self, prefix: str) -> array:
+        """Return rows whose display starts with prefix in the order of display."""
+        prefix = prefix.lower()
+        if not prefix:
+            return array("i", range(len(self.val_list)))
+        displays = self.displays_sorted
+        lo = bisect_left(displays, prefix)
+        hi = lo
+        # Displays with the prefix are consecutive in sorted order.
+        if lo < len(displays) and displays[lo].startswith(prefix):
+            hi = bisect_left(displays, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo)
+        return self.order[lo:hi]
+
+
+JsonPath = Tuple[Union[str, int], ...]
+
+
+def json_pointer(path: JsonPath) -> str:
+    """Return json pointer(RFC 6901) of the path."""
+    return "".join(
+        "/" + str(key).replace("~", "~0").replace("/", "~1") for key in path
+    )
+
+
+def set_by_path(obj: Any, path: JsonPath, value: Any) -> Any:
+    """Set value at the path of obj, and return obj(value if path is root)."""
+    if not path:
+        return value
+    container = obj
+    for key in path[:-1]:
+        container = container[key]
+    container[path[-1]] = value
+    return obj
+
+
+_WRITER = PrettyJsonWriter()
+
+
+def _child_key(parent: int, key_id: int) -> int:
+    """Return one int for the parent line and key id."""
+    return ((parent + 1) << 32) | (key_id & 0xFFFFFFFF)
+
+
+_NO_CHARS = CharClass()
+
+
+class ElementOffsets:
+    """Columns of the commas between the numbers of the list in one line.
+
+    The shifts by edits are kept in Fenwick tree indexed by comma, so shifting the
+    commas after the edit and finding the column of a comma are O(log n).
+    """
+
+    __slots__ = ("commas", "shifts")
+
+    def __init__(self, line: str, pos_start: int, pos_end: int):
+        """Find commas in line[pos_start:pos_end]."""
+        parts = line[pos_start:pos_end].split(",")
+        # Column of k-th comma is pos_start + k + the length of parts before it.
+        commas = array(
+            "i",
+            map(
+                add,
+                accumulate(map(len, parts[:-1])),
+                range(pos_start, pos_start + len(parts) - 1),
+            ),
+        )
+        self.commas = commas
+        self.shifts = array("i", bytes(4 * (len(commas) + 1)))  # 1-based.
+
+    def __len__(self) -> int:
+        """Return the number of elements."""
+        return len(self.commas) + 1
+
+    def comma(self, idx: int) -> int:
+        """Return the column of idx-th comma."""
+        shifts, pos = self.shifts, idx + 1
+        col = self.commas[idx]
+        while pos > 0:
+            col += shifts[pos]
+            pos &= pos - 1
+        return col
+
+    def count_before(self, pos_col: int) -> int:
+        """Return the number of commas before pos_col."""
+        lo, hi = 0, len(self.commas)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.comma(mid) < pos_col:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def shift(self, pos_col: int, delta: int):
+        """Shift commas from pos_col by the text inserted(delta > 0) at pos_col."""
+        shifts, n_comma = self.shifts, len(self.commas)
+        pos = self.count_before(pos_col) + 1
+        while pos <= n_comma:
+            shifts[pos] += delta
+            pos += pos & -pos
+
+    def element_at(self, pos_col: int) -> int:
+        """Return the index of element which has pos_col."""
+        return self.count_before(pos_col)
+
+    def span(self, idx: int, pos_start: int, pos_end: int) -> Tuple[int, int]:
+        """Return the span of idx-th element including spaces in the value span."""
+        start = pos_start if idx == 0 else self.comma(idx - 1) + 1
+        end = pos_end if idx == len(self.commas) else self.comma(idx)
+        return start, end
+
+
+class LineInfo:
+    """View of the information of the line of json in ContainerLineInfo."""
+
+    __slots__ = ("container", "line_no")
+
+    def __init__(self, container: "ContainerLineInfo", line_no: int):
+        """."""
+        self.container = container
+        self.line_no = line_no
+
+    @property
+    def pos_start(self) -> int:
+        """Starting position of value."""
+        return self.container.starts[self.line_no]
+
+    @property
+    def pos_end(self) -> int:
+        """Ending position of value."""
+        return self.container.ends[self.line_no]
+
+    @property
+    def val_type(self) -> int:
+        """ValueKind of value."""
+        return self.container.kinds[self.line_no]
+
+    @property
+    def val_list(self) -> Optional[List[ValueData]]:
+        """List of values which can be selected."""
+        return self.container.val_list_of(self.line_no)
+
+    @property
+    def end_char(self) -> str:
+        """Character closing value."""
+        return KINDS[self.val_type].end_char
+
+    @property
+    def chars_allowed(self) -> CharClass:
+        """Classifier of editable charaters in editor."""
+        return self.container.chars_of(self.line_no)
+
+    @property
+    def path(self) -> JsonPath:
+        """Json path of value."""
+        return self.container.path(self.line_no)
+
+
+@perf.instrument
+class ContainerLineInfo:
+    """Container for json line info.
+
+    Information of lines is stored in columns of array, and LineInfo is created
+    only when a line is accessed.
+    """
+
+    def __init__(
+        self,
+        json_str: Optional[str],
+        key_val_list: Union[Dict[str, List[ValueData]], PathPatternIndex],
+        progress: Optional[ProgressCallback] = None,
+    ):
+        """.
+
+        Keys of key_val_list are path patterns of json_patterns(e.g. "kk",
+        "dhrwodn.*.kk", "glossary[*]"). Compiled PathPatternIndex can be shared.
+        json_str is None for the lines built later.
+        """
+        self.json_str: str = ""
+        if not isinstance(key_val_list, PathPatternIndex):
+            key_val_list = PathPatternIndex(key_val_list)
+        self.key_val_list: PathPatternIndex[List[ValueData]] = key_val_list
+        self.starts = array("i")
+        self.ends = array("i")
+        self.kinds = array("b")
+        self.parents = array("i")  # Line opening the container of value.
+        # Index of self.keys for key of object, -2 - idx for index of list, -1 for root.
+        self.key_ids = array("i")
+        self.keys: List[str] = []
+        self.key_to_id: Dict[str, int] = {}
+        self.val_lists: Dict[int, List[ValueData]] = {}  # line_no: val_list
+        # line_no: ElementOffsets of NUM_LIST, built by elements_of.
+        self.element_offsets: Dict[int, ElementOffsets] = {}
+        self.dirty_lines: Set[int] = set()  # Lines modified since the last snapshot.
+        self.child_lines: Optional[Dict[int, int]] = None  # Built by line_of_path.
+        if json_str is not None:
+            self.parse_json(json_str, progress)
+
+    @classmethod
+    def from_lines(
+        cls,
+        lines_with_index: Iterable[Tuple[str, LineMeta]],
+        key_val_list: Union[Dict[str, List[ValueData]], PathPatternIndex],
+        progress: Optional[ProgressCallback] = None,
+    ) -> "ContainerLineInfo":
+        """Return line info of the lines and index of PrettyJsonWriter."""
+        line_infos = cls(None, key_val_list)
+        line_infos.build(lines_with_index, progress)
+        return line_infos
+
+    @perf.hot_path()
+    def parse_json(self, json_str: str, progress: Optional[ProgressCallback] = None):
+        """Parse json string."""
+        if progress is not None:
+            progress("parse", 0)
+        json_parsed = json.loads(json_str)
+        # Each line is formatted to have no more than one key and no more than one value
+        self.build(
+            PrettyJsonWriter(indent=2).iterlines_with_index(json_parsed), progress
+        )
+
+    def build(
+        self,
+        lines_with_index: Iterable[Tuple[str, LineMeta]],
+        progress: Optional[ProgressCallback] = None,
+    ):
+        """Build columns from the lines and index of PrettyJsonWriter."""
+        self.starts, self.ends, self.kinds = array("i"), array("i"), array("b")
+        self.parents, self.key_ids = array("i"), array("i")
+        self.keys, self.key_to_id, self.val_lists = [], {}, {}
+        self.element_offsets = {}
+        self.dirty_lines = set()
+        self.child_lines = None
+
+        lines: List[str] = []
+        key_to_id = self.key_to_id
+        keys = self.keys
+        add_start, add_end = self.starts.append, self.ends.append
+        add_kind, add_parent = self.kinds.append, self.parents.append
+        add_key_id, add_line = self.key_ids.append, lines.append
+
+        for line_no, (line, meta) in enumerate(lines_with_index):
+            pos_start, pos_end, val_type, parent, key = meta
+            if progress is not None and not line_no % N_LINE_PROGRESS:
+                progress("index", line_no)
+            add_line(line)
+            add_start(pos_start)
+            add_end(pos_end)
+            add_kind(val_type)
+            add_parent(parent)
+            if key is None:
+                add_key_id(-1)
+            elif isinstance(key, str):
+                key_id = key_to_id.get(key, None)
+                if key_id is None:
+                    key_id = key_to_id[key] = len(keys)
+                    keys.append(key)
+                add_key_id(key_id)
+            else:
+                add_key_id(-2 - key)
+
+        self.json_str = "\n".join(lines)
+        self.bind_value_lists()
+
+    def bind_value_lists(self):
+        """Find the value lists of path patterns for the lines."""
+        self.val_lists = val_lists = {}
+        patterns = self.key_val_list
+        if not len(patterns):
+            return
+        keys = self.keys
+        states = {-1: PathPatternIndex.ROOT}  # line_no: state of pattern of container
+        for line_no, (val_type, parent, key_id) in enumerate(
+            zip(self.kinds, self.parents, self.key_ids)
+        ):
+            if key_id == -1:
+                state = PathPatternIndex.ROOT
+            else:
+                key = keys[key_id] if key_id >= 0 else -2 - key_id
+                state = patterns.step(states[parent], key)
+            if val_type == ValueKind.NONE:
+                states[line_no] = state
+            else:
+                val_list = patterns.value(state)
+                if val_list is not None:
+                    val_lists[line_no] = val_list
+
+    def copy(self) -> "ContainerLineInfo":
+        """Return line info sharing the text and the columns of structure.
+
+        Only the spans, which are updated by editing, are copied.
+        """
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.starts, other.ends = array("i", self.starts), array("i", self.ends)
+        other.element_offsets = {}
+        other.dirty_lines = set()
+        return other
+
+    def nbytes(self) -> int:
+        """Return the approximate memory of the text, columns and keys."""
+        columns = (self.starts, self.ends, self.kinds, self.parents, self.key_ids)
+        return (
+            sys.getsizeof(self.json_str)
+            + sum(column.itemsize * len(column) for column in columns)
+            + sum(sys.getsizeof(key) for key in self.keys)
+        )
+
+    def __len__(self) -> int:
+        """Return the number of lines."""
+        return len(self.kinds)
+
+    def __getitem__(self, idx: int) -> LineInfo:
+        """Get LineInfo."""
+        n_line = len(self.kinds)
+        if idx < 0:
+            idx += n_line
+        if not 0 <= idx < n_line:
+            raise IndexError("line index out of range")
+        return LineInfo(self, idx)
+
+    def val_list_of(self, line_no: int) -> Optional[List[ValueData]]:
+        """Return the value list of path pattern or kind of the line."""
+        val_list = self.val_lists.get(line_no, None)
+        if val_list is None:
+            val_list = KINDS[self.kinds[line_no]].val_list
+        return val_list
+
+    def chars_of(self, line_no: int) -> CharClass:
+        """Return the classifier of characters which can be typed in the line."""
+        if line_no in self.val_lists:
+            return _NO_CHARS
+        return KINDS[self.kinds[line_no]].chars
+
+    def path(self, line_no: int) -> JsonPath:
+        """Return the json path of value in the line."""
+        parents, key_ids, keys = self.parents, self.key_ids, self.keys
+        path = []
+        while line_no >= 0:
+            key_id = key_ids[line_no]
+            if key_id == -1:
+                break
+            path.append(keys[key_id] if key_id >= 0 else -2 - key_id)
+            line_no = parents[line_no]
+        path.reverse()
+        return tuple(path)
+
+    def key_of(self, line_no: int) -> Union[str, int, None]:
+        """Return the key(index of list) of value in the line, None for root."""
+        key_id = self.key_ids[line_no]
+        if key_id == -1:
+            return None
+        return self.keys[key_id] if key_id >= 0 else -2 - key_id
+
+    def child_line(self, parent: int, key: Union[str, int]) -> int:
+        """Return the line of child of key in the container opened at parent.
+
+        -1 is returned if not found. The table of (parent, key) to line is built at
+        the first call.
+        """
+        child_lines = self.child_lines
+        if child_lines is None:
+            child_lines = self.child_lines = {}
+            lines = enumerate(zip(self.parents, self.key_ids))
+            for line_no, (parent_, key_id) in lines:
+                # The line opening container comes before the line closing it.
+                child_lines.setdefault(_child_key(parent_, key_id), line_no)
+
+        if isinstance(key, str):
+            key_id = self.key_to_id.get(key, None)
+            if key_id is None:
+                return -1
+        else:
+            key_id = -2 - key
+        return child_lines.get(_child_key(parent, key_id), -1)
+
+    def line_of_path(self, path: JsonPath) -> int:
+        """Return the line of the value of path. KeyError is raised if not found."""
+        line_no = 0
+        for key in path:
+            line_no = self.child_line(line_no, key)
+            if line_no < 0:
+                raise KeyError(path)
+        return line_no
+
+    def text_of_value(self, line_no: int, value: Any) -> str:
+        """Return the text of value between the start and end of value in the line.
+
+        ValueError is raised if value does not fit the kind of the line, or has
+        characters which can not be typed in the line(except commas between
+        numbers of list).
+        """
+        spec = KINDS[self.kinds[line_no]]
+        if spec.kind == ValueKind.NONE or not spec.accepts(value):
+            raise ValueError(
+                "{!r} does not fit the value of {}".format(value, self.path(line_no))
+            )
+        if isinstance(value, (list, tuple)):
+            text = _WRITER.inline_list(value)
+        else:
+            text = _WRITER.scalar(value)
+        if spec.end_char:
+            text = text[1:-1]
+
+        val_list = self.val_list_of(line_no)
+        if val_list is not None:
+            if all(val_data.data != text for val_data in val_list):
+                raise ValueError(
+                    "{!r} is not in the value list of {}".format(
+                        value, self.path(line_no)
+                    )
+                )
+        elif not spec.chars.contains_all(text.replace(",", "")):
+            raise ValueError(
+                "{!r} has characters not allowed in {}".format(
+                    value, self.path(line_no)
+                )
+            )
+        return text
+
+    def start_pos_of_value(self, line_no: int) -> int:
+        """Return the starting position of Value in the line."""
+        return self.starts[line_no]
+
+    def end_pos_of_value(self, line_no: int, line: Optional[str] = None) -> int:
+        """Return the ending position of Value in the line.
+
+        The stored position is returned. If line is given, the position is found
+        in the line again and stored.
+        """
+        if line is None:
+            return self.ends[line_no]
+
+        val_type = self.kinds[line_no]
+        if line[-1:] == "\n":
+            line = line[:-1]
+
+        if val_type == ValueKind.NONE:
+            end_pos = len(line)
+        else:
+            end_pos = KINDS[val_type].find_end(line)
+
+        self.ends[line_no] = end_pos
+        return end_pos
+
+    def update_span(self, line_no: int, pos_col: int, delta: int):
+        """Shift the span of value by the text inserted(delta > 0) at pos_col."""
+        if pos_col < self.starts[line_no]:
+            self.starts[line_no] += delta
+        self.ends[line_no] += delta
+        self.dirty_lines.add(line_no)
+        elements = self.element_offsets.get(line_no, None)
+        if elements is not None:
+            elements.shift(pos_col, delta)
+
+    def elements_of(
+        self, line_no: int, get_line: Callable[[int], str]
+    ) -> ElementOffsets:
+        """Return ElementOffsets of the NUM_LIST line.
+
+        get_line(line_no) is called only when the offsets are built.
+        """
+        elements = self.element_offsets.get(line_no, None)
+        if elements is None:
+            elements = self.element_offsets[line_no] = ElementOffsets(
+                get_line(line_no), self.starts[line_no], self.ends[line_no]
+            )
+        return elements
+
+    def invalidate_elements(self, line_no: int):
+        """Drop ElementOffsets of the line whose commas are modified."""
+        self.element_offsets.pop(line_no, None)
+
+    def literal_of_value(self, line_no: int, line: str) -> str:
+        """Return the json text of value including quotes or brackets."""
+        start, end = self.starts[line_no], self.ends[line_no]
+        if KINDS[self.kinds[line_no]].end_char:
+            return line[start - 1 : end + 1]
+        return line[start:end]
+
+    def pos_of_value(
+        self, line_no: int, line: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Return the starting, ending position of Value in the line."""
+        start = self.start_pos_of_value(line_no)
+        end = self.end_pos_of_value(line_no, line)
+        return start, end
@@ -0,0 +1,196 @@
+r"""Json path patterns compiled into an automaton.
+
+Pattern is keys separated by "." with indexes of list in brackets.
+
+- ``dhrwodn.dh1.kk``: the path from the root.
+- ``dhrwodn.*.kk``: ``*`` is any one key of object or index of list.
+- ``glossary[*]``, ``glossary[0]``: any index, the index of list.
+- ``**.kk``: ``**`` is zero or more keys.
+- ``kk``: a bare key(no "." and no brackets) is ``**.kk``, the key at any depth.
+
+If several patterns match a path, the pattern which comes first wins. A pattern
+can also be the tuple of tokens of parse_pattern, which is not parsed, so keys may
+have "." or brackets.
+
+The patterns are compiled into a trie, and the sets of trie nodes are turned into
+the states of a DFA lazily. Matching a value costs one cached transition from the
+state of its container, so building the line index is O(depth) per value at worst
+and O(1) per value in practice regardless of the number of patterns.
+
+:author: ok97465
+:Date created: 26.10.17 16:05:22
+"""
+# %% Import
+# Standard library imports
+import re
+from typing import (
+    Dict,
+    FrozenSet,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+V = TypeVar("V")
+Token = Union[str, int]
+Pattern = Union[str, Tuple[Token, ...]]
+
+# Name of key followed by brackets of index.
+_PART = re.compile(r"([^\[\]]*)((?:\[(?:\*|\d+)\])*)")
+_BRACKET = re.compile(r"\[(\*|\d+)\]")
+
+
+class _Node:
+    """Node of trie."""
+
+    __slots__ = ("children", "any_key", "any_index", "deep", "is_deep", "order")
+
+    def __init__(self, is_deep: bool = False):
+        """."""
+        self.children: Dict[Union[str, int], "_Node"] = {}
+        self.any_key: Optional[_Node] = None
+        self.any_index: Optional[_Node] = None
+        self.deep: Optional[_Node] = None
+        self.is_deep = is_deep  # "**" matches any keys by looping on itself.
+        self.order: Optional[int] = None  # Order of pattern ending at this node.
+
+
+def parse_pattern(pattern: str) -> List[Union[str, int]]:
+    """Return the tokens of pattern.
+
+    Token is the name of key, index of list, "*", "[*]" or "**".
+    """
+    if "." not in pattern and "[" not in pattern and pattern not in ("*", "**"):
+        return ["**", pattern]
+
+    tokens: List[Union[str, int]] = []
+    for part in pattern.split("."):
+        match = _PART.fullmatch(part)
+        if match is None:
+            raise ValueError("invalid path pattern: {!r}".format(pattern))
+        name, brackets = match.groups()
+        if name:
+            tokens.append(name)
+        elif not brackets:
+            raise ValueError("empty key in path pattern: {!r}".format(pattern))
+        for index in _BRACKET.findall(brackets):
+            tokens.append("[*]" if index == "*" else int(index))
+    return tokens
+
+
+class PathPatternIndex(Generic[V]):
+    """Index from json path patterns to values."""
+
+    ROOT = 0  # State of the root.
+
+    def __init__(self, patterns: Dict[Pattern, V]):
+        """."""
+        self.values: List[V] = []
+        self.root = _Node()
+        for pattern, value in patterns.items():
+            self._add(pattern, value)
+
+        self._state_ids: Dict[FrozenSet[_Node], int] = {}
+        self._states: List[FrozenSet[_Node]] = []
+        self._state_values: List[Optional[V]] = []
+        self._keys: List[FrozenSet[Union[str, int]]] = []  # Exact keys of state.
+        self._transitions: Dict[tuple, int] = {}
+        self._state_of(self._closure((self.root,)))
+        self.dead = self._state_of(frozenset())
+
+    def __len__(self) -> int:
+        """Return the number of patterns."""
+        return len(self.values)
+
+    def _add(self, pattern: Pattern, value: V):
+        """Add pattern to trie."""
+        node = self.root
+        tokens = parse_pattern(pattern) if isinstance(pattern, str) else pattern
+        for token in tokens:
+            if token == "*":
+                if node.any_key is None:
+                    node.any_key = _Node()
+                node = node.any_key
+            elif token == "[*]":
+                if node.any_index is None:
+                    node.any_index = _Node()
+                node = node.any_index
+            elif token == "**":
+                if node.deep is None:
+                    node.deep = _Node(is_deep=True)
+                node = node.deep
+            else:
+                child = node.children.get(token, None)
+                if child is None:
+                    child = node.children[token] = _Node()
+                node = child
+        if node.order is None:
+            node.order = len(self.values)
+        self.values.append(value)
+
+    @staticmethod
+    def _closure(nodes: Iterable[_Node]) -> FrozenSet[_Node]:
+        """Add nodes reachable by "**" which matches zero keys."""
+        result, stack = set(), list(nodes)
+        while stack:
+            node = stack.pop()
+            if node in result:
+                continue
+            result.add(node)
+            if node.deep is not None:
+                stack.append(node.deep)
+        return frozenset(result)
+
+    def _state_of(self, nodes: FrozenSet[_Node]) -> int:
+        """Return id of the state of nodes."""
+        state = self._state_ids.get(nodes, None)
+        if state is None:
+            state = self._state_ids[nodes] = len(self._states)
+            self._states.append(nodes)
+            orders = [node.order for node in nodes if node.order is not None]
+            self._state_values.append(self.values[min(orders)] if orders else None)
+            self._keys.append(frozenset(key for node in nodes for key in node.children))
+        return state
+
+    def step(self, state: int, key: Union[str, int]) -> int:
+        """Return the state after the key of object or index of list."""
+        if state == self.dead:
+            return state
+        # Keys which are not in the trie share one transition by the type of key.
+        key_cache = key if key in self._keys[state] else type(key)
+        try:
+            return self._transitions[state, key_cache]
+        except KeyError:
+            pass
+
+        nodes = []
+        for node in self._states[state]:
+            child = node.children.get(key, None)
+            if child is not None:
+                nodes.append(child)
+            if node.any_key is not None:
+                nodes.append(node.any_key)
+            if node.any_index is not None and isinstance(key, int):
+                nodes.append(node.any_index)
+            if node.is_deep:
+                nodes.append(node)
+        state_new = self._state_of(self._closure(nodes))
+        self._transitions[state, key_cache] = state_new
+        return state_new
+
+    def value(self, state: int) -> Optional[V]:
+        """Return the value of the pattern matching the state."""
+        return self._state_values[state]
+
+    def match(self, path: Iterable[Union[str, int]]) -> Optional[V]:
+        """Return the value of the pattern matching the path."""
+        state = self.ROOT
+        for key in path:
+            state = self.step(state, key)
+            if state == self.dead:
+                return None
+        return self._state_values[state]
@@ -0,0 +1,268 @@
+r"""Validation of values by a subset of JSON Schema.
+
+The keywords type, enum, const, minimum, maximum, exclusiveMinimum,
+exclusiveMaximum, minLength, maxLength and pattern are checked. The schemas of
+values are found by properties, additionalProperties(an object schema) and
+items(one schema for all items), and the other keywords are ignored.
+
+compile_schema turns the schema into Validators of path patterns, so the value
+of a line finds its validator by one transition of PathPatternIndex from its
+container as the value lists do. SchemaValidation keeps the error of each line,
+and a line is validated again only when it is edited: the json text of its value
+is parsed, not the document.
+
+:author: ok97465
+:Date created: 26.10.19 13:27:50
+"""
+# %% Import
+# Standard library imports
+import json
+import math
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo, ValueKind
+from json_core.json_patterns import PathPatternIndex, Token
+from json_core.value_kinds import KINDS
+
+GetLine = Callable[[int], str]
+
+TYPES = ("null", "boolean", "integer", "number", "string", "array", "object")
+
+
+def type_of(value: Any) -> str:
+    """Return the name of json type of value. Integral floats are "number"."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int):
+        return "integer"
+    if isinstance(value, float):
+        return "number"
+    if isinstance(value, str):
+        return "string"
+    return "array" if isinstance(value, (list, tuple)) else "object"
+
+
+def _same(left: Any, right: Any) -> bool:
+    """Return True if the json values are equal(1 == 1.0, but not True == 1)."""
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    return left == right
+
+
+class Validator:
+    """Compiled keywords of the schema of a value."""
+
+    __slots__ = (
+        "types",
+        "enum",
+        "minimum",
+        "maximum",
+        "exclusive_minimum",
+        "exclusive_maximum",
+        "min_length",
+        "max_length",
+        "pattern",
+        "items",
+    )
+
+    def __init__(self, schema: Dict[str, Any]):
+        """ValueError is raised for the type out of TYPES or the invalid pattern."""
+        types = schema.get("type", None)
+        if isinstance(types, str):
+            types = [types]
+        if types is not None and not set(types) <= set(TYPES):
+            raise ValueError("unknown type in schema: {}".format(types))
+        self.types = None if types is None else frozenset(types)
+        enum = schema.get("enum", None)
+        if "const" in schema:
+            enum = [schema["const"]]
+        self.enum: Optional[List] = None if enum is None else list(enum)
+        self.minimum = schema.get("minimum", None)
+        self.maximum = schema.get("maximum", None)
+        self.exclusive_minimum = schema.get("exclusiveMinimum", None)
+        self.exclusive_maximum = schema.get("exclusiveMaximum", None)
+        self.min_length = schema.get("minLength", None)
+        self.max_length = schema.get("maxLength", None)
+        try:
+            pattern = schema.get("pattern", None)
+            self.pattern = None if pattern is None else re.compile(pattern)
+        except re.error as error:
+            raise ValueError("invalid pattern in schema: {}".format(error))
+        self.items: Optional[Validator] = None  # Items of list written in a line
+
+    def error(self, value: Any) -> Optional[str]:
+        """Return the reason why value is invalid, None if it is valid."""
+        if self.types is not None:
+            name = type_of(value)
+            is_integral = name == "number" and math.isfinite(value)
+            is_integral = is_integral and value == int(value)
+            if not (
+                name in self.types
+                or (name == "integer" and "number" in self.types)
+                or (is_integral and "integer" in self.types)
+            ):
+                return "{} is not {}".format(name, " or ".join(sorted(self.types)))
+        if self.enum is not None and not any(_same(value, item) for item in self.enum):
+            return "{} is not one of {}".format(
+                json.dumps(value), json.dumps(self.enum)
+            )
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            for bound, is_error, relation in (
+                (self.minimum, value.__lt__, "<"),
+                (self.maximum, value.__gt__, ">"),
+                (self.exclusive_minimum, value.__le__, "<="),
+                (self.exclusive_maximum, value.__ge__, ">="),
+            ):
+                if bound is not None and is_error(bound):
+                    return "{} {} {}".format(value, relation, bound)
+        elif isinstance(value, str):
+            if self.min_length is not None and len(value) < self.min_length:
+                return "shorter than {}".format(self.min_length)
+            if self.max_length is not None and len(value) > self.max_length:
+                return "longer than {}".format(self.max_length)
+            if self.pattern is not None and self.pattern.search(value) is None:
+                return "does not match {!r}".format(self.pattern.pattern)
+        elif isinstance(value, (list, tuple)) and self.items is not None:
+            for idx, item in enumerate(value):
+                error = self.items.error(item)
+                if error is not None:
+                    return "[{}] {}".format(idx, error)
+        return None
+
+
+def compile_schema(schema: Dict[str, Any]) -> PathPatternIndex:
+    """Return the validators of the paths of schema.
+
+    additionalProperties is not applied to the keys named in properties, so the
+    paths of its schema under these keys are added before its "*" with no
+    validator(None), and the first pattern matched wins.
+    """
+    patterns: Dict[Tuple[Token, ...], Optional[Validator]] = {}
+
+    def walk(sub: Dict[str, Any], tokens: Tuple[Token, ...], shadow: bool = False):
+        if not isinstance(sub, dict):
+            raise ValueError("schema of {} is not an object".format(tokens))
+        if tokens and tokens not in patterns:
+            patterns[tokens] = None if shadow else Validator(sub)
+        additional = sub.get("additionalProperties", None)
+        if not isinstance(additional, dict):
+            additional = None
+        for key, child in sub.get("properties", {}).items():
+            walk(child, tokens + (key,), shadow)
+            if additional is not None:
+                walk(additional, tokens + (key,), True)
+        if additional is not None:
+            walk(additional, tokens + ("*",), shadow)
+        items = sub.get("items", None)
+        if isinstance(items, dict):
+            walk(items, tokens + ("[*]",), shadow)
+
+    walk(schema, ())
+    for tokens, validator in patterns.items():
+        if validator is not None:
+            validator.items = patterns.get(tokens + ("[*]",), None)
+    return PathPatternIndex(patterns)
+
+
+class SchemaValidation:
+    """Errors of the values of line index.
+
+    The validators of schema are bound to the lines when it is created. Every
+    value validated is also checked to be json of the kind of line, so "1e" or
+    "--3" in a number is an error without schema.
+    """
+
+    def __init__(
+        self,
+        line_infos: ContainerLineInfo,
+        validators: Optional[PathPatternIndex] = None,
+    ):
+        """validators are compiled by compile_schema."""
+        self.line_infos = line_infos
+        self.patterns = validators
+        self.validators: Dict[int, Validator] = {}  # line_no: validator of value
+        self.errors: Dict[int, str] = {}  # line_no: reason
+        if validators is not None and len(validators):
+            self.bind()
+
+    def bind(self):
+        """Find the validators of the value lines."""
+        line_infos, patterns = self.line_infos, self.patterns
+        validators = self.validators = {}
+        keys = line_infos.keys
+        states = {-1: PathPatternIndex.ROOT}  # line_no: state of container
+        dead = patterns.dead
+        for line_no, (kind, parent, key_id) in enumerate(
+            zip(line_infos.kinds, line_infos.parents, line_infos.key_ids)
+        ):
+            state = states.get(parent, dead)
+            if key_id == -1:
+                state = PathPatternIndex.ROOT
+            elif state != dead:
+                key = keys[key_id] if key_id >= 0 else -2 - key_id
+                state = patterns.step(state, key)
+            if kind == ValueKind.NONE:
+                if state != dead:
+                    states[line_no] = state
+            else:
+                validator = patterns.value(state)
+                if validator is not None:
+                    validators[line_no] = validator
+
+    def validate_all(self, get_line: GetLine) -> Dict[int, str]:
+        """Validate the lines which have validators, and return all the errors."""
+        for line_no in self.validators:
+            self.validate_line(line_no, get_line(line_no))
+        return self.errors
+
+    def validate_line(self, line_no: int, line: str) -> Optional[str]:
+        """Validate the value of the line, and return the error(None if valid)."""
+        line_infos = self.line_infos
+        kind = line_infos.kinds[line_no]
+        if kind == ValueKind.NONE:
+            return None
+        literal = line_infos.literal_of_value(line_no, line)
+        spec = KINDS[kind]
+        try:
+            value = json.loads(literal)
+        except ValueError:
+            error: Optional[str] = "{} is not a valid {}".format(literal, spec.name)
+        else:
+            if spec.accepts(value):
+                validator = self.validators.get(line_no, None)
+                error = None if validator is None else validator.error(value)
+            else:
+                error = "{} is not a valid {}".format(literal, spec.name)
+        if error is None:
+            self.errors.pop(line_no, None)
+        else:
+            self.errors[line_no] = error
+        return error
+
+    def validate_elements(self, line_no: int, elements: List[str]) -> Optional[str]:
+        """Validate the edited elements of a valid numeric list without validator.
+
+        The other elements are not changed by the edit, so the list is not parsed.
+        """
+        spec = KINDS[ValueKind.NUM]
+        error = None
+        for element in elements:
+            try:
+                value = json.loads(element)
+            except ValueError:
+                value = None
+            if not spec.accepts(value):
+                error = "{!r} is not a valid number of {}".format(
+                    element.strip(), KINDS[ValueKind.NUM_LIST].name
+                )
+                self.errors[line_no] = error
+                break
+        return error
+
+    def is_valid(self) -> bool:
+        """Return True if no value validated has an error."""
+        return not self.errors
@@ -0,0 +1,410 @@
+r"""Search index of keys, paths and values over the line index.
+
+Lines are sorted by key, so the lines of a key are found by bisection, and the
+distinct keys of ContainerLineInfo are searched by regex in one string, so a query
+costs the number of distinct keys and results, not the number of lines. Numbers
+are in the array sorted by value for exact and range queries, and the other
+values are in the table of values. Modified values are moved in the index one by
+one.
+
+Query of SearchIndex.search:
+
+- ``kk``: keys starting with kk(fuzzy if nothing starts with it).
+- ``"kk"``: key kk exactly.
+- ``~kdw``: keys which have k, d and w in order(fuzzy).
+- ``dhrwodn.*.kk``, ``glossary[0]``, ``**``: path pattern of json_patterns.
+- ``=55``, ``="widn"``, ``=true``: values equal to the json(string if not json).
+- ``10..20``, ``..0``, ``1e3..``: numbers in the range including the ends.
+
+:author: ok97465
+:Date created: 26.10.18 18:10:51
+"""
+# %% Import
+# Standard library imports
+import json
+import re
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Local imports
+from json_core.json_diff import end_line
+from json_core.json_infos import ContainerLineInfo, ValueKind
+from json_core.json_patterns import PathPatternIndex, parse_pattern
+
+GetLine = Callable[[int], str]
+ValueKey = Tuple[str, Any]  # (type, value) which tells true from 1.
+
+_RANGE = re.compile(r"\s*([^.\s]*(?:\.[^.\s]+)*)\s*\.\.\s*(\S*)\s*")
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+def _parse_str(text: str) -> str:
+    """Return the string of the text between quotes."""
+    return text if "\\" not in text else json.loads('"' + text + '"')
+
+
+def _parse_literal(text: str) -> Any:
+    """Return the value of true, false or null."""
+    try:
+        return _LITERALS[text]
+    except KeyError:
+        raise ValueError("invalid literal: {!r}".format(text)) from None
+
+
+# kind: function returning the value of the text of value span.
+_PARSERS: Dict[int, Callable[[str], Any]] = {
+    ValueKind.NUM: float,
+    ValueKind.INT: int,
+    ValueKind.STR: _parse_str,
+    ValueKind.HEX_STR: _parse_str,
+    ValueKind.BOOL: _parse_literal,
+    ValueKind.NULL: _parse_literal,
+}  # The others are parsed by json.
+_NUMBERS = (ValueKind.NUM, ValueKind.INT)
+_WILDCARDS = ("*", "**", "[*]")
+
+
+def value_key(value: Any) -> Optional[ValueKey]:
+    """Return the key of scalar value in the index, None for container."""
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, (int, float)):
+        return ("number", value)
+    if isinstance(value, str):
+        return ("str", value)
+    if value is None:
+        return ("null", None)
+    return None
+
+
+class SearchIndex:
+    """Index of keys and values of the lines of line_infos.
+
+    get_line returns the current text of a line, which is the line of editor while
+    it is edited.
+    """
+
+    def __init__(
+        self,
+        line_infos: ContainerLineInfo,
+        get_line: GetLine,
+        lines: Optional[List[str]] = None,
+    ):
+        """Index the keys and values. lines are all the current lines if given."""
+        self.line_infos = line_infos
+        self.get_line = get_line
+        key_ids, parents = line_infos.key_ids, line_infos.parents
+        none = ValueKind.NONE
+        # Lines of values and containers except root and closing lines. The line
+        # after the opening line is its child or its closing line, which has the
+        # same parent and key.
+        key_lines = [
+            line_no
+            for line_no, (kind, parent, key_id, parent_next, key_id_next) in enumerate(
+                zip(line_infos.kinds, parents, key_ids, parents[1:], key_ids[1:])
+            )
+            if key_id != -1
+            and (
+                kind != none
+                or parent_next == line_no
+                or (parent_next == parent and key_id_next == key_id)
+            )
+        ]
+        key_lines.sort(key=key_ids.__getitem__)  # Stable, lines of key are in order.
+        self.key_lines = array("i", key_lines)
+        self.line_keys = array("i", map(key_ids.__getitem__, key_lines))  # Sorted
+
+        # Keys in lower case after line breaks for the regex of prefix and fuzzy
+        # query.
+        keys = line_infos.keys
+        if any("\n" in key for key in keys):
+            keys = [key.replace("\n", " ") for key in keys]
+        self.keys_text = ("\n" + "\n".join(keys)).lower()
+        self.key_starts = array(  # Positions of keys in keys_text and the end.
+            "i", [match.end() for match in re.finditer("\n", self.keys_text)]
+        )
+        self.key_starts.append(len(self.keys_text) + 1)
+
+        self.numbers = array("d")  # Sorted numbers.
+        self.number_lines = array("i")  # Lines of numbers.
+        self.number_of_line: Dict[int, float] = {}
+        self.lines_of_value: Dict[ValueKey, List[int]] = {}
+        self.value_of_line: Dict[int, ValueKey] = {}
+        if lines is None:
+            lines = [get_line(line_no) for line_no in range(len(line_infos))]
+        self._build_values(lines)
+
+    # %% Keys
+    def lines_of(self, key_id: int) -> array:
+        """Return the lines of key id(-2 - index for the elements of list)."""
+        line_keys = self.line_keys
+        start = bisect_left(line_keys, key_id)
+        return self.key_lines[start : bisect_right(line_keys, key_id, start)]
+
+    def find_key(self, key: str) -> array:
+        """Return the lines of key in order."""
+        key_id = self.line_infos.key_to_id.get(key, None)
+        return self.lines_of(key_id) if key_id is not None else array("i")
+
+    def find_prefix(self, prefix: str) -> Iterator[int]:
+        """Yield the lines of keys starting with prefix(case-insensitive).
+
+        Lines are grouped by key in the order of keys in the document, and the
+        keys are found lazily while the lines are consumed.
+        """
+        key_starts = self.key_starts
+        pattern = re.compile(re.escape("\n" + prefix.lower()))  # Literal search
+        key_ids = (
+            bisect_left(key_starts, match.start() + 1)
+            for match in pattern.finditer(self.keys_text)
+        )
+        return chain.from_iterable(map(self.lines_of, key_ids))
+
+    def has_prefix(self, prefix: str) -> bool:
+        """Return True if any key starts with prefix(case-insensitive)."""
+        return next(self.find_prefix(prefix), None) is not None
+
+    def find_fuzzy(self, query: str) -> Iterator[int]:
+        """Yield the lines of keys having the characters of query in order.
+
+        Keys are ranked by the length of match(closer characters first) and by the
+        length of key. The lines of a key are in order.
+        """
+        pattern = re.compile("[^\n]*?".join(map(re.escape, query.lower())))
+        key_starts = self.key_starts
+        scores: Dict[int, int] = {}
+        for match in pattern.finditer(self.keys_text):
+            key_id = bisect_right(key_starts, match.start()) - 1
+            score = match.end() - match.start()
+            if score < scores.get(key_id, score + 1):
+                scores[key_id] = score
+        ranked = sorted(
+            scores,
+            key=lambda key_id: (
+                scores[key_id],
+                key_starts[key_id + 1] - key_starts[key_id],  # Length of key
+            ),
+        )
+        return chain.from_iterable(map(self.lines_of, ranked))
+
+    def find_path(self, pattern: str) -> Iterator[int]:
+        """Yield the lines of the path pattern in order.
+
+        Only the lines of the last key(index) of pattern are checked if it ends
+        with the key, otherwise only the containers of the key are walked.
+        """
+        patterns = PathPatternIndex({pattern: True})
+        tokens = parse_pattern(pattern)
+        idx = len(tokens) - 1
+        while idx >= 0 and tokens[idx] in _WILDCARDS:
+            idx -= 1
+        if idx < 0:
+            line_root_end = len(self.line_infos) - 1
+            return self._walk(patterns, PathPatternIndex.ROOT, 0, line_root_end)
+        anchor = tokens[idx]
+        if isinstance(anchor, int):
+            candidates = self.lines_of(-2 - anchor)
+        else:
+            candidates = self.find_key(anchor)
+        if idx == len(tokens) - 1:
+            path = self.line_infos.path
+            return (line for line in candidates if patterns.match(path(line)))
+        return self._walk_anchors(patterns, candidates)
+
+    def _walk_anchors(
+        self, patterns: PathPatternIndex, anchors: Iterable[int]
+    ) -> Iterator[int]:
+        """Yield the lines matching patterns in the lines of anchors."""
+        line_infos = self.line_infos
+        line_end = -1
+        for anchor in anchors:
+            if anchor <= line_end:
+                continue  # In the container walked.
+            state = PathPatternIndex.ROOT
+            for key in line_infos.path(anchor):
+                state = patterns.step(state, key)
+            if state == patterns.dead:
+                continue
+            if patterns.value(state):
+                yield anchor
+            if line_infos.kinds[anchor] == ValueKind.NONE:
+                line_end = end_line(line_infos, anchor)
+                yield from self._walk(patterns, state, anchor, line_end)
+
+    def _walk(
+        self, patterns: PathPatternIndex, state: int, line_from: int, line_to: int
+    ) -> Iterator[int]:
+        """Yield the lines matching patterns in the container opened at line_from.
+
+        state is the state of the container, and line_to is its closing line.
+        """
+        line_infos = self.line_infos
+        keys, parents, key_ids = line_infos.keys, line_infos.parents, line_infos.key_ids
+        kinds = line_infos.kinds
+        states = {line_from: state}
+        step, value, dead = patterns.step, patterns.value, patterns.dead
+        none = ValueKind.NONE
+        for line_no in range(line_from + 1, line_to):
+            state = states.get(parents[line_no], None)
+            if state is None:
+                continue  # In container which does not match.
+            key_id = key_ids[line_no]
+            if kinds[line_no] == none and (
+                parents[line_no + 1] != line_no
+                and (
+                    parents[line_no + 1] != parents[line_no]
+                    or key_ids[line_no + 1] != key_id
+                )
+            ):
+                continue  # Closing line(see __init__)
+            state = step(state, keys[key_id] if key_id >= 0 else -2 - key_id)
+            if state == dead:
+                continue
+            if kinds[line_no] == none:
+                states[line_no] = state
+            if value(state):
+                yield line_no
+
+    # %% Values
+    def _parse(self, line_no: int, line: str) -> Any:
+        """Return the value of the line. ValueError is raised if it is not json."""
+        line_infos = self.line_infos
+        kind = line_infos.kinds[line_no]
+        parse = _PARSERS.get(kind, None)
+        if parse is not None:
+            return parse(line[line_infos.starts[line_no] : line_infos.ends[line_no]])
+        return json.loads(line_infos.literal_of_value(line_no, line))
+
+    def _build_values(self, lines: List[str]):
+        """Index the scalar values of lines by kind."""
+        line_infos = self.line_infos
+        starts, ends, kinds = line_infos.starts, line_infos.ends, line_infos.kinds
+        kinds_bytes = kinds.tobytes()
+        for kind in set(kinds_bytes):
+            if kind in (ValueKind.NONE, ValueKind.NUM_LIST, ValueKind.STR_LIST):
+                continue
+            lines_kind = [
+                match.start()
+                for match in re.finditer(re.escape(bytes([kind])), kinds_bytes)
+            ]
+            parse = _PARSERS.get(kind, None)
+            try:
+                if parse is None:
+                    raise ValueError("parsed by json")
+                values = list(
+                    map(
+                        parse,
+                        [
+                            lines[line_no][starts[line_no] : ends[line_no]]
+                            for line_no in lines_kind
+                        ],
+                    )
+                )
+            except ValueError:  # Being edited, or the other kinds.
+                values = [self._parse_or_none(line_no, lines) for line_no in lines_kind]
+            if kind in _NUMBERS:
+                self.number_of_line.update(
+                    (line_no, value)
+                    for line_no, value in zip(lines_kind, values)
+                    if value is not None and value == value  # Not NaN
+                )
+                continue
+            lines_of_value, value_of_line = self.lines_of_value, self.value_of_line
+            for line_no, value in zip(lines_kind, values):
+                key = value_key(value)
+                if key is not None:
+                    lines_of_value.setdefault(key, []).append(line_no)
+                    value_of_line[line_no] = key
+        for lines_value in self.lines_of_value.values():
+            lines_value.sort()
+        number_of_line = self.number_of_line
+        number_lines = sorted(number_of_line, key=number_of_line.__getitem__)
+        self.numbers = array("d", map(number_of_line.__getitem__, number_lines))
+        self.number_lines = array("i", number_lines)
+
+    def _parse_or_none(self, line_no: int, lines: List[str]) -> Any:
+        """Return the value of the line, None if it is not json."""
+        try:
+            return self._parse(line_no, lines[line_no])
+        except ValueError:
+            return None
+
+    def find_value(self, value: Any) -> List[int]:
+        """Return the lines of values equal to value in order."""
+        key = value_key(value)
+        if key is None:
+            return []
+        if key[0] == "number":
+            return self.find_range(value, value)
+        return list(self.lines_of_value.get(key, []))
+
+    def find_range(
+        self, low: Optional[float] = None, high: Optional[float] = None
+    ) -> List[int]:
+        """Return the lines of numbers in [low, high] in order. None is no limit."""
+        numbers = self.numbers
+        start = 0 if low is None else bisect_left(numbers, low)
+        stop = len(numbers) if high is None else bisect_right(numbers, high)
+        return sorted(self.number_lines[start:stop])
+
+    def update_value(self, line_no: int):
+        """Move the value of the modified line in the index of values."""
+        old = self.number_of_line.pop(line_no, None)
+        if old is not None:
+            idx = bisect_left(self.numbers, float(old))
+            while self.number_lines[idx] != line_no:
+                idx += 1
+            del self.numbers[idx]
+            del self.number_lines[idx]
+        key = self.value_of_line.pop(line_no, None)
+        if key is not None:
+            self.lines_of_value[key].remove(line_no)
+
+        try:
+            value = self._parse(line_no, self.get_line(line_no))
+        except ValueError:
+            return  # Indexed when it becomes valid.
+        key = value_key(value)
+        if key is None or value != value:  # Container or NaN
+            return
+        if key[0] == "number":
+            idx = bisect_right(self.numbers, value)
+            self.numbers.insert(idx, value)
+            self.number_lines.insert(idx, line_no)
+            self.number_of_line[line_no] = value
+        else:
+            insort(self.lines_of_value.setdefault(key, []), line_no)
+            self.value_of_line[line_no] = key
+
+    # %% Query
+    def search(self, query: str) -> Iterable[int]:
+        """Return the lines of query(see the docstring of module)."""
+        query = query.strip()
+        if not query:
+            return []
+        if query[0] == "=":
+            text = query[1:].strip()
+            try:
+                value = json.loads(text)
+            except ValueError:
+                value = text
+            return self.find_value(value)
+        match = _RANGE.fullmatch(query)
+        if match is not None:
+            try:
+                low, high = (float(text) if text else None for text in match.groups())
+            except ValueError:
+                pass
+            else:
+                return self.find_range(low, high)
+        if query[0] == "~":
+            return self.find_fuzzy(query[1:])
+        if len(query) > 1 and query[0] == query[-1] == '"':
+            return self.find_key(query[1:-1])
+        if any(char in query for char in ".[*"):
+            return self.find_path(query)
+        if self.has_prefix(query):
+            return self.find_prefix(query)
+        return self.find_fuzzy(query)
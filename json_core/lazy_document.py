@@ -0,0 +1,356 @@
+r"""Lazy json document on memory-mapped file.
+
+Only the containers which are expanded are scanned for the boundaries of their
+children, and the other containers are written as folded placeholders. Values are
+parsed from the bytes of the file when their lines are written, so memory is in
+proportion to the expanded part of the document, not to the size of file.
+
+Edits are kept as the replacements of byte ranges of values, and save writes only
+the replaced ranges in place if their lengths are the same, otherwise the file is
+copied in chunks with the replacements spliced.
+
+:author: ok97465
+:Date created: 26.10.18 11:20:07
+"""
+# %% Import
+# Standard library imports
+import json
+import mmap
+import os
+import re
+import tempfile
+from array import array
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Local imports
+from json_core.json_formatting import LineMeta, PrettyJsonWriter, line_meta
+from json_core.value_kinds import ValueKind
+
+JsonPath = Tuple[Any, ...]
+
+_WS = re.compile(rb"[ \t\n\r]*")
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"', re.S)
+_NESTED = re.compile(rb'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.S)  # Commas are skipped.
+_SCALAR_END = re.compile(rb"[ \t\n\r]*(?:[,}\]]|$)")
+
+SCALAR, OBJECT, ARRAY = 0, 1, 2  # Kinds of child.
+N_BYTES_COPY = 1 << 24  # Chunk of copy in save.
+
+_OPENING = {ord("{"): OBJECT, ord("["): ARRAY}
+_PLACEHOLDERS = {OBJECT: "{...}", ARRAY: "[...]"}
+
+
+def _skip_ws(buf, pos: int) -> int:
+    """Return the position after whitespace."""
+    return _WS.match(buf, pos).end()
+
+
+def _end_of_container(buf, pos: int) -> int:
+    """Return the position after the bracket closing the container at pos."""
+    depth = 0
+    for match in _NESTED.finditer(buf, pos):
+        char = buf[match.start()]
+        if char == 0x22:  # String
+            continue
+        depth += 1 if char in (0x7B, 0x5B) else -1
+        if depth == 0:
+            return match.end()
+    raise ValueError("container at {} is not closed".format(pos))
+
+
+def _end_of_value(buf, pos: int) -> int:
+    """Return the position after the value at pos."""
+    char = buf[pos]
+    if char in _OPENING:
+        return _end_of_container(buf, pos)
+    if char == 0x22:
+        match = _STRING.match(buf, pos)
+        if match is None:
+            raise ValueError("string at {} is not closed".format(pos))
+        return match.end()
+    return _SCALAR_END.search(buf, pos).start()
+
+
+class LazyNode:
+    """Boundaries of the children of a container."""
+
+    __slots__ = ("kind", "start", "end", "keys", "starts", "ends", "kinds", "index")
+
+    def __init__(self, buf, start: int, end: int):
+        """Scan the children of the container in buf[start:end]."""
+        self.kind = _OPENING[buf[start]]
+        self.start, self.end = start, end
+        self.keys: List[Any] = []
+        self.starts, self.ends, self.kinds = array("q"), array("q"), array("b")
+
+        is_object = self.kind == OBJECT
+        pos = _skip_ws(buf, start + 1)
+        if buf[pos] in (0x7D, 0x5D):  # Empty
+            pos = end
+        while pos < end - 1:
+            if is_object:
+                match = _STRING.match(buf, pos)
+                if match is None:
+                    raise ValueError("key is expected at {}".format(pos))
+                self.keys.append(json.loads(match.group()))
+                pos = _skip_ws(buf, match.end())
+                if buf[pos] != 0x3A:
+                    raise ValueError("':' is expected at {}".format(pos))
+                pos = _skip_ws(buf, pos + 1)
+            else:
+                self.keys.append(len(self.keys))
+            pos_end = _end_of_value(buf, pos)
+            self.starts.append(pos)
+            self.ends.append(pos_end)
+            self.kinds.append(_OPENING.get(buf[pos], SCALAR))
+            pos = _skip_ws(buf, pos_end)
+            if buf[pos] != 0x2C:  # The last child.
+                break
+            pos = _skip_ws(buf, pos + 1)
+        self.index = None
+        if is_object:
+            self.index = {key: idx for idx, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        """Return the number of children."""
+        return len(self.keys)
+
+    def find(self, key: Any) -> int:
+        """Return the index of child of key. KeyError is raised if not found."""
+        if self.index is None:
+            if isinstance(key, int) and 0 <= key < len(self.keys):
+                return key
+            raise KeyError(key)
+        return self.index[key]
+
+
+class LazyDocument:
+    """Json file formatted in part by the expanded containers."""
+
+    def __init__(self, path: str, writer: Optional[PrettyJsonWriter] = None):
+        """."""
+        self.path = path
+        self.writer = writer or PrettyJsonWriter(indent=2)
+        self.expanded: Set[JsonPath] = {()}
+        self.edits: Dict[int, Tuple[int, bytes]] = {}  # start: (end, bytes)
+        self._edit_starts: List[int] = []  # Sorted keys of edits.
+        self._file = None
+        self.buf = None
+        self.open()
+
+    def open(self):
+        """Map the file and find the root."""
+        self.close()
+        self._file = open(self.path, "rb")
+        if os.fstat(self._file.fileno()).st_size == 0:  # mmap can not map it.
+            self._file.close()
+            self._file = None
+            raise ValueError("{} is empty".format(self.path))
+        self.buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.nodes: Dict[JsonPath, LazyNode] = {}  # Scanned containers.
+        self.root_start = _skip_ws(self.buf, 0)
+        self.root_end = _end_of_value(self.buf, self.root_start)
+
+    def close(self):
+        """Unmap the file."""
+        if self.buf is not None:
+            self.buf.close()
+            self._file.close()
+            self.buf = self._file = None
+
+    def __enter__(self) -> "LazyDocument":
+        """."""
+        return self
+
+    def __exit__(self, *args):
+        """."""
+        self.close()
+
+    def node(self, path: JsonPath) -> LazyNode:
+        """Return the node of the container of path, scanned at the first call."""
+        node = self.nodes.get(path, None)
+        if node is None:
+            if path:
+                parent = self.node(path[:-1])
+                idx = parent.find(path[-1])
+                start, end = parent.starts[idx], parent.ends[idx]
+            else:
+                start, end = self.root_start, self.root_end
+            if self.buf[start] not in _OPENING:
+                raise KeyError(path)
+            node = self.nodes[path] = LazyNode(self.buf, start, end)
+        return node
+
+    def span(self, path: JsonPath) -> Tuple[int, int]:
+        """Return the byte range of the value of path in the file."""
+        if not path:
+            return self.root_start, self.root_end
+        parent = self.node(path[:-1])
+        idx = parent.find(path[-1])
+        return parent.starts[idx], parent.ends[idx]
+
+    def raw(self, start: int, end: int) -> bytes:
+        """Return the bytes of value with the edits inside of the range."""
+        if not self.edits:
+            return self.buf[start:end]
+        starts = self._edit_starts
+        chunks, pos = [], start
+        for pos_edit in starts[bisect_left(starts, start) : bisect_left(starts, end)]:
+            pos_end, data = self.edits[pos_edit]
+            chunks.append(self.buf[pos:pos_edit])
+            chunks.append(data)
+            pos = pos_end
+        chunks.append(self.buf[pos:end])
+        return b"".join(chunks)
+
+    def value(self, path: JsonPath = ()) -> Any:
+        """Return the parsed value of path with edits."""
+        return json.loads(self.raw(*self.span(path)))
+
+    def set_literal(self, path: JsonPath, literal: str):
+        """Replace the json text of the value of path which is not folded.
+
+        ValueError is raised if literal is not json written in one line.
+        """
+        start, end = self.span(path)
+        in_list = bool(path) and isinstance(path[-1], int)
+        if self._inline(start, end, in_list) is None:
+            raise KeyError(path)  # Container written in lines has no value.
+        if self.writer._split(json.loads(literal), in_list)[1] is not None:
+            raise ValueError("{} is not written in one line".format(literal))
+        if start not in self.edits:
+            insort(self._edit_starts, start)
+        self.edits[start] = (end, literal.encode("utf-8"))
+
+    def is_expandable(self, path: JsonPath) -> bool:
+        """Return True if the value of path is a container written in lines."""
+        start, end = self.span(path)
+        in_list = bool(path) and isinstance(path[-1], int)
+        return self._inline(start, end, in_list) is None
+
+    def expand(self, path: JsonPath):
+        """Write the container of path in lines."""
+        for idx in range(len(path) + 1):
+            if self.is_expandable(path[:idx]):
+                self.expanded.add(path[:idx])
+
+    def collapse(self, path: JsonPath):
+        """Fold the container of path and forget the nodes in it."""
+        if not path:
+            return
+        n_key = len(path)
+        self.expanded = {p for p in self.expanded if p[:n_key] != path}
+        for p in [p for p in self.nodes if p[:n_key] == path]:
+            del self.nodes[p]
+
+    def _inline(self, start: int, end: int, in_list: bool) -> Optional[Tuple]:
+        """Return _split of PrettyJsonWriter if the value is written in one line.
+
+        Containers are parsed only if they have no string or container, so a list
+        of numbers is in one line whatever its size, as the formatter writes it.
+        """
+        buf = self.buf
+        if buf[start] in _OPENING and _NESTED.search(buf, start + 1, end - 1):
+            return None
+        split = self.writer._split(json.loads(self.raw(start, end)), in_list)
+        return split if split[1] is None else None
+
+    def iterlines_with_index(self):
+        """Yield the lines of the expanded part with LineMeta.
+
+        Folded containers are written as placeholders, which have no value.
+        """
+        writer = self.writer
+        split = self._inline(self.root_start, self.root_end, False)
+        if split is not None:
+            text, _, _, kind = split
+            yield text, line_meta(0, text, kind, -1, None)
+            return
+
+        line_no = 0
+        node = self.node(())
+        line = "{" if node.kind == OBJECT else "["
+        yield line, line_meta(0, line, ValueKind.NONE, -1, None)
+        # [path, node, index of next child, indent, line opening node, closing line]
+        close = "}" if node.kind == OBJECT else "]"
+        stack = [[(), node, 0, writer.indent, 0, close]]
+        while stack:
+            frame = stack[-1]
+            path, node, idx, pad, line_open = frame[:5]
+            if idx == len(node):
+                stack.pop()
+                line_no += 1
+                parent = stack[-1][4] if stack else -1
+                key = path[-1] if path else None
+                yield frame[5], line_meta(0, frame[5], ValueKind.NONE, parent, key)
+                continue
+
+            frame[2] += 1
+            line_no += 1
+            key = node.keys[idx]
+            comma = "," if idx + 1 < len(node) else ""
+            prefix = pad + writer.key(key) + ": " if node.kind == OBJECT else pad
+            kind = node.kinds[idx]
+            split = self._inline(node.starts[idx], node.ends[idx], node.kind == ARRAY)
+            if split is not None:
+                text, _, _, val_kind = split
+                line = prefix + text + comma
+                yield line, line_meta(len(prefix), line, val_kind, line_open, key)
+                continue
+
+            path_child = path + (key,)
+            if path_child in self.expanded:
+                close = pad + ("}" if kind == OBJECT else "]") + comma
+                line = prefix + ("{" if kind == OBJECT else "[")
+                child = self.node(path_child)
+                stack.append(
+                    [path_child, child, 0, pad + writer.indent, line_no, close]
+                )
+            else:
+                line = prefix + _PLACEHOLDERS[kind] + comma
+            yield line, line_meta(0, line, ValueKind.NONE, line_open, key)
+
+    def is_modified(self) -> bool:
+        """Return True if there are edits not saved."""
+        return bool(self.edits)
+
+    def save(self):
+        """Write the edits to the file.
+
+        The replaced ranges are written in place if no edit changes the length,
+        otherwise the file is copied with the edits to a temporary file which
+        replaces the file.
+        """
+        if not self.edits:
+            return
+        edits = sorted(self.edits.items())
+        if all(end - start == len(data) for start, (end, data) in edits):
+            with open(self.path, "r+b") as fp:
+                for start, (_, data) in edits:
+                    fp.seek(start)
+                    fp.write(data)
+            self.edits.clear()
+            self._edit_starts.clear()
+            return
+
+        dir_name = os.path.dirname(os.path.abspath(self.path))
+        fd, path_tmp = tempfile.mkstemp(dir=dir_name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fp:
+                pos = 0
+                for start, (end, data) in edits + [(len(self.buf), (0, b""))]:
+                    for pos_chunk in range(pos, start, N_BYTES_COPY):
+                        pos_chunk_end = min(pos_chunk + N_BYTES_COPY, start)
+                        fp.write(self.buf[pos_chunk:pos_chunk_end])
+                    fp.write(data)
+                    pos = end
+            self.close()
+            os.replace(path_tmp, self.path)
+        except BaseException:
+            if os.path.exists(path_tmp):
+                os.remove(path_tmp)
+            raise
+        self.edits.clear()
+        self._edit_starts.clear()
+        self.open()
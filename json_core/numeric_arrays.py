@@ -0,0 +1,180 @@
+r"""Numeric lists held in NumPy array for bulk editing.
+
+NumPy is optional and imported at the first use. The text of numbers is the same
+as PrettyJsonWriter.inline_list, so the document written from the array keeps the
+layout of the formatter. Numbers are converted to text by float.__repr__ mapped
+over the array, which is faster than the string conversion of NumPy and gives the
+shortest representation by definition.
+
+:author: ok97465
+:Date created: 26.10.18 09:12:44
+"""
+# %% Import
+# Standard library imports
+import json
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+Number = Union[int, float]
+MAX_EXACT_INT = 1 << 53  # Integers above it can not be held in float64 exactly.
+
+_np: Any = None
+
+
+def _numpy():
+    """Return numpy module imported at the first call."""
+    global _np
+    if _np is None:
+        import numpy
+
+        _np = numpy
+    return _np
+
+
+def numpy_available() -> bool:
+    """Return True if NumPy can be imported."""
+    try:
+        _numpy()
+    except ImportError:
+        return False
+    return True
+
+
+def _check_number(value: Any) -> Number:
+    """Return value if it is int or float(not bool), otherwise raise ValueError."""
+    if type(value) not in (int, float):
+        raise ValueError("{!r} is not a number".format(value))
+    if type(value) is int and abs(value) > MAX_EXACT_INT:
+        raise ValueError("{!r} can not be held exactly".format(value))
+    return value
+
+
+class NumericArray:
+    """Numbers of numeric list in float64 array with the mask of integers.
+
+    The mask keeps the text of integers(1 not 1.0), so formatting is the same as
+    the numbers of the list which python json gives.
+    """
+
+    __slots__ = ("values", "is_int")
+
+    def __init__(self, numbers: Sequence[Number]):
+        """ValueError is raised if numbers has bool or too large integer."""
+        np = _numpy()
+        n_number = len(numbers)
+        self.is_int = np.fromiter(
+            (type(_check_number(val)) is int for val in numbers), bool, n_number
+        )
+        self.values = np.array(numbers, dtype=np.float64).reshape(n_number)
+
+    @classmethod
+    def from_text(cls, text: str) -> "NumericArray":
+        """Return array of the text between brackets of numeric list."""
+        return cls(json.loads("[" + text + "]"))
+
+    def __len__(self) -> int:
+        """Return the number of elements."""
+        return len(self.values)
+
+    def __getitem__(self, idx: int) -> Number:
+        """Return the number of idx-th element."""
+        value = self.values[idx].item()
+        return int(value) if self.is_int[idx] else value
+
+    def to_list(self, start: int = 0, stop: Optional[int] = None) -> List[Number]:
+        """Return the numbers as list of int and float."""
+        np = _numpy()
+        values, is_int = self.values[start:stop], self.is_int[start:stop]
+        if is_int.all():
+            return values.astype(np.int64).tolist()
+        numbers = values.tolist()
+        idx_int = np.flatnonzero(is_int)
+        ints = values[idx_int].astype(np.int64).tolist()
+        for idx, val in zip(idx_int.tolist(), ints):
+            numbers[idx] = val
+        return numbers
+
+    def texts(self, start: int = 0, stop: Optional[int] = None) -> List[str]:
+        """Return the json text of each number."""
+        np = _numpy()
+        values, is_int = self.values[start:stop], self.is_int[start:stop]
+        if is_int.all():
+            return list(map(int.__repr__, values.astype(np.int64).tolist()))
+
+        texts = list(map(float.__repr__, values.tolist()))
+        idx_int = np.flatnonzero(is_int)
+        ints = values[idx_int].astype(np.int64).tolist()
+        for idx, val in zip(idx_int.tolist(), ints):
+            texts[idx] = int.__repr__(val)
+        idx_not_finite = np.flatnonzero(~np.isfinite(values))
+        for idx in idx_not_finite.tolist():
+            val = values[idx]
+            texts[idx] = "NaN" if val != val else "Infinity" if val > 0 else "-Infinity"
+        return texts
+
+    def format(self, start: int = 0, stop: Optional[int] = None) -> str:
+        """Return the elements in the text of PrettyJsonWriter.inline_list."""
+        return ", ".join(self.texts(start, stop))
+
+    def _range(self, start: int, stop: Optional[int]) -> Tuple[int, int]:
+        """Return the range clipped to the array."""
+        start, stop, _ = slice(start, stop).indices(len(self.values))
+        return start, max(start, stop)
+
+    def _assign(self, start: int, stop: int, values, is_int):
+        """Assign values after checking integers are exact."""
+        np = _numpy()
+        if np.any(is_int & (np.abs(values) > MAX_EXACT_INT)):
+            raise ValueError("integers can not be held exactly")
+        self.values[start:stop] = values
+        self.is_int[start:stop] = is_int
+
+    def scale(
+        self, factor: Number, start: int = 0, stop: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Multiply the elements by factor, and return the range modified."""
+        start, stop = self._range(start, stop)
+        is_int = self.is_int[start:stop] & (type(_check_number(factor)) is int)
+        self._assign(start, stop, self.values[start:stop] * factor, is_int)
+        return start, stop
+
+    def offset(
+        self, delta: Number, start: int = 0, stop: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Add delta to the elements, and return the range modified."""
+        start, stop = self._range(start, stop)
+        is_int = self.is_int[start:stop] & (type(_check_number(delta)) is int)
+        self._assign(start, stop, self.values[start:stop] + delta, is_int)
+        return start, stop
+
+    def fill(
+        self, value: Number, start: int = 0, stop: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """Set the elements to value, and return the range modified."""
+        is_int = type(_check_number(value)) is int
+        start, stop = self._range(start, stop)
+        self.values[start:stop] = value
+        self.is_int[start:stop] = is_int
+        return start, stop
+
+    def paste_column(
+        self, column: Union[str, Sequence[Number]], start: int = 0
+    ) -> Tuple[int, int]:
+        """Set the elements from start to the numbers of column.
+
+        column is the numbers or the text of numbers separated by line breaks like
+        the column copied from spreadsheet. ValueError is raised if it does not fit
+        in the array.
+        """
+        if isinstance(column, str):
+            column = [json.loads(line) for line in column.split() if line]
+        pasted = NumericArray(column)
+        stop = start + len(pasted)
+        if not 0 <= start <= stop <= len(self.values):
+            raise ValueError(
+                "{} numbers from {} do not fit in {} elements".format(
+                    len(pasted), start, len(self.values)
+                )
+            )
+        self.values[start:stop] = pasted.values
+        self.is_int[start:stop] = pasted.is_int
+        return start, stop
@@ -0,0 +1,223 @@
+r"""Opt-in instrumentation of hot paths.
+
+Methods marked by hot_path in classes decorated by instrument are replaced by
+timing wrappers only while instrumentation is enabled, so the marked methods run
+unchanged when it is disabled.
+
+Instrumentation is enabled by enable() or by the environment variables. A signal
+connected to a bound method keeps its function, so the hot paths are connected
+by slot(method), which looks the method up at each call and is timed even if it
+was connected before enable().
+
+- JSON_VALUE_EDITOR_PERF=1: enable at import.
+- JSON_VALUE_EDITOR_PERF_TRACE=<path>: enable at import, and write the trace of
+  calls in the Chrome trace event format(chrome://tracing, Perfetto) on exit.
+
+:author: ok97465
+:Date created: 26.10.17 20:40:18
+"""
+# %% Import
+# Standard library imports
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+ENV_PERF = "JSON_VALUE_EDITOR_PERF"
+ENV_TRACE = "JSON_VALUE_EDITOR_PERF_TRACE"
+N_TRACE_EVENT = 1_000_000  # The oldest events are dropped.
+N_BUCKET = 40  # Bucket i counts durations below 2 ** i microseconds.
+
+
+class _Stat:
+    """Count and histogram of the durations of one hot path."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        """."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * N_BUCKET
+
+    def add(self, seconds: float):
+        """Add duration."""
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.buckets[min(int(seconds * 1e6).bit_length(), N_BUCKET - 1)] += 1
+
+    def percentile(self, ratio: float) -> float:
+        """Return the upper bound of the bucket of the percentile in ms."""
+        n_target, n_sum = ratio * self.count, 0
+        for idx, n in enumerate(self.buckets):
+            n_sum += n
+            if n and n_sum >= n_target:
+                return min((1 << idx) * 1e-3, self.max * 1e3)
+        return self.max * 1e3
+
+    def to_dict(self) -> Dict:
+        """Return summary in milliseconds."""
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1e3,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p90_ms": self.percentile(0.9),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max * 1e3,
+            # Upper bound of bucket in microseconds: count
+            "histogram_us": {
+                1 << idx: n for idx, n in enumerate(self.buckets) if n
+            },
+        }
+
+
+_hot_paths: List[Tuple[type, str, Callable, str]] = []  # class, attr, func, name
+_stats: Dict[str, _Stat] = {}
+_trace: Deque[Tuple[str, int, float, float]] = deque(maxlen=N_TRACE_EVENT)
+_lock = threading.Lock()
+_enabled = False
+_trace_path: Optional[str] = None
+_time_origin = time.perf_counter()
+
+
+def hot_path(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Mark method as hot path. The method itself is returned."""
+
+    def mark(func: Callable) -> Callable:
+        func.__hot_path__ = name or func.__qualname__
+        return func
+
+    return mark
+
+
+def instrument(cls: type) -> type:
+    """Register the hot paths of class."""
+    for attr, func in list(vars(cls).items()):
+        name = getattr(func, "__hot_path__", None)
+        if name is not None:
+            _hot_paths.append((cls, attr, func, name))
+            if _enabled:
+                setattr(cls, attr, _wrap(func, name))
+    return cls
+
+
+class _Slot:
+    """Slot calling the method of the object looked up at each call."""
+
+    __slots__ = ("ref", "name")
+
+    def __init__(self, method: Callable):
+        """."""
+        self.ref = weakref.ref(method.__self__)  # As a connection of bound method.
+        self.name = method.__name__
+
+    def __call__(self, *args):
+        """."""
+        obj = self.ref()
+        if obj is not None:
+            return getattr(obj, self.name)(*args)
+
+
+def slot(method: Callable) -> Callable:
+    """Return the slot of signal for the bound method of hot path."""
+    return _Slot(method)
+
+
+def _wrap(func: Callable, name: str) -> Callable:
+    """Return timing wrapper of func."""
+    stat = _stats.setdefault(name, _Stat())
+    perf_counter, get_ident = time.perf_counter, threading.get_ident
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            end = perf_counter()
+            with _lock:
+                stat.add(end - start)
+                _trace.append((name, get_ident(), start, end))
+
+    return wrapper
+
+
+def enable(trace_path: Optional[str] = None):
+    """Enable instrumentation. If trace_path is given, the trace is written on exit."""
+    global _enabled, _trace_path
+    if trace_path is not None:
+        if _trace_path is None:
+            atexit.register(_dump_trace_on_exit)
+        _trace_path = trace_path
+    if _enabled:
+        return
+    _enabled = True
+    for cls, attr, func, name in _hot_paths:
+        setattr(cls, attr, _wrap(func, name))
+
+
+def disable():
+    """Disable instrumentation. Collected stats are kept."""
+    global _enabled
+    _enabled = False
+    for cls, attr, func, _ in _hot_paths:
+        setattr(cls, attr, func)
+
+
+def is_enabled() -> bool:
+    """Return True if instrumentation is enabled."""
+    return _enabled
+
+
+def reset():
+    """Clear stats and trace."""
+    with _lock:
+        for stat in _stats.values():
+            stat.__init__()
+        _trace.clear()
+
+
+def stats() -> Dict[str, Dict]:
+    """Return count, latency percentiles and histogram of each hot path."""
+    with _lock:
+        return {name: stat.to_dict() for name, stat in _stats.items() if stat.count}
+
+
+def dump_trace(path: str):
+    """Write the trace of calls in the Chrome trace event format."""
+    pid = os.getpid()
+    with _lock:
+        events = [
+            {
+                "name": name,
+                "ph": "X",
+                "pid": pid,
+                "tid": tid,
+                "ts": (start - _time_origin) * 1e6,
+                "dur": (end - start) * 1e6,
+            }
+            for name, tid, start, end in _trace
+        ]
+    with open(path, "w") as fp:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fp)
+
+
+def _dump_trace_on_exit():
+    """Write trace to the path given by enable or the environment variable."""
+    if _trace_path is not None:
+        dump_trace(_trace_path)
+
+
+if os.environ.get(ENV_TRACE):
+    enable(os.environ[ENV_TRACE])
+elif os.environ.get(ENV_PERF, "") not in ("", "0"):
+    enable()
@@ -0,0 +1,318 @@
+r"""Registry of the kinds of json values which can be edited in a line.
+
+Each kind has the shared classifier of characters which can be typed in the value
+and finds the span of the value in the line, so the line index stores only the
+id of the kind. A kind is added by registering ValueKindSpec without touching the
+editor.
+
+:author: ok97465
+:Date created: 26.10.17 21:32:05
+"""
+# %% Import
+# Standard library imports
+import re
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+N_ASCII = 128
+
+
+class ValueData(NamedTuple):
+    """Value Data."""
+
+    display: str
+    data: str
+
+
+class ValueKind:
+    """Json value type constants.
+
+    NONE, NUM, NUM_LIST and STR keep their ids of the previous versions.
+    """
+
+    NONE = 0  # The line has no value(key of container, closing bracket).
+    NUM = 1  # Number with fraction or exponent.
+    NUM_LIST = 2  # List of numbers in one line.
+    STR = 3  # String.
+    BOOL = 4
+    NULL = 5
+    INT = 6  # Integer, if INT_SPEC is registered.
+    HEX_STR = 7  # String of hexadecimal number like "0x1F".
+    STR_LIST = 8  # String in list. Each string of list is in its own line.
+
+
+class CharClass:
+    """Classifier of characters by the bitmap of ascii.
+
+    Characters out of ascii are allowed by allow_non_ascii if they are printable.
+    """
+
+    __slots__ = ("bitmap", "allow_non_ascii", "chars")
+
+    def __init__(self, chars: str = "", allow_non_ascii: bool = False):
+        """."""
+        bitmap = bytearray(N_ASCII)
+        for char in chars:
+            bitmap[ord(char)] = 1
+        self.bitmap = bytes(bitmap)
+        self.allow_non_ascii = allow_non_ascii
+        self.chars = chars  # Ascii characters allowed.
+
+    def __contains__(self, char: str) -> bool:
+        """Return True if char is allowed. Empty string is not allowed."""
+        if len(char) != 1:
+            return False
+        code = ord(char)
+        if code < N_ASCII:
+            return self.bitmap[code] == 1
+        return self.allow_non_ascii and char.isprintable()
+
+    def __bool__(self) -> bool:
+        """Return False if no character is allowed."""
+        return bool(self.chars) or self.allow_non_ascii
+
+    def contains_all(self, text: str) -> bool:
+        """Return True if all characters of text are allowed."""
+        if text.isascii():
+            bitmap = self.bitmap
+            return all(bitmap[code] for code in text.encode("ascii"))
+        return all(char in self for char in text)
+
+
+CHARS_NUM = "-.0123456789eE "
+CHARS_INT = "-0123456789"
+CHARS_HEX = "0123456789abcdefABCDEFxX"
+CHARS_STR = (
+    "0123456789"
+    "abcdefghijklmnopqrstuvwxyz"
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    "!#$%&'()*+,-./:;<=>?@[]^_`{|}~ "
+)
+
+_HEX = re.compile(r"0[xX][0-9a-fA-F]+")
+
+
+def _find_end_unquoted(line: str) -> int:
+    """Return the end of value which is not closed by a character."""
+    if line.rstrip()[-1:] == ",":
+        return line.rfind(",")
+    return len(line)
+
+
+class ValueKindSpec:
+    """Kind of json value.
+
+    types and detect(value, in_list) classify python value into the kind. Kinds
+    which have the same type are tried in the order of priority(high first), and
+    detect=None accepts every value of the types. in_list is True for the items of
+    list which is not written in one line.
+    """
+
+    __slots__ = (
+        "kind",
+        "name",
+        "chars",
+        "end_char",
+        "types",
+        "detect",
+        "priority",
+        "val_list",
+    )
+
+    def __init__(
+        self,
+        kind: int,
+        name: str,
+        chars: CharClass,
+        end_char: str = "",
+        types: Tuple[type, ...] = (),
+        detect: Optional[Callable[[Any, bool], bool]] = None,
+        priority: int = 0,
+        val_list: Optional[List] = None,
+    ):
+        """.
+
+        end_char is the character closing value(quote or bracket), "" if value is
+        not enclosed. val_list is the list of ValueData selected in the lines
+        which have no value list of path patterns.
+        """
+        self.kind = kind
+        self.name = name
+        self.chars = chars
+        self.end_char = end_char
+        self.types = types
+        self.detect = detect
+        self.priority = priority
+        self.val_list = val_list
+
+    def accepts(self, value: Any) -> bool:
+        """Return True if value can replace the value of the kind.
+
+        The position of value is kept, so detect is called with in_list=True.
+        """
+        if type(value) not in self.types:
+            return False
+        return self.detect is None or self.detect(value, True)
+
+    def find_end(self, line: str) -> int:
+        """Return the ending position of value in the line without line break."""
+        if self.end_char:
+            return line.rfind(self.end_char)
+        return _find_end_unquoted(line)
+
+    def span(self, pos_value: int, line: str) -> Tuple[int, int]:
+        """Return the span of value starting at pos_value in the formatted line."""
+        if not line:
+            return pos_value, pos_value
+        pos_end = len(line) - 1 if line[-1] == "," else len(line)
+        if self.end_char:  # Inside of quotes or brackets.
+            return pos_value + 1, pos_end - 1
+        return pos_value, pos_end
+
+
+class ValueKindRegistry:
+    """Registry of ValueKindSpec indexed by the id of kind."""
+
+    def __init__(self, specs: Iterable[ValueKindSpec] = ()):
+        """."""
+        self.specs: List[Optional[ValueKindSpec]] = []
+        self._by_type: Dict[type, List[ValueKindSpec]] = {}
+        self._by_subtype: Dict[type, List[ValueKindSpec]] = {}  # Found by mro.
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: ValueKindSpec) -> ValueKindSpec:
+        """Register spec. The spec of the same id is replaced."""
+        if not 0 <= spec.kind < 128:  # Stored in array("b").
+            raise ValueError("id of kind must be in [0, 128): {}".format(spec.kind))
+        while len(self.specs) <= spec.kind:
+            self.specs.append(None)
+        old = self.specs[spec.kind]
+        self.specs[spec.kind] = spec
+
+        for type_ in spec.types:
+            specs = [s for s in self._by_type.get(type_, []) if s is not old]
+            specs.append(spec)
+            specs.sort(key=lambda s: -s.priority)  # Stable for the same priority.
+            self._by_type[type_] = specs
+        self._by_subtype.clear()
+        return spec
+
+    def unregister(self, kind: int):
+        """Remove spec of kind."""
+        spec = self[kind]
+        self.specs[kind] = None
+        for type_ in spec.types:
+            self._by_type[type_].remove(spec)
+        self._by_subtype.clear()
+
+    def __getitem__(self, kind: int) -> ValueKindSpec:
+        """Return spec of kind."""
+        spec = self.specs[kind]
+        if spec is None:
+            raise KeyError(kind)
+        return spec
+
+    def __len__(self) -> int:
+        """Return the number of kinds."""
+        return sum(spec is not None for spec in self.specs)
+
+    def classify(self, value: Any, in_list: bool = False) -> int:
+        """Return kind of value, NONE if value is a container with lines."""
+        specs = self._by_type.get(type(value), None)
+        if specs is None:
+            specs = self._specs_of_subtype(type(value))
+        for spec in specs:
+            if spec.detect is None or spec.detect(value, in_list):
+                return spec.kind
+        return ValueKind.NONE
+
+    def _specs_of_subtype(self, type_: type) -> List[ValueKindSpec]:
+        """Return the specs of the nearest base class which is registered."""
+        specs = self._by_subtype.get(type_, None)
+        if specs is None:
+            by_type = self._by_type
+            specs = next(
+                (by_type[base] for base in type_.__mro__ if base in by_type), []
+            )
+            self._by_subtype[type_] = specs
+        return specs
+
+
+def is_inline_list(obj: Any) -> bool:
+    """Return True if the list is composed of numbers only."""
+    if not isinstance(obj, (list, tuple)):
+        return False
+    for val in obj:
+        if not isinstance(val, (int, float)):
+            return False
+    return True
+
+
+def _detect_hex(value: str, in_list: bool) -> bool:
+    """Return True if the string is a hexadecimal number."""
+    return value[:1] == "0" and _HEX.fullmatch(value) is not None
+
+
+KINDS = ValueKindRegistry(
+    [
+        ValueKindSpec(ValueKind.NONE, "none", CharClass()),
+        ValueKindSpec(
+            ValueKind.NUM,
+            "number",
+            CharClass(CHARS_NUM),
+            types=(float, int),
+            priority=-1,  # Integer is INT if INT_SPEC is registered.
+        ),
+        ValueKindSpec(
+            ValueKind.NUM_LIST,
+            "numeric list",
+            CharClass(CHARS_NUM),
+            "]",
+            types=(list, tuple),
+            detect=lambda value, _: is_inline_list(value),
+        ),
+        ValueKindSpec(
+            ValueKind.STR,
+            "unicode string",
+            CharClass(CHARS_STR, allow_non_ascii=True),
+            '"',
+            types=(str,),
+        ),
+        ValueKindSpec(
+            ValueKind.BOOL,
+            "boolean",
+            CharClass(),
+            types=(bool,),
+            val_list=[ValueData("true", "true"), ValueData("false", "false")],
+        ),
+        ValueKindSpec(
+            ValueKind.NULL,
+            "null",
+            CharClass(),
+            types=(type(None),),
+            val_list=[ValueData("null", "null")],
+        ),
+        ValueKindSpec(
+            ValueKind.HEX_STR,
+            "hex string",
+            CharClass(CHARS_HEX),
+            '"',
+            types=(str,),
+            detect=_detect_hex,
+            priority=2,
+        ),
+        ValueKindSpec(
+            ValueKind.STR_LIST,
+            "string list",
+            CharClass(CHARS_STR, allow_non_ascii=True),
+            '"',
+            types=(str,),
+            detect=lambda _, in_list: in_list,
+            priority=1,
+        ),
+    ]
+)
+
+# Integers are NUM, so "." and "e" can be typed in them. KINDS.register(INT_SPEC)
+# keeps integers integral.
+INT_SPEC = ValueKindSpec(ValueKind.INT, "integer", CharClass(CHARS_INT), types=(int,))
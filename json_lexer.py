@@ -0,0 +1,294 @@
+r"""Lexer of JsonValueEditor styled by the line index.
+
+The keys, values and punctuation of a line are found by the spans of
+ContainerLineInfo, so no json is lexed. Only the lines on screen and the margin
+around them are styled: the requests of Scintilla for the lines out of them are
+skipped, and the lines are styled when they are scrolled into view. The value
+spans which can be edited have the styles of their own.
+
+:author: ok97465
+:Date created: 26.10.18 20:11:42
+"""
+# %% Import
+# Standard library imports
+from typing import List, NamedTuple, Optional, Tuple
+
+# Third party imports
+from PyQt5.Qsci import QsciLexerCustom, QsciLexerJSON, QsciScintilla
+from PyQt5.QtGui import QColor, QFont
+
+# Local imports
+from json_core.value_kinds import KINDS, ValueKind
+
+# Colour scheme of editor.
+COLOR_DEFAULT = "#c0c9e9"
+COLOR_NUMBER = "#e39d64"
+COLOR_STRING = "#9ece6a"
+COLOR_PROPERTY = "#7aa2f7"
+PAPER = "#1a1b26"
+PAPER_EDITABLE = "#222436"
+FONT_FAMILY, FONT_SIZE = "Courier new", 12
+CARET = "#aaaaaa"
+CARET_LINE = "#272727"
+LIST_BACKGROUNDS = ("#122031", "#141431")  # Alternating rows of value list
+
+Segments = List[Tuple[int, int]]  # (ending column, style)
+
+
+class Theme(NamedTuple):
+    """Colours and font of editors, built once and shared.
+
+    Qt copies them when they are set, so the objects are never modified.
+    """
+
+    default: QColor
+    number: QColor
+    string: QColor
+    property: QColor
+    paper: QColor
+    paper_editable: QColor
+    caret: QColor
+    caret_line: QColor
+    list_backgrounds: Tuple[QColor, QColor]
+    font: QFont
+
+    @classmethod
+    def of_colors(cls, font_family: str = FONT_FAMILY, font_size: int = FONT_SIZE):
+        """Return the theme of the colour scheme of this module."""
+        return cls(
+            *(
+                QColor(color)
+                for color in (
+                    COLOR_DEFAULT,
+                    COLOR_NUMBER,
+                    COLOR_STRING,
+                    COLOR_PROPERTY,
+                    PAPER,
+                    PAPER_EDITABLE,
+                    CARET,
+                    CARET_LINE,
+                )
+            ),
+            tuple(QColor(color) for color in LIST_BACKGROUNDS),
+            QFont(font_family, font_size),
+        )
+
+
+_theme: Optional[Theme] = None
+
+
+def shared_theme() -> Theme:
+    """Return the theme shared by editors, which is built at the first call.
+
+    QFont needs QGuiApplication, so the theme is not built at import.
+    """
+    global _theme
+    if _theme is None:
+        _theme = Theme.of_colors()
+    return _theme
+
+
+def stock_lexer(parent=None, theme: Optional[Theme] = None) -> QsciLexerJSON:
+    """Return QsciLexerJSON of the theme, which lexes the whole text."""
+    theme = theme or shared_theme()
+    json_lexer = QsciLexerJSON(parent)
+    json_lexer.setDefaultPaper(theme.paper)
+    json_lexer.setColor(theme.default, 0)  # Default
+    json_lexer.setColor(theme.number, 1)  # Number
+    json_lexer.setColor(theme.string, 2)  # String
+    json_lexer.setColor(theme.default, 3)  # Unclosed String
+    json_lexer.setColor(theme.property, 4)  # Property
+    json_lexer.setColor(theme.default, 5)  # EscapeSequnece
+    json_lexer.setColor(theme.default, 6)  # CommentLine
+    json_lexer.setColor(theme.default, 7)  # CommentBlock
+    json_lexer.setColor(theme.default, 8)  # Operator (parenthesis)
+    json_lexer.setColor(theme.default, 9)  # IRI
+    json_lexer.setColor(theme.default, 10)  # IRICompact
+    json_lexer.setColor(theme.default, 11)  # Keyword
+    json_lexer.setColor(theme.default, 12)  # KeywordLD
+    json_lexer.setPaper(QColor("#db4b4b"), 13)  # Error
+    json_lexer.setColor(QColor("#4bdbdb"), 13)  # Error
+    json_lexer.setFont(theme.font)
+    return json_lexer
+
+
+class LineIndexLexer(QsciLexerCustom):
+    """Lexer styling the lines on screen by the line index of editor.
+
+    The styles of QsciLexerJSON are kept, and EDITABLE is added to the style of
+    value spans.
+    """
+
+    DEFAULT, NUMBER, STRING, PROPERTY, OPERATOR, KEYWORD = 0, 1, 2, 4, 8, 11
+    EDITABLE = 16
+    N_LINE_MARGIN = 100  # Lines styled above and below the screen.
+
+    _DESCRIPTIONS = {
+        DEFAULT: "Default",
+        NUMBER: "Number",
+        STRING: "String",
+        PROPERTY: "Property",
+        OPERATOR: "Operator",
+        KEYWORD: "Keyword",
+        NUMBER + EDITABLE: "Editable number",
+        STRING + EDITABLE: "Editable string",
+        KEYWORD + EDITABLE: "Editable keyword",
+    }
+    _VALUE_STYLES = {
+        ValueKind.NUM: NUMBER,
+        ValueKind.NUM_LIST: NUMBER,
+        ValueKind.INT: NUMBER,
+        ValueKind.STR: STRING,
+        ValueKind.HEX_STR: STRING,
+        ValueKind.STR_LIST: STRING,
+        ValueKind.BOOL: KEYWORD,
+        ValueKind.NULL: KEYWORD,
+    }  # The others are strings if quoted, otherwise numbers.
+
+    def __init__(self, editor: QsciScintilla, theme: Optional[Theme] = None):
+        """editor has line_infos, loaded and value_modified of JsonValueEditor.
+
+        The styles of theme(shared_theme if None) are set without visiting all the
+        styles, as setColor(color, -1) does.
+        """
+        super().__init__(editor)
+        theme = theme or shared_theme()
+        self.styled = bytearray()  # 1 for the lines styled.
+        self.setDefaultPaper(theme.paper)
+        self.setDefaultColor(theme.default)
+        self.setDefaultFont(theme.font)
+        for style, color in (
+            (self.NUMBER, theme.number),
+            (self.STRING, theme.string),
+            (self.PROPERTY, theme.property),
+            (self.KEYWORD, theme.default),
+        ):
+            self.setColor(color, style)
+            if style != self.PROPERTY:
+                self.setColor(color, style + self.EDITABLE)
+                self.setPaper(theme.paper_editable, style + self.EDITABLE)
+
+        editor.loaded.connect(self.reset)
+        editor.value_modified.connect(self.invalidate)
+        editor.SCN_UPDATEUI.connect(self.on_update_ui)
+
+    def language(self) -> str:
+        """Override QsciLexer method."""
+        return "JSON"
+
+    def description(self, style: int) -> str:
+        """Override QsciLexer method."""
+        return self._DESCRIPTIONS.get(style, "")
+
+    def reset(self):
+        """Forget the lines styled when the text is replaced."""
+        self.styled = bytearray(self.editor().lines())
+
+    def invalidate(self, line_no: int):
+        """Style the modified line again when it is on screen."""
+        if line_no < len(self.styled):
+            self.styled[line_no] = 0
+
+    def visible_lines(self) -> Tuple[int, int]:
+        """Return the range of lines on screen with the margin."""
+        editor = self.editor()
+        first = editor.SendScintilla(editor.SCI_GETFIRSTVISIBLELINE)
+        n_line = editor.SendScintilla(editor.SCI_LINESONSCREEN)
+        return (
+            max(first - self.N_LINE_MARGIN, 0),
+            min(first + n_line + 1 + self.N_LINE_MARGIN, editor.lines()),
+        )
+
+    def styleText(self, start: int, end: int):
+        """Override QsciLexerCustom method.
+
+        Only the lines of visible_lines are styled, and the other lines are styled
+        when they are on screen.
+        """
+        editor = self.editor()
+        if len(self.styled) != editor.lines():
+            self.reset()
+        line_start = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, start)
+        line_end = editor.SendScintilla(editor.SCI_LINEFROMPOSITION, end) + 1
+        line_from, line_to = self.visible_lines()
+        self.style_lines(max(line_start, line_from), min(line_end, line_to))
+        self.startStyling(end)  # Requested range is done.
+
+    def on_update_ui(self, updated: int):
+        """Style the lines scrolled into view or modified."""
+        editor = self.editor()
+        if len(self.styled) != editor.lines():
+            return  # Styled by styleText after the text is replaced.
+        line_from, line_to = self.visible_lines()
+        styled = self.styled
+        line_no = styled.find(0, line_from, line_to)
+        if line_no < 0:
+            return
+        end_styled = editor.SendScintilla(editor.SCI_GETENDSTYLED)
+        while 0 <= line_no < line_to:
+            line_next = styled.find(1, line_no, line_to)
+            line_next = line_to if line_next < 0 else line_next
+            self.style_lines(line_no, line_next)
+            line_no = styled.find(0, line_next, line_to)
+        self.startStyling(end_styled)  # Scintilla continues where it stopped.
+
+    def style_lines(self, line_from: int, line_to: int):
+        """Style the lines in [line_from, line_to)."""
+        if line_from >= line_to:
+            return
+        editor = self.editor()
+        styles = []
+        for line_no in range(line_from, line_to):
+            line = editor.text(line_no)
+            is_ascii = line.isascii()
+            col = 0
+            for col_end, style in self.segments(line_no, line):
+                col_end = min(max(col_end, col), len(line))
+                if is_ascii:
+                    n_byte = col_end - col
+                else:
+                    n_byte = len(line[col:col_end].encode("utf-8"))
+                styles.append(bytes((style,)) * n_byte)
+                col = col_end
+        style_bytes = b"".join(styles)
+        self.startStyling(editor.SendScintilla(editor.SCI_POSITIONFROMLINE, line_from))
+        editor.SendScintilla(editor.SCI_SETSTYLINGEX, len(style_bytes), style_bytes)
+        self.styled[line_from:line_to] = b"\x01" * (line_to - line_from)
+
+    def segments(self, line_no: int, line: str) -> Segments:
+        """Return the segments of line, whose last one ends at the end of line."""
+        line_infos = self.editor().line_infos
+        n_char = len(line)
+        body = line.rstrip("\r\n")
+        if line_no >= len(line_infos) or not body:
+            return [(n_char, self.DEFAULT)]
+        indent = len(body) - len(body.lstrip(" "))
+        segments = [(indent, self.DEFAULT)]
+        kind = line_infos.kinds[line_no]
+        has_key = line_infos.key_ids[line_no] >= 0 and body[indent] == '"'
+        if kind == ValueKind.NONE:
+            if has_key:
+                segments.append((body.rfind(": "), self.PROPERTY))
+            segments += [(len(body), self.OPERATOR), (n_char, self.DEFAULT)]
+            return segments
+
+        start, end = line_infos.starts[line_no], line_infos.ends[line_no]
+        end_char = KINDS[kind].end_char
+        start_literal = start - 1 if end_char else start
+        if has_key:
+            segments.append((body.rfind(": ", indent, start_literal), self.PROPERTY))
+            segments.append((start_literal, self.OPERATOR))
+        style = self._VALUE_STYLES.get(kind, None)
+        if style is None:
+            style = self.STRING if end_char == '"' else self.NUMBER
+        if end_char:  # Quotes are strings, and brackets are operators.
+            style_close = style if end_char == '"' else self.OPERATOR
+            segments += [
+                (start, style_close),
+                (end, style + self.EDITABLE),
+                (end + 1, style_close),
+            ]
+        else:
+            segments.append((end, style + self.EDITABLE))
+        segments += [(len(body), self.OPERATOR), (n_char, self.DEFAULT)]
+        return segments
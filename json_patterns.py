@@ -0,0 +1,13 @@
+r"""Old path of json_core.json_patterns, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:06:59
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import json_patterns
+
+sys.modules[__name__] = json_patterns
@@ -0,0 +1,13 @@
+r"""Old path of json_core.json_search, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:06:33
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import json_search
+
+sys.modules[__name__] = json_search
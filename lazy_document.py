@@ -0,0 +1,13 @@
+r"""Old path of json_core.lazy_document, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:07:24
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import lazy_document
+
+sys.modules[__name__] = lazy_document
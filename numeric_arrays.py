@@ -0,0 +1,13 @@
+r"""Old path of json_core.numeric_arrays, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:09:32
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import numeric_arrays
+
+sys.modules[__name__] = numeric_arrays
@@ -0,0 +1,13 @@
+r"""Old path of json_core.perf, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:05:08
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import perf
+
+sys.modules[__name__] = perf
@@ -0,0 +1,31 @@
+r"""Smoke test of the benchmark runner.
+
+:author: ok97465
+:Date created: 26.10.20 09:14:52
+"""
+# %% Import
+# Standard library imports
+import os
+
+# Third party imports
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt5.Qsci")
+pytest.importorskip("qdarkstyle")
+
+# Local imports
+from benchmarks.bench_editor import bench_file_reload  # noqa: E402
+from benchmarks.run import run  # noqa: E402
+
+
+def test_run_tiny():
+    """Test that the runner completes for the small document with the editor."""
+    report = run(["1KB"], ["deep"], editor=True, repeat=1)
+    names = {result["name"] for result in report["results"]}
+    assert {"event.key", "FileReloader.apply", "import json_core"} <= names
+
+
+def test_file_reload_without_number():
+    """Test that the document which has no number out of lists is skipped."""
+    assert bench_file_reload("numeric", 1 << 10, repeat=1) == []
@@ -0,0 +1,68 @@
+r"""Test session cache of parsed documents.
+
+:author: ok97465
+:Date created: 26.10.18 14:31:52
+"""
+# %% Import
+# Standard library imports
+import gc
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Local imports
+from json_core.document_cache import DocumentCache
+from json_core.json_infos import ValueData
+from test.test_json_infos import JSON_EXAMPLE
+
+
+def test_shared_index():
+    """Test that the same document shares the structure but not the spans."""
+    cache = DocumentCache()
+    key_val_list = {"kk": [ValueData("Wow : 11", "11")]}
+    first = cache.get(JSON_EXAMPLE, key_val_list)
+    second = cache.get(JSON_EXAMPLE, dict(key_val_list))  # Equal value lists.
+    assert (cache.n_miss, cache.n_hit, len(cache)) == (1, 1, 1)
+    assert second.kinds is first.kinds and second.json_str is first.json_str
+    assert second.starts is not first.starts
+    assert second.val_list_of(10) == key_val_list["kk"]
+
+    first.update_span(10, first.starts[10], 3)
+    assert second.ends[10] == first.ends[10] - 3
+    assert cache.find(JSON_EXAMPLE, {}) is None  # Other value lists.
+
+    with ThreadPoolExecutor(4) as executor:
+        results = list(executor.map(cache.get, ["[1]"] * 4))
+    assert len({id(line_infos.kinds) for line_infos in results}) == 1
+    assert cache.n_miss == 2
+
+
+def test_eviction():
+    """Test that the least recently used documents are evicted by the budget."""
+    docs = [json.dumps({"key": [idx] * 100}) for idx in range(4)]
+    nbytes = DocumentCache().get(docs[0]).nbytes()
+    cache = DocumentCache(max_bytes=nbytes * 3)
+    for doc in docs[:3]:
+        cache.get(doc)
+    cache.get(docs[0])  # docs[1] becomes the least recently used.
+    cache.get(docs[3])
+    assert cache.find(docs[1]) is None
+    assert all(cache.find(doc) is not None for doc in (docs[0], docs[2], docs[3]))
+    assert cache.n_bytes <= cache.max_bytes
+
+    cache.discard(docs[0])
+    assert len(cache) == 2
+    cache.clear()
+    assert (len(cache), cache.n_bytes) == (0, 0)
+
+
+def test_patterns_dropped():
+    """Test that the value lists of the evicted documents are not kept."""
+    nbytes = DocumentCache().get(JSON_EXAMPLE).nbytes()
+    cache = DocumentCache(max_bytes=nbytes * 2)
+    for idx in range(10):
+        cache.get(JSON_EXAMPLE, {"kk": [ValueData(str(idx), str(idx))]})
+    gc.collect()
+    assert len(cache) == 2 and len(cache._patterns) == 2
+    cache.clear()
+    gc.collect()
+    assert len(cache._patterns) == 0
@@ -0,0 +1,126 @@
+r"""Test reload of files changed on disk.
+
+:author: ok97465
+:Date created: 26.10.19 10:41:05
+"""
+# %% Import
+# Standard library imports
+import json
+import threading
+
+# Third party imports
+import pytest
+
+# Local imports
+from json_core.file_reload import Conflict, FileWatcher, ReloadState
+from json_core.json_infos import ContainerLineInfo
+from test.test_json_infos import JSON_EXAMPLE
+
+
+def state_of(json_str=JSON_EXAMPLE):
+    """Return the state of the document, and the lines edited in tests."""
+    line_infos = ContainerLineInfo(json_str, {})
+    return ReloadState(line_infos), line_infos.json_str.split("\n")
+
+
+def test_value_delta():
+    """Test that values changed on disk are written unless edited locally."""
+    state, local = state_of()
+    remote = list(local)
+    remote[10] = remote[10].replace("55", "12")
+    remote[15] = remote[15].replace("55", "66")
+    remote[16] = remote[16].replace("widn", "remote")
+    local[10] = local[10].replace("55", "11")
+    local[16] = local[16].replace("widn", "remote")  # Same as disk
+
+    delta = state.delta("\n".join(remote))
+    assert delta.line_infos is None
+    assert [change.line_no for change in delta.changes] == [10, 15, 16]
+    writes, conflicts = state.resolve(delta, local.__getitem__)
+    assert writes == [(15, "66")]
+    assert conflicts == [Conflict(("dhrwodn", "dh1", "kk"), 10, "11", "12")]
+    assert state.lines == remote and state.version == 1
+    assert state.delta("\n".join(remote)) is None
+
+
+def test_canonical_file_delta(monkeypatch):
+    """Test that the file ending with a line break is compared by lines."""
+    state, lines = state_of()
+    lines[15] = lines[15].replace("55", "66")
+
+    def parse(*args):
+        raise AssertionError("parsed")
+
+    monkeypatch.setattr(state, "_parsed_delta", parse)
+    delta = state.delta("\n".join(lines) + "\n")
+    assert [change.line_no for change in delta.changes] == [15]
+
+
+def test_parsed_delta():
+    """Test that the file in other format is parsed and the structure compared."""
+    state, local = state_of()
+    doc = json.loads(JSON_EXAMPLE)
+    doc["dhrwodn"]["dh2"]["kk"] = 66
+    delta = state.delta(json.dumps(doc))  # One line
+    assert delta.line_infos is None
+    assert [change.line_no for change in delta.changes] == [15]
+
+    local[10] = local[10].replace("55", "11")
+    local[11] = local[11].replace("widn", "local")
+    edits = state.local_edits([10, 11, 15], local.__getitem__)
+    assert edits == {
+        ("dhrwodn", "dh1", "kk"): ("11", "55"),
+        ("dhrwodn", "dh1", "yy"): ('"local"', '"widn"'),
+    }
+    doc["dhrwodn"]["dh1"] = {"kk": 12, "new": 1}
+    delta = state.delta(json.dumps(doc))
+    assert delta.line_infos is not None and delta.version == 0
+    new = ReloadState(delta.line_infos, delta.lines)
+    writes, conflicts = new.merge_edits(edits)
+    assert writes == [(10, "11")]
+    assert conflicts == [
+        Conflict(("dhrwodn", "dh1", "kk"), 10, "11", "12"),
+        Conflict(("dhrwodn", "dh1", "yy"), -1, '"local"', ""),
+    ]
+
+    with pytest.raises(ValueError):
+        state.delta("{")
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_watcher(tmp_path, use_inotify):
+    """Test that the changes of file and the file replaced are called back."""
+    path = str(tmp_path / "a.json")
+    with open(path, "w") as fp:
+        fp.write("{}")
+    watcher = FileWatcher(interval=0.02, use_inotify=use_inotify)
+    if use_inotify and not watcher.uses_inotify():
+        pytest.skip("inotify is not available")
+    changed = threading.Event()
+    watcher.watch(path, lambda path: changed.set())
+    try:
+        with open(path, "w") as fp:
+            fp.write('{"a": 1}')
+        assert changed.wait(5)
+        changed.clear()
+        with open(str(tmp_path / "b.json"), "w") as fp:
+            fp.write('{"a": 22}')
+        (tmp_path / "b.json").replace(path)
+        assert changed.wait(5)
+        callback = watcher.callbacks[path][0]
+        watcher.unwatch(path, callback)
+        assert watcher.callbacks == {}
+        assert watcher._watches == {}  # The directory is not watched.
+    finally:
+        watcher.stop()
+
+
+def test_shared_watcher():
+    """Test that the shared watcher stopped is replaced by a new one."""
+    watcher = FileWatcher.shared()
+    assert FileWatcher.shared() is watcher
+    watcher.stop()
+    assert FileWatcher._shared is None
+    new = FileWatcher.shared()
+    assert new is not watcher
+    new.stop()
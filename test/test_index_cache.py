@@ -0,0 +1,44 @@
+r"""Test sidecar cache of formatted text and line index.
+
+:author: ok97465
+:Date created: 26.10.18 15:48:20
+"""
+# %% Import
+# Standard library imports
+import os
+
+# Local imports
+from json_core.index_cache import IndexCache
+from json_core.json_infos import ContainerLineInfo, ValueData
+from test.test_json_infos import JSON_EXAMPLE
+
+
+def test_reopen(tmp_path):
+    """Test that the entry gives the same line info and is validated by source."""
+    path = tmp_path / "example.json"
+    path.write_text(JSON_EXAMPLE)
+    cache = IndexCache(str(tmp_path / "cache"))
+    key_val_list = {"kk": [ValueData("Wow : 11", "11")]}
+    assert cache.load(str(path)) is None
+
+    built = cache.open(str(path), key_val_list)
+    loaded = cache.load(str(path), key_val_list)
+    expected = ContainerLineInfo(JSON_EXAMPLE, key_val_list)
+    for line_infos in (built, loaded):
+        assert line_infos.json_str == expected.json_str
+        for name in ("starts", "ends", "kinds", "parents", "key_ids", "keys"):
+            assert getattr(line_infos, name) == getattr(expected, name)
+        assert line_infos.val_lists == expected.val_lists
+    assert loaded.line_of_path(("dhrwodn", "dh2", "kk")) == 15
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.load(str(path)) is not None  # Same content.
+    path.write_text(JSON_EXAMPLE.replace("55", "66"))
+    assert cache.load(str(path)) is None
+    assert cache.prune() == [cache.entry_path(str(path))]
+    assert os.listdir(cache.directory) == []
+
+    cache.open(str(path))
+    path.unlink()
+    assert len(cache.prune()) == 1
@@ -0,0 +1,81 @@
+r"""Test the headless core package.
+
+:author: ok97465
+:Date created: 26.10.19 15:58:14
+"""
+# %% Import
+# Standard library imports
+import multiprocessing
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+
+# Third party imports
+import pytest
+
+# Local imports
+import json_core
+from test.test_json_infos import JSON_EXAMPLE
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FORBIDDEN = ("PyQt5", "qdarkstyle", "numpy")
+
+
+def gui_modules():
+    """Return the Qt and NumPy modules imported in this process."""
+    return sorted(m for m in sys.modules if m.split(".")[0] in FORBIDDEN)
+
+
+def index_in_worker(json_str):
+    """Index json in the worker process."""
+    return json_core.ContainerLineInfo(json_str, {"kk": ["1"]}), gui_modules()
+
+
+def test_api():
+    """Test that the names of API are the objects of their modules."""
+    for name in json_core.__all__:
+        assert getattr(json_core, name) is getattr(
+            import_module("json_core." + json_core._MODULES[name]), name
+        )
+    assert set(json_core.__all__) <= set(dir(json_core))
+    with pytest.raises(AttributeError):
+        json_core.JsonValueEditor
+
+
+def test_old_paths():
+    """Test that the old paths are the submodules of package."""
+    import json_infos
+    from json_core import json_infos as module
+
+    assert json_infos is module
+
+
+def test_no_gui_import():
+    """Test that the core is imported and used without Qt in a new interpreter."""
+    code = "FORBIDDEN = {!r}\n".format(FORBIDDEN) + (
+        "import sys, json_core\n"
+        "assert 'json_core.json_infos' not in sys.modules\n"
+        "json_core.ContainerLineInfo('{\"a\": [1]}', {})\n"
+        "json_core.PrettyJsonWriter().encode({'a': 1})\n"
+        "print([m for m in sys.modules if m.split('.')[0] in FORBIDDEN])"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_worker_process():
+    """Test that the line index is built in a spawned process and sent back."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        line_infos, modules = executor.submit(index_in_worker, JSON_EXAMPLE).result()
+    assert modules == []
+    assert line_infos.path(10) == ("dhrwodn", "dh1", "kk")
+    assert line_infos[10].val_list == ["1"]
@@ -0,0 +1,69 @@
+r"""Test structural diff.
+
+:author: ok97465
+:Date created: 26.10.18 17:02:11
+"""
+# %% Import
+# Standard library imports
+import json
+
+# Local imports
+from json_core.json_diff import ADDED, CHANGED, REMOVED, StructuralDiff, next_line
+from json_core.json_infos import ContainerLineInfo
+
+LEFT = {
+    "a": 1,
+    "b": {"c": [1, 2], "d": "x", "e": {"f": 1}},
+    "g": [{"h": 1}, {"h": 2}],
+    "z": 5,
+}
+RIGHT = {
+    "a": 1.0,
+    "b": {"c": [1, 3], "d": "x", "n": 2},
+    "g": [{"h": 1}, {"h": 2.0}, {"q": 1}],
+    "z": {"y": 1},
+}
+
+
+def test_differences():
+    """Test that the documents are joined by path."""
+    diff = StructuralDiff(
+        ContainerLineInfo(json.dumps(LEFT), {}),
+        ContainerLineInfo(json.dumps(RIGHT), {}),
+    )
+    assert not diff.is_aligned()
+    assert [(d.kind, d.path) for d in diff.differences()] == [
+        (CHANGED, ("a",)),  # int and float
+        (CHANGED, ("b", "c")),
+        (REMOVED, ("b", "e")),
+        (CHANGED, ("g", 1, "h")),
+        (CHANGED, ("z",)),  # Value and container
+        (ADDED, ("b", "n")),
+        (ADDED, ("g", 2)),
+    ]
+    assert len(diff) == 7
+    assert diff.partner(diff.left.line_of_path(("b", "d")), True) == (
+        diff.right.line_of_path(("b", "d"))
+    )
+
+
+def test_update_of_edited_line():
+    """Test that the modified lines are compared again."""
+    left = ContainerLineInfo(json.dumps(LEFT), {})
+    lines = left.json_str.split("\n")
+    right = ContainerLineInfo(json.dumps(LEFT), {})
+    diff = StructuralDiff(left, right, lines.__getitem__)
+    assert diff.is_aligned() and len(diff) == 0
+
+    line_no = left.line_of_path(("b", "d"))
+    lines[line_no] = lines[line_no].replace('"x"', '"y"')
+    assert diff.update_left(line_no)
+    assert diff.lines_of_left() == diff.lines_of_right() == [line_no]
+    lines[line_no] = lines[line_no].replace('"y"', '"x"')
+    assert diff.update_left(line_no)
+    assert len(diff) == 0
+
+    assert next_line([3, 7], 3) == 7
+    assert next_line([3, 7], 7) == 3  # Wrap
+    assert next_line([3, 7], 3, backward=True) == 7
+    assert next_line([], 3) == -1
@@ -0,0 +1,226 @@
+r"""Test json formatting.
+
+:author: ok97465
+:Date created: 26.10.17 10:12:41
+"""
+# %% Import
+# Standard library imports
+import copy
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+
+# Third party imports
+import _ctypes
+import pytest
+
+# Local imports
+from json_core.json_formatting import PrettyJsonEncoder, PrettyJsonWriter, main
+from test.test_json_infos import JSON_EXAMPLE
+
+
+class LegacyNoIndent(object):
+    """NoIndent of the marker and replace formatter."""
+
+    def __init__(self, value):
+        """."""
+        self.value = value
+
+    def __repr__(self):
+        """."""
+        if not isinstance(self.value, list):
+            return repr(self.value)
+        else:
+            reps = (
+                "{{{}}}".format(
+                    ", ".join(("{!r}:{}".format(k, v) for k, v in sorted(v.items())))
+                )
+                if isinstance(v, dict)
+                else repr(v)
+                for v in self.value
+            )
+            return "[" + ", ".join(reps) + "]"
+
+
+def legacy_check_objs(obj):
+    """check_objs of the marker and replace formatter."""
+    if isinstance(obj, list):
+        for val in obj:
+            if not (isinstance(val, int) or isinstance(val, float)):
+                break
+        else:
+            return LegacyNoIndent(obj)
+
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            obj[k] = legacy_check_objs(v)
+    elif isinstance(obj, list):
+        for i, l in enumerate(obj):
+            obj[i] = legacy_check_objs(l)
+
+    return obj
+
+
+class LegacyPrettyJsonEncoder(json.JSONEncoder):
+    """Marker and replace formatter which was replaced by PrettyJsonWriter."""
+
+    FORMAT_SPEC = "@@{}@@"
+    regex = re.compile(FORMAT_SPEC.format(r"(\d+)"))
+
+    def default(self, obj):
+        """."""
+        return (
+            self.FORMAT_SPEC.format(id(obj))
+            if isinstance(obj, LegacyNoIndent)
+            else super().default(obj)
+        )
+
+    def encode(self, obj):
+        """."""
+        obj = legacy_check_objs(obj)
+        json_repr = super().encode(obj)
+        for match in self.regex.finditer(json_repr):
+            id = int(match.group(1))
+            json_repr = json_repr.replace(
+                '"{}"'.format(self.FORMAT_SPEC.format(id)),
+                repr(_ctypes.PyObj_FromPtr(id)),
+            )
+        json_repr = json_repr.replace("'", '"')
+        return json_repr
+
+
+def random_json(rng: random.Random, depth: int = 0, in_list: bool = False):
+    """Make random json object without apostrophe and boolean in numeric list."""
+    kind = rng.randrange(7 if depth < 5 else 4)
+    if kind == 0:
+        return rng.randint(-1000, 1000)
+    if kind == 1:
+        return rng.uniform(-1e6, 1e6)
+    if kind == 2:
+        return "".join(rng.choice("abc xyz019_-") for _ in range(rng.randrange(8)))
+    if kind == 3:
+        return None if in_list else rng.choice([None, True, False])
+    if kind == 4:
+        return [rng.choice([rng.randint(-9, 9), rng.random()])
+                for _ in range(rng.randrange(6))]
+    if kind == 5:
+        return [random_json(rng, depth + 1, True) for _ in range(rng.randrange(4))]
+    return {
+        "k{}".format(i): random_json(rng, depth + 1) for i in range(rng.randrange(5))
+    }
+
+
+def legacy_dumps(obj) -> str:
+    """Format with the legacy formatter without modifying obj."""
+    return json.dumps(copy.deepcopy(obj), cls=LegacyPrettyJsonEncoder, indent=2)
+
+
+def test_equivalence_with_legacy_formatter():
+    """Test that the layout is the same as the legacy formatter."""
+    obj = json.loads(JSON_EXAMPLE)
+    assert json.dumps(obj, cls=PrettyJsonEncoder, indent=2) == legacy_dumps(obj)
+
+    rng = random.Random(97465)
+    for _ in range(300):
+        obj = {"root": random_json(rng)}
+        assert PrettyJsonWriter().encode(obj) == legacy_dumps(obj)
+
+
+def test_encoder_options():
+    """Test that sort_keys, default and _one_shot are used and the others refused."""
+    obj = {"b": [2, 1], "a": {"d": {3, 4}, "c": None}}
+    expected = PrettyJsonWriter().encode({"a": {"c": None, "d": [3, 4]}, "b": [2, 1]})
+    encoder = PrettyJsonEncoder(indent=2, sort_keys=True, default=sorted)
+    text = json.dumps(
+        obj, cls=PrettyJsonEncoder, indent=2, sort_keys=True, default=sorted
+    )
+    assert text == expected
+    assert list(encoder.iterencode(obj, _one_shot=True)) == [expected]
+    assert "".join(encoder.iterencode(obj)) == expected
+    with pytest.raises(TypeError, match="set"):
+        json.dumps(obj, cls=PrettyJsonEncoder)
+
+    assert json.dumps([2, 1], cls=PrettyJsonEncoder, separators=(",", ": ")) == "[2, 1]"
+    for kwargs in ({"separators": (",", ":")}, {"skipkeys": True}, {"allow_nan": 0}):
+        with pytest.raises(TypeError):
+            json.dumps(obj, cls=PrettyJsonEncoder, **kwargs)
+
+
+def test_input_is_not_modified():
+    """Test that the formatter does not modify the input."""
+    obj = json.loads(JSON_EXAMPLE)
+    obj_copied = copy.deepcopy(obj)
+    PrettyJsonWriter().encode(obj)
+    assert obj == obj_copied
+
+
+def test_output_is_valid_json():
+    """Test the cases which the legacy formatter made invalid json."""
+    obj = {"a": [True, 1.5], "b": "it's", "c": {}, "d": [], "e": [[1], ["x"]]}
+    json_str = PrettyJsonWriter().encode(obj)
+    assert json.loads(json_str) == obj
+    assert '  "a": [true, 1.5],' in json_str.splitlines()
+
+
+def test_dump_to_writer():
+    """Test that dump writes the same string as encode."""
+    obj = {"k{}".format(i): [i, {"v": [1, 2]}] for i in range(500)}
+    writer = PrettyJsonWriter()
+    buffer = io.StringIO()
+    writer.dump(obj, buffer, lines_per_chunk=7)
+    assert buffer.getvalue() == writer.encode(obj)
+    assert json.loads(buffer.getvalue()) == obj
+
+
+def test_command_line(tmp_path, capsys):
+    """Test check, in-place and error of the command line in a process pool."""
+    obj = json.loads(JSON_EXAMPLE)
+    canonical = PrettyJsonWriter().encode(obj) + "\n"
+    (tmp_path / "sub").mkdir()
+    paths = [tmp_path / "a.json", tmp_path / "sub" / "b.json"]
+    for path in paths:
+        path.write_text(JSON_EXAMPLE)
+    (tmp_path / "c.json").write_text(canonical)
+    os.chmod(paths[0], 0o640)
+
+    assert main(["--check", "-q", str(tmp_path)]) == 1
+    assert main(["-i", "-j", "2", str(tmp_path)]) == 0
+    assert "3 files" in capsys.readouterr().err
+    assert all(path.read_text() == canonical for path in paths)
+    assert os.stat(paths[0]).st_mode & 0o777 == 0o640
+    assert main(["--check", "-q", "-j", "2", str(tmp_path)]) == 0
+
+    assert main([str(paths[0])]) == 0
+    assert "canonical" not in capsys.readouterr().err
+
+    (tmp_path / "d.json").write_text("{")
+    (tmp_path / "e.json").write_text("[" * 100000 + "]" * 100000)
+    assert main(["--check", "-q", str(tmp_path)]) == 2
+    err = capsys.readouterr().err
+    assert "d.json" in err and "e.json" in err
+
+    with pytest.raises(SystemExit):
+        main(["-i"])
+    assert "needs paths" in capsys.readouterr().err
+
+
+def test_command_line_pipe():
+    """Test that stdin is formatted to stdout without importing Qt."""
+    script = (
+        "import sys, json_formatting; code = json_formatting.main(); "
+        "assert not any(name.startswith('PyQt') for name in sys.modules); "
+        "sys.exit(code)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        input=JSON_EXAMPLE.encode(),
+        capture_output=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True,
+    )
+    expected = PrettyJsonWriter().encode(json.loads(JSON_EXAMPLE)) + "\n"
+    assert result.stdout.decode() == expected
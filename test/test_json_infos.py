@@ -5,7 +5,13 @@ r"""Test json infos.
 """
 # %% Import
 # Local imports
-from json_infos import ContainerLineInfo
+from json_core.json_infos import (
+    ContainerLineInfo,
+    ValueData,
+    ValueListIndex,
+    json_pointer,
+    set_by_path,
+)
 
 JSON_EXAMPLE = """
 { "glossary1" : [1, 2, 3, 4, 5, 6, 7, 8, 1, 2, 3, 4, 5, 6, 7, 8, 1, 2],
@@ -52,3 +58,92 @@ def test_pos_of_value():
     assert line_infos.pos_of_value(25, doc[25]) == (4, 4)
     assert line_infos.pos_of_value(26, doc[26]) == (8, 20)
     assert line_infos.pos_of_value(27, doc[27]) == (1, 1)
+
+
+def test_index_of_formatter():
+    """Test that the index of formatter matches the formatted text."""
+    key_val_list = {"kk": [ValueData("Wow : 11", "11")]}
+    line_infos = ContainerLineInfo(JSON_EXAMPLE, key_val_list)
+    doc = line_infos.json_str.splitlines()
+
+    for line_no, line in enumerate(doc):
+        assert line_infos[line_no].pos_end == line_infos.end_pos_of_value(line_no, line)
+
+    assert line_infos[4].path == ("glossary3dd", 0)
+    assert line_infos[7].path == ("dhrwodn",)
+    assert line_infos[10].path == ("dhrwodn", "dh1", "kk")
+    assert line_infos[10].val_list is key_val_list["kk"]
+    assert line_infos[11].val_list is None
+    assert line_infos[21].path == ("dhrwodn", "dh2", "sdknw", 2, "dhrwodn")
+
+
+def test_update_span():
+    """Test that the span of value follows the modification of line."""
+    line_infos = ContainerLineInfo(JSON_EXAMPLE, {})
+
+    line_infos.update_span(10, 13, 3)  # "kk": 55 -> "kk": 5abc5
+    assert line_infos.pos_of_value(10) == (12, 17)
+    line_infos.update_span(10, 12, -5)
+    assert line_infos.pos_of_value(10) == (12, 12)
+    line_infos.update_span(10, 11, -1)  # Space before value is deleted.
+    assert line_infos.pos_of_value(10) == (11, 11)
+    assert line_infos.end_pos_of_value(10, '      "kk":123,') == 14
+    assert line_infos.pos_of_value(10) == (11, 14)
+
+
+def test_element_offsets():
+    """Test that the commas of list follow the modification of line."""
+    line_infos = ContainerLineInfo(JSON_EXAMPLE, {})
+    doc = line_infos.json_str.splitlines()
+    elements = line_infos.elements_of(2, doc.__getitem__)  # [3, 2, 3, 4, 5, 6, 7, 9]
+    assert len(elements) == 8
+    assert [elements.comma(idx) for idx in range(3)] == [17, 20, 23]
+    assert elements.element_at(16) == 0
+    assert elements.element_at(17) == 0
+    assert elements.element_at(18) == 1
+    assert elements.span(1, *line_infos.pos_of_value(2)) == (18, 20)
+    assert elements.span(7, *line_infos.pos_of_value(2)) == (36, 38)
+
+    line_infos.update_span(2, 19, 3)  # 2 -> 2.25
+    assert [elements.comma(idx) for idx in range(3)] == [17, 23, 26]
+    assert elements.element_at(22) == 1
+    line_infos.update_span(2, 16, -1)  # 3 -> ""
+    assert [elements.comma(idx) for idx in range(3)] == [16, 22, 25]
+    assert elements.span(7, *line_infos.pos_of_value(2)) == (38, 40)
+    assert line_infos.elements_of(2, None) is elements
+
+    line_infos.invalidate_elements(2)
+    assert 2 not in line_infos.element_offsets
+
+
+def test_dirty_lines_and_patch():
+    """Test literal of modified value and helper of json path."""
+    line_infos = ContainerLineInfo(JSON_EXAMPLE, {})
+    doc = line_infos.json_str.splitlines()
+    assert not line_infos.dirty_lines
+
+    line_infos.update_span(11, 13, 1)
+    assert line_infos.dirty_lines == {11}
+    assert line_infos.literal_of_value(11, '      "yy": "wXidn",') == '"wXidn"'
+    assert line_infos.literal_of_value(12, doc[12]) == "[1, 2, 3]"
+    assert line_infos.literal_of_value(26, doc[26]) == "9000000000.0"
+
+    obj = {"a/b": [0, {"~c": 1}]}
+    assert set_by_path(obj, ("a/b", 1, "~c"), 2) == {"a/b": [0, {"~c": 2}]}
+    assert set_by_path(obj, (), 3) == 3
+    assert json_pointer(("a/b", 1, "~c")) == "/a~1b/1/~0c"
+
+
+def test_value_list_index():
+    """Test filtering value list by prefix."""
+    val_list = [
+        ValueData("Station 10", "10"),
+        ValueData("part 2", "p2"),
+        ValueData("station 1", "1"),
+        ValueData("Part 1", "p1"),
+    ]
+    index = ValueListIndex(val_list)
+    assert list(index.filter("")) == [0, 1, 2, 3]
+    assert list(index.filter("STAT")) == [2, 0]
+    assert list(index.filter("part ")) == [3, 1]
+    assert list(index.filter("x")) == []
@@ -0,0 +1,60 @@
+r"""Test json path patterns.
+
+:author: ok97465
+:Date created: 26.10.17 16:48:10
+"""
+# %% Import
+# Third party imports
+import pytest
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo
+from json_core.json_patterns import PathPatternIndex, parse_pattern
+from test.test_json_infos import JSON_EXAMPLE
+
+
+def test_parse_pattern():
+    """Test tokens of pattern."""
+    assert parse_pattern("kk") == ["**", "kk"]
+    assert parse_pattern("dhrwodn.*.kk") == ["dhrwodn", "*", "kk"]
+    assert parse_pattern("glossary[*]") == ["glossary", "[*]"]
+    assert parse_pattern("a[2][*].b") == ["a", 2, "[*]", "b"]
+    with pytest.raises(ValueError):
+        parse_pattern("a..b")
+
+
+def test_match():
+    """Test matching of path."""
+    index = PathPatternIndex(
+        {
+            "dhrwodn.dh2.kk": "exact",
+            "dhrwodn.*.kk": "star",
+            "kk": "bare",
+            "glossary[*]": "list",
+            "a.**.b[1]": "deep",
+        }
+    )
+    assert index.match(("dhrwodn", "dh2", "kk")) == "exact"
+    assert index.match(("dhrwodn", "dh1", "kk")) == "star"
+    assert index.match(("x", "y", "kk")) == "bare"
+    assert index.match(("kk",)) == "bare"
+    assert index.match(("glossary", 3)) == "list"
+    assert index.match(("glossary", "3")) is None
+    assert index.match(("a", "b", 1)) == "deep"
+    assert index.match(("a", "x", 0, "b", 1)) == "deep"
+    assert index.match(("a", "x", "b", 0)) is None
+    assert index.match(("dhrwodn",)) is None
+
+
+def test_val_list_by_pattern():
+    """Test that the line index binds the value list by path."""
+    line_infos = ContainerLineInfo(
+        JSON_EXAMPLE,
+        {"dhrwodn.dh2.kk": ["dh2"], "kk": ["any"], "glossary3dd[*]": ["item"]},
+    )
+    assert line_infos[4].val_list == ["item"]
+    assert line_infos[5].val_list == ["item"]
+    assert line_infos[10].val_list == ["any"]
+    assert line_infos[15].val_list == ["dh2"]
+    assert line_infos[3].val_list is None
+    assert line_infos[21].val_list is None
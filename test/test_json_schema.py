@@ -0,0 +1,88 @@
+r"""Test validation of values by schema.
+
+:author: ok97465
+:Date created: 26.10.19 14:02:31
+"""
+# %% Import
+# Third party imports
+import pytest
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo
+from json_core.json_schema import SchemaValidation, Validator, compile_schema
+from test.test_json_infos import JSON_EXAMPLE
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "glossary1": {"type": "array", "items": {"type": "integer", "maximum": 7}},
+        "glossary3dd": {"items": {"enum": ["dkrwhi", "dkwin"]}},
+        "dhrwodn": {
+            "properties": {"dh2": {"properties": {"kk": {"const": 55}}}},
+            "additionalProperties": {
+                "properties": {
+                    "kk": {"type": "number", "minimum": 0, "maximum": 60},
+                    "yy": {"type": "string", "pattern": "^w", "maxLength": 4},
+                }
+            },
+        },
+    },
+}
+
+
+def test_validator():
+    """Test the errors of keywords."""
+    validator = Validator({"type": "integer", "exclusiveMinimum": 0})
+    assert validator.error(3) is None
+    assert validator.error(3.0) is None  # Integral number is integer.
+    assert validator.error(0) == "0 <= 0"
+    assert validator.error(2.5) == "number is not integer"
+    assert validator.error(True) == "boolean is not integer"
+    assert Validator({"enum": [1, "a"]}).error(True) == 'true is not one of [1, "a"]'
+    assert Validator({"minLength": 2}).error("a") == "shorter than 2"
+    with pytest.raises(ValueError):
+        Validator({"type": "float"})
+    with pytest.raises(ValueError):
+        Validator({"pattern": "("})
+
+
+def test_compile_schema():
+    """Test that properties take precedence over additionalProperties."""
+    patterns = compile_schema(SCHEMA)
+    assert patterns.match(("dhrwodn", "dh2", "kk")).enum == [55]
+    assert patterns.match(("dhrwodn", "dh1", "kk")).maximum == 60
+    assert patterns.match(("dhrwodn", "dh2", "yy")) is None
+    assert patterns.match(("glossary1",)).items.maximum == 7
+    assert patterns.match(("glossary3dd", 1)).enum == ["dkrwhi", "dkwin"]
+
+
+def test_validate_line():
+    """Test that only the edited line is validated by its kind and schema."""
+    line_infos = ContainerLineInfo(JSON_EXAMPLE, {})
+    lines = line_infos.json_str.split("\n")
+    validation = SchemaValidation(line_infos, compile_schema(SCHEMA))
+    assert sorted(validation.validators) == [1, 4, 5, 8, 10, 11, 15]
+    assert validation.validate_all(lines.__getitem__) == {1: "[7] 8 > 7"}
+    assert not validation.is_valid()
+
+    def edit(line_no, text):
+        start, end = line_infos.pos_of_value(line_no, lines[line_no])
+        lines[line_no] = lines[line_no][:start] + text + lines[line_no][end:]
+        line_infos.ends[line_no] = start + len(text)
+        return validation.validate_line(line_no, lines[line_no])
+
+    assert edit(1, "1, 2, 3, 4, 5, 6, 7") is None
+    for text in ("1e", "--3", "1.2.3", ""):
+        assert edit(10, text) == "{} is not a valid number".format(text)
+    assert edit(10, "61") == "61 > 60"
+    assert edit(11, "wide!") == "longer than 4"
+    assert edit(26, "x") == "x is not a valid number"  # No schema
+    assert validation.errors == {
+        10: "61 > 60",
+        11: "longer than 4",
+        26: "x is not a valid number",
+    }
+    edit(10, "6")
+    edit(11, "wide")
+    edit(26, "1")
+    assert validation.is_valid()
@@ -0,0 +1,89 @@
+r"""Test search index.
+
+:author: ok97465
+:Date created: 26.10.18 18:52:06
+"""
+# %% Import
+# Standard library imports
+import json
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo
+from json_core.json_search import SearchIndex
+
+DOC = {
+    "gain": 1.5,
+    "Gain_max": 3,
+    "stage": [{"gain": 2, "name": "x\ny"}, {"gain": -1, "flag": True}],
+    "limits": {"low": None, "high": 2.0, "gains": [1, 2]},
+}
+
+
+def index_of(doc=DOC):
+    """Return the index of doc, and the lines which are modified in tests."""
+    line_infos = ContainerLineInfo(json.dumps(doc), {})
+    lines = line_infos.json_str.split("\n")
+    return SearchIndex(line_infos, lines.__getitem__), lines
+
+
+def test_keys_and_paths():
+    """Test that the lines of keys and paths are found without closing lines."""
+    index, _ = index_of()
+    path = index.line_infos.path
+    assert [path(line) for line in index.find_key("gain")] == [
+        ("gain",),
+        ("stage", 0, "gain"),
+        ("stage", 1, "gain"),
+    ]
+    assert [path(line) for line in index.search("gain_")] == [("Gain_max",)]
+    assert [path(line) for line in index.search("gains")] == [("limits", "gains")]
+    assert [path(line) for line in index.search("~hgh")] == [("limits", "high")]
+    assert [path(line) for line in index.search("stage[*].gain")] == [
+        ("stage", 0, "gain"),
+        ("stage", 1, "gain"),
+    ]
+    assert [path(line) for line in index.search("stage[1]")] == [("stage", 1)]
+    assert [path(line) for line in index.search("limits.*")] == [
+        ("limits", "low"),
+        ("limits", "high"),
+        ("limits", "gains"),
+    ]
+    assert len(list(index.search("**"))) == len(index.key_lines)
+    assert list(index.search('"gai"')) == []
+
+
+def test_values():
+    """Test the exact and range queries of values."""
+    index, _ = index_of()
+    path = index.line_infos.path
+    assert [path(line) for line in index.search("=2")] == [
+        ("stage", 0, "gain"),
+        ("limits", "high"),
+    ]
+    assert [path(line) for line in index.search("-1..1.5")] == [
+        ("gain",),
+        ("stage", 1, "gain"),
+    ]
+    assert [path(line) for line in index.search("=true")] == [("stage", 1, "flag")]
+    assert [path(line) for line in index.search("=null")] == [("limits", "low")]
+    assert [path(line) for line in index.search('="x\\ny"')] == [
+        ("stage", 0, "name")
+    ]
+    assert list(index.search("=[1, 2]")) == []  # Lists are not indexed.
+
+
+def test_update_value():
+    """Test that the modified values are moved in the index."""
+    index, lines = index_of()
+    line_no = index.line_infos.line_of_path(("stage", 0, "gain"))
+    lines[line_no] = lines[line_no].replace("2", "7")
+    index.update_value(line_no)
+    assert list(index.search("=7")) == [line_no]
+    assert line_no not in index.search("=2")
+
+    lines[line_no] = lines[line_no].replace("7", "-")  # Being edited.
+    index.update_value(line_no)
+    assert line_no not in index.search("..")
+    lines[line_no] = lines[line_no].replace("-", "9")
+    index.update_value(line_no)
+    assert list(index.search("8.5..")) == [line_no]
@@ -0,0 +1,109 @@
+r"""Test lazy document on memory-mapped file.
+
+:author: ok97465
+:Date created: 26.10.18 13:05:41
+"""
+# %% Import
+# Standard library imports
+import json
+
+# Third party imports
+import pytest
+
+# Local imports
+from json_core.json_formatting import PrettyJsonWriter
+from json_core.lazy_document import LazyDocument
+from test.test_json_infos import JSON_EXAMPLE
+
+
+@pytest.fixture
+def json_path(tmp_path):
+    """Path of the example written in one line."""
+    path = tmp_path / "example.json"
+    path.write_text(json.dumps(json.loads(JSON_EXAMPLE)))
+    return str(path)
+
+
+def expand_all(doc, path=()):
+    """Expand all containers under path."""
+    for key in doc.node(path).keys:
+        if doc.is_expandable(path + (key,)):
+            doc.expand(path + (key,))
+            expand_all(doc, path + (key,))
+
+
+def test_same_as_writer(json_path):
+    """Test that fully expanded document is written the same as the formatter."""
+    with LazyDocument(json_path) as doc:
+        expand_all(doc)
+        lines = list(doc.iterlines_with_index())
+    expected = PrettyJsonWriter(indent=2).iterlines_with_index(json.loads(JSON_EXAMPLE))
+    assert lines == list(expected)
+
+
+def test_folded(json_path):
+    """Test that only the root is scanned and the others are placeholders."""
+    with LazyDocument(json_path) as doc:
+        lines = [line for line, _ in doc.iterlines_with_index()]
+        assert list(doc.nodes) == [()]
+        assert lines[4] == '  "dhrwodn": {...},'
+        assert lines[-1] == "}"
+
+        doc.expand(("dhrwodn", "dh1"))
+        assert ("dhrwodn",) in doc.expanded
+        lines = [line for line, _ in doc.iterlines_with_index()]
+        assert '    "dh1": {' in lines
+        assert '    "dh2": {...}' in lines
+
+        doc.collapse(("dhrwodn",))
+        assert doc.expanded == {()}
+        assert list(doc.nodes) == [()]
+
+
+def test_save(json_path):
+    """Test the edits written in place and with the changed length."""
+    path_val = ("dhrwodn", "dh1", "kk")
+    with LazyDocument(json_path) as doc:
+        doc.expand(path_val[:2])
+        value = doc.value(path_val)
+        doc.set_literal(path_val, json.dumps(-value))
+        with pytest.raises(ValueError):
+            doc.set_literal(path_val, "1e")
+        with pytest.raises(ValueError):
+            doc.set_literal(path_val, '{"z": "q", "w": [1]}')
+        with pytest.raises(KeyError):
+            doc.set_literal(("glossary",), "{}")
+        assert doc.value(path_val) == -value
+        assert doc.is_modified()
+        assert len(list(doc.iterlines_with_index())) > 1
+
+        doc.save()
+        assert not doc.is_modified()
+        assert json.loads(open(json_path).read())["dhrwodn"]["dh1"]["kk"] == -value
+
+        doc.set_literal(path_val, json.dumps(value * 1000))
+        doc.save()
+        assert doc.value(path_val) == value * 1000
+    obj = json.loads(JSON_EXAMPLE)
+    obj["dhrwodn"]["dh1"]["kk"] = value * 1000
+    assert json.loads(open(json_path).read()) == obj
+
+
+def test_large_list_inline(tmp_path):
+    """Test that a list of numbers larger than a page is in one line."""
+    data = {"a": list(range(5000)), "b": [[1, 2], [3]]}
+    path = tmp_path / "large.json"
+    path.write_text(json.dumps(data))
+    with LazyDocument(str(path)) as doc:
+        assert not doc.is_expandable(("a",))
+        expand_all(doc)
+        lines = list(doc.iterlines_with_index())
+    assert lines == list(PrettyJsonWriter(indent=2).iterlines_with_index(data))
+
+
+def test_empty_file(tmp_path):
+    """Test that an empty file is reported."""
+    path = tmp_path / "empty.json"
+    path.write_text("")
+    with pytest.raises(ValueError, match="empty.json is empty"):
+        LazyDocument(str(path))
@@ -0,0 +1,64 @@
+r"""Test numeric lists held in NumPy array.
+
+:author: ok97465
+:Date created: 26.10.18 10:05:31
+"""
+# %% Import
+# Standard library imports
+import random
+
+# Third party imports
+import pytest
+
+pytest.importorskip("numpy")
+
+# Local imports
+from json_core.json_formatting import PrettyJsonWriter  # noqa: E402
+from json_core.numeric_arrays import NumericArray  # noqa: E402
+
+
+def test_format_is_same_as_writer():
+    """Test that the text of array is the same as the formatter."""
+    rng = random.Random(97465)
+    numbers = [
+        rng.choice(
+            [
+                rng.randint(-(10**6), 10**6),
+                rng.uniform(-1, 1) * 10.0 ** rng.randint(-30, 30),
+                float("nan"),
+                float("-inf"),
+                -0.0,
+            ]
+        )
+        for _ in range(5000)
+    ]
+    array = NumericArray(numbers)
+    assert "[" + array.format() + "]" == PrettyJsonWriter().inline_list(numbers)
+    assert array.format(10, 20) == PrettyJsonWriter().inline_list(numbers[10:20])[1:-1]
+    assert NumericArray.from_text("1, 2.5, -3").to_list() == [1, 2.5, -3]
+
+    with pytest.raises(ValueError):
+        NumericArray([1, True])
+    with pytest.raises(ValueError):
+        NumericArray([2**60])
+
+
+def test_bulk_operations():
+    """Test that the operations keep the text of integers like python."""
+    array = NumericArray([1, 2, 3.5, 4, 5])
+    assert array.scale(2, 0, 2) == (0, 2)
+    assert array.offset(0.5, 3) == (3, 5)
+    assert array.to_list() == [2, 4, 3.5, 4.5, 5.5]
+    assert array.fill(0, -2) == (3, 5)
+    assert array.format() == "2, 4, 3.5, 0, 0"
+    assert array.paste_column("7\n\n8.25\n", 1) == (1, 3)
+    assert array.to_list() == [2, 7, 8.25, 0, 0]
+    assert array[1] == 7 and isinstance(array[1], int)
+
+    with pytest.raises(ValueError):
+        array.paste_column([1, 2, 3], 3)
+    with pytest.raises(ValueError):
+        array.scale(2**52)  # 7 * 2 ** 52 is not exact.
+    with pytest.raises(ValueError):
+        array.fill("1")
+    assert array.to_list() == [2, 7, 8.25, 0, 0]
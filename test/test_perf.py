@@ -0,0 +1,44 @@
+r"""Test instrumentation of hot paths.
+
+:author: ok97465
+:Date created: 26.10.17 21:05:51
+"""
+# %% Import
+# Standard library imports
+import json
+
+# Local imports
+from json_core import perf
+from json_core.json_infos import ContainerLineInfo
+from test.test_json_infos import JSON_EXAMPLE
+
+
+def test_enable_and_disable(tmp_path):
+    """Test that the hot path is wrapped only while enabled."""
+    was_enabled = perf.is_enabled()
+    perf.disable()
+    parse_json = ContainerLineInfo.parse_json
+    assert ContainerLineInfo.__dict__["parse_json"] is parse_json
+
+    perf.reset()
+    perf.enable()
+    try:
+        assert ContainerLineInfo.__dict__["parse_json"] is not parse_json
+        for _ in range(3):
+            ContainerLineInfo(JSON_EXAMPLE, {})
+    finally:
+        perf.disable()
+    assert ContainerLineInfo.__dict__["parse_json"] is parse_json
+
+    stat = perf.stats()["ContainerLineInfo.parse_json"]
+    assert stat["count"] == 3
+    assert sum(stat["histogram_us"].values()) == 3
+    assert 0 < stat["p50_ms"] <= stat["max_ms"]
+
+    path = tmp_path / "trace.json"
+    perf.dump_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    assert [event["name"] for event in events] == ["ContainerLineInfo.parse_json"] * 3
+
+    if was_enabled:
+        perf.enable()
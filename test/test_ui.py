@@ -0,0 +1,552 @@
+r"""Test editor on the offscreen platform of Qt.
+
+:author: ok97465
+:Date created: 26.10.17 18:20:37
+"""
+# %% Import
+# Standard library imports
+import json
+import os
+
+# Third party imports
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+pytest.importorskip("PyQt5.Qsci")
+pytest.importorskip("qdarkstyle")
+
+from PyQt5.QtCore import QEvent, QEventLoop, Qt, QTimer  # noqa: E402
+from PyQt5.QtGui import QKeyEvent  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QWidget  # noqa: E402
+
+# Local imports
+from json_core import perf  # noqa: E402
+from json_core.document_cache import DocumentCache  # noqa: E402
+from json_core.file_reload import FileWatcher  # noqa: E402
+from json_core.index_cache import IndexCache  # noqa: E402
+from json_core.json_formatting import PrettyJsonWriter  # noqa: E402
+from json_core.json_infos import (  # noqa: E402
+    ContainerLineInfo,
+    LoadCancelled,
+    ValueData,
+)
+from json_core.numeric_arrays import NumericArray  # noqa: E402
+from test.test_json_infos import JSON_EXAMPLE  # noqa: E402
+from test.test_json_schema import SCHEMA  # noqa: E402
+from ui import (  # noqa: E402
+    CompareSession,
+    DocumentLoader,
+    EditorPool,
+    JsonValueEditor,
+    LazyJsonEditor,
+    SearchIndexBuilder,
+)
+
+
+@pytest.fixture(scope="module")
+def app():
+    """QApplication."""
+    return QApplication.instance() or QApplication([])
+
+
+def wait_loaded(editors, timeout_ms: int = 10000):
+    """Run event loop until the editors are loaded."""
+    loop = QEventLoop()
+    for editor in editors:
+        editor.loaded.connect(
+            lambda: None if any(e.is_loading() for e in editors) else loop.quit()
+        )
+    QTimer.singleShot(timeout_ms, loop.quit)
+    if any(editor.is_loading() for editor in editors):
+        loop.exec_()
+
+
+def test_load_async(app):
+    """Test that editors are loaded in parallel and read-only until loaded."""
+    progress = []
+    editors = [JsonValueEditor(JSON_EXAMPLE, load_async=True) for _ in range(4)]
+    editors[0].load_progress.connect(lambda stage, n: progress.append(stage))
+    assert all(editor.isReadOnly() for editor in editors)
+
+    wait_loaded(editors)
+    expected = ContainerLineInfo(JSON_EXAMPLE, {}).json_str
+    for editor in editors:
+        assert not editor.is_loading()
+        assert not editor.isReadOnly()
+        assert editor.text() == expected
+        assert editor.pos_of_value(1) == (16, 68)
+    assert progress[0] == "parse"
+
+    for editor in editors:  # Same editors are loaded again.
+        editor.load(JSON_EXAMPLE, load_async=True)
+    wait_loaded(editors)
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert all(not editor.findChildren(DocumentLoader) for editor in editors)
+
+
+def test_shared_cache(app):
+    """Test that editors of the same document share the index of cache."""
+    cache = DocumentCache()
+    editors = [
+        JsonValueEditor(JSON_EXAMPLE, load_async=True, cache=cache) for _ in range(4)
+    ]
+    wait_loaded(editors)
+    assert cache.n_miss == 1
+    assert len({id(editor.line_infos.kinds) for editor in editors}) == 1
+
+    editors[0].set_values({("dhrwodn", "dh1", "kk"): -1234})
+    attached = JsonValueEditor(JSON_EXAMPLE, cache=cache, load_async=True)
+    assert not attached.is_loading()  # Attached without loading.
+    assert attached.text() == editors[1].text()
+    assert attached.pos_of_value(10) == editors[1].pos_of_value(10)
+
+
+def test_cancel_load(app):
+    """Test that the cancelled editor stays empty and read-only."""
+    editor = JsonValueEditor(JSON_EXAMPLE, load_async=True)
+    loader = editor.loader
+    editor.cancel_load()
+    if not loader.future.cancelled():
+        loader.future.result(timeout=10)
+    app.processEvents()
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert not editor.is_loading()
+    assert editor.text() == ""
+    assert editor.isReadOnly()
+    assert not editor.findChildren(DocumentLoader)
+
+    def cancel(stage, n_line):
+        raise LoadCancelled()
+
+    with pytest.raises(LoadCancelled):
+        ContainerLineInfo(JSON_EXAMPLE, {}, cancel)
+
+
+def test_set_values(app):
+    """Test that values are set as one undo action with the kind rules."""
+    editor = JsonValueEditor(JSON_EXAMPLE, key_val_list={"yy": []})
+    editor.set_values(
+        {
+            ("dhrwodn", "dh1", "kk"): -15,
+            ("glossary2",): [1, 2.5],
+            ("glossary3dd", 1): "new value",
+        }
+    )
+    assert editor.text(10) == '      "kk": -15,\n'
+    assert editor.pos_of_value(2) == (16, 22)
+    assert editor.changed_values() == {
+        ("dhrwodn", "dh1", "kk"): -15,
+        ("glossary2",): [1, 2.5],
+        ("glossary3dd", 1): "new value",
+    }
+
+    with pytest.raises(ValueError):
+        editor.set_values({("glossary2",): "text"})
+    with pytest.raises(ValueError):
+        editor.set_values({("dhrwodn", "dh1", "kk"): True})  # Not a number.
+    with pytest.raises(ValueError):
+        editor.set_values({("dhrwodn", "dh1", "yy"): "widn"})  # Not in value list.
+    with pytest.raises(KeyError):
+        editor.set_values({("dhrwodn", "dh3"): 1})
+
+    editor.undo()
+    assert editor.text() == ContainerLineInfo(JSON_EXAMPLE, {}).json_str
+    assert editor.pos_of_value(2) == (16, 38)
+
+
+def test_element_navigation(app):
+    """Test Tab, Shift+Tab and the snapping of selection in numeric list."""
+    editor = JsonValueEditor(JSON_EXAMPLE)
+
+    def press(key, text="", modifiers=Qt.NoModifier):
+        editor.keyPressEvent(QKeyEvent(QEvent.KeyPress, key, modifiers, text))
+
+    editor.setCursorPosition(2, 16)  # [3, 2, 3, 4, 5, 6, 7, 9]
+    press(Qt.Key_Tab, "\t")
+    assert editor.getSelection() == (2, 19, 2, 20)
+    press(Qt.Key_Tab, "\t")
+    press(Qt.Key_Backtab, modifiers=Qt.ShiftModifier)
+    assert editor.getSelection() == (2, 19, 2, 20)
+    press(Qt.Key_1, "1")
+    press(Qt.Key_2, "2")
+    assert editor.text(2) == '  "glossary2": [3, 12, 3, 4, 5, 6, 7, 9],\n'
+    press(Qt.Key_Tab, "\t")
+    assert editor.selectedText() == "3"
+
+    editor.go_to_element(2, 100)
+    assert editor.selectedText() == "9"
+    editor.setSelection(2, 16, 2, 25)
+    editor.validate_selection()
+    assert editor.getSelection() == (2, 16, 2, 17)
+
+    editor.set_values({("glossary2",): [1.5, 2]})
+    editor.go_to_element(2, 1)
+    assert editor.selectedText() == "2"
+
+
+def test_selection_widget(app):
+    """Test typing, Backspace and Return in the widget of a large value list."""
+    val_list = [ValueData("item{:05d}".format(idx), str(idx)) for idx in range(20000)]
+    editor = JsonValueEditor(JSON_EXAMPLE, key_val_list={"yy": val_list})
+    widget = editor.selection_widget
+    line_yy = editor.line_infos.line_of_path(("dhrwodn", "dh1", "yy"))
+    widget.show_at_line(line_yy)
+    model = widget.model()
+    assert model.rowCount() == 20000
+
+    def press(key, text=""):
+        widget.keyPressEvent(QKeyEvent(QEvent.KeyPress, key, Qt.NoModifier, text))
+
+    for char in "item001":
+        press(Qt.Key_unknown, char)
+    assert model.rowCount() == 100
+    assert widget.currentIndex().data() == "item00100"
+    press(Qt.Key_Backspace)
+    assert model.rowCount() == 1000 and model.prefix == "item00"
+    press(Qt.Key_Down)
+    assert widget.currentIndex().data() == "item00001"
+    press(Qt.Key_Return)
+    assert editor.changed_values() == {("dhrwodn", "dh1", "yy"): "1"}
+
+    editor.load(JSON_EXAMPLE, {"yy": val_list})
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert widget.models == {} and widget.model() is None
+    widget.show_at_line(line_yy)
+    assert widget.model() is not model and widget.model().rowCount() == 20000
+
+def test_array_operations(app, monkeypatch):
+    """Test that the bulk operations keep the layout of the formatter."""
+    pytest.importorskip("numpy")
+    obj = {"small": [1, 2], "table": [i * 0.5 for i in range(100)]}
+    editor = JsonValueEditor(json.dumps(obj), array_threshold=10)
+    assert editor.array_of(1) is None
+    assert editor.array_of(2) is not None
+
+    editor.scale_values(("table",), 2)
+    editor.fill_values(("table",), 7, 10, 12)
+    editor.offset_values(("table",), 1, -2)
+    editor.paste_column(("table",), "1\n2.5\n", 50)
+    table = [float(i) for i in range(100)]
+    table[10:12] = [7, 7]
+    table[50:52] = [1, 2.5]
+    table[-2:] = [99.0, 100.0]
+    assert editor.text() == PrettyJsonWriter().encode({"small": [1, 2], "table": table})
+
+    model = editor.show_array_view(2).model()
+    assert (model.rowCount(), model.columnCount()) == (10, 10)
+    n_parsed = []
+    monkeypatch.setattr(
+        NumericArray, "from_text", lambda text: n_parsed.append(text) or None
+    )
+    editor.scale_values(("table",), 1)
+    assert n_parsed == []  # The array is not read from the text of view again.
+    monkeypatch.undo()
+    assert model.data(model.index(5, 1)) == "2.5"
+    assert model.setData(model.index(9, 9), "-1")
+    assert not model.setData(model.index(9, 8), "x")
+    assert editor.changed_values()[("table",)][-2:] == [99.0, -1]
+
+    editor.undo()
+    assert model.data(model.index(9, 9)) == "100.0"
+    with pytest.raises(ValueError):
+        editor.scale_values(("small",), 2)
+
+
+def test_lazy_editor(app, tmp_path):
+    """Test that Return toggles the container and edits are kept in the file."""
+    path = tmp_path / "lazy.json"
+    path.write_text(json.dumps({"a": {"b": 1, "c": [{"d": "x"}]}, "e": 2.5}))
+    editor = LazyJsonEditor(str(path))
+    assert editor.text() == '{\n  "a": {...},\n  "e": 2.5\n}'
+
+    enter = QKeyEvent(QEvent.KeyPress, Qt.Key_Return, Qt.NoModifier)
+    editor.setCursorPosition(1, 0)
+    editor.keyPressEvent(enter)
+    assert editor.text(2) == '    "b": 1,\n'
+    editor.set_values({("a", "b"): 7})
+
+    editor.keyPressEvent(enter)  # Fold "a" again.
+    assert editor.lines() == 4
+    assert editor.to_dict()["a"]["b"] == 7
+    editor.save()
+    assert json.loads(path.read_text())["a"]["b"] == 7
+
+
+def test_from_file(app, tmp_path):
+    """Test that the editor of file is the same with and without index cache."""
+    path = tmp_path / "example.json"
+    path.write_text(JSON_EXAMPLE)
+    cache = IndexCache(str(tmp_path / "cache"))
+    texts = [
+        JsonValueEditor.from_file(str(path), index_cache=index_cache).text()
+        for index_cache in (None, cache, cache)
+    ]
+    assert texts[0] == texts[1] == texts[2]
+    assert cache.load(str(path)) is not None
+
+
+def test_compare_session(app):
+    """Test the highlight, navigation and update of compare mode."""
+    obj = json.loads(JSON_EXAMPLE)
+    left = JsonValueEditor(json.dumps(obj))
+    obj["dhrwodn"]["dh1"]["kk"] = 1
+    obj["dhrwodn"]["dh2"]["new"] = 2
+    right = JsonValueEditor(json.dumps(obj))
+    session = CompareSession(left, right)
+    line_kk = left.line_infos.line_of_path(("dhrwodn", "dh1", "kk"))
+    assert session.diff.lines_of_left() == [line_kk]
+    assert len(session.diff.added) == 1
+
+    def has_indicator(editor, line_no, col, indicator):
+        pos = editor.positionFromLineIndex(line_no, col)
+        return bool(editor.SendScintilla(editor.SCI_INDICATORVALUEAT, indicator, pos))
+
+    start, _ = left.pos_of_value(line_kk)
+    assert has_indicator(left, line_kk, start, CompareSession.INDICATOR_CHANGED)
+    assert not has_indicator(left, line_kk, 0, CompareSession.INDICATOR_CHANGED)
+    line_new = session.diff.added[0]
+    assert has_indicator(right, line_new, 2, CompareSession.INDICATOR_MISSING)
+
+    right.setCursorPosition(0, 0)
+    f8 = QKeyEvent(QEvent.KeyPress, Qt.Key_F8, Qt.NoModifier)
+    right.keyPressEvent(f8)
+    assert right.getCursorPosition()[0] == line_kk
+    assert left.selectedText() == "55"
+    right.keyPressEvent(f8)
+    assert right.getCursorPosition()[0] == line_new
+
+    right.set_values({("dhrwodn", "dh1", "kk"): 55})  # Same as left.
+    assert session.diff.lines_of_left() == []
+    assert not has_indicator(left, line_kk, start, CompareSession.INDICATOR_CHANGED)
+    session.close()
+    assert left.compare_session is None
+
+
+def test_perf_after_connect(app):
+    """Test that the slots connected before perf.enable are timed."""
+    was_enabled = perf.is_enabled()
+    perf.disable()
+    editor = JsonValueEditor(JSON_EXAMPLE)
+    session = CompareSession(editor, JsonValueEditor(JSON_EXAMPLE))
+    perf.reset()
+    perf.enable()
+    try:
+        start, _ = editor.pos_of_value(10)
+        editor.insertAt("1", 10, start)
+        editor.load(JSON_EXAMPLE)
+    finally:
+        perf.disable()
+        if was_enabled:
+            perf.enable()
+    stats = perf.stats()
+    assert stats["JsonValueEditor.on_modified"]["count"] >= 1
+    assert stats["CompareSession.rebuild"]["count"] == 1
+    session.close()
+
+def test_search_panel(app):
+    """Test that Ctrl+F searches the index built on worker thread."""
+    editor = JsonValueEditor(JSON_EXAMPLE)
+    editor.keyPressEvent(QKeyEvent(QEvent.KeyPress, Qt.Key_F, Qt.ControlModifier))
+    panel = editor.search_panel
+    builder = editor.index_builder
+    editor.set_values({("dhrwodn", "dh1", "kk"): 77})  # While the index is built.
+    builder.future.result(timeout=10)
+    app.processEvents()
+    assert editor.search_index is not None
+    assert builder.lines is None
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    assert not editor.findChildren(SearchIndexBuilder)
+
+    line_kk = editor.line_infos.line_of_path(("dhrwodn", "dh1", "kk"))
+    panel.query_edit.setText("=77")
+    assert panel.model.lines == [line_kk]
+    assert editor.selectedText() == "77"
+    assert editor.getCursorPosition() == (line_kk, editor.pos_of_value(line_kk)[1])
+
+    panel.query_edit.setText("kk")
+    assert panel.model.rowCount() == 2
+    down = QKeyEvent(QEvent.KeyPress, Qt.Key_Down, Qt.NoModifier)
+    QApplication.sendEvent(panel.query_edit, down)
+    assert editor.selectedText() == "55"
+
+    editor.set_values({("dhrwodn", "dh2", "kk"): 11})
+    panel.query_edit.setText("=11")
+    assert panel.model.rowCount() == 1
+    panel.query_edit.setText("dhrwodn[")  # Invalid pattern being typed.
+    assert panel.model.rowCount() == 0
+
+
+def test_lexer_styles(app):
+    """Test that lines on screen are styled by the line index and restyled."""
+    editor = JsonValueEditor(JSON_EXAMPLE)
+    editor.resize(400, 600)
+    editor.show()
+    app.processEvents()
+    lexer = editor.lexer()
+
+    def style_at(line_no, col):
+        pos = editor.positionFromLineIndex(line_no, col)
+        return editor.SendScintilla(editor.SCI_GETSTYLEAT, pos)
+
+    assert editor.text(10) == '      "kk": 55,\n'
+    assert style_at(10, 6) == lexer.PROPERTY
+    assert style_at(10, 10) == lexer.OPERATOR
+    assert style_at(10, 12) == lexer.NUMBER + lexer.EDITABLE
+    assert style_at(10, 14) == lexer.OPERATOR
+    assert style_at(2, 15) == lexer.OPERATOR  # Bracket of list
+    assert style_at(2, 16) == lexer.NUMBER + lexer.EDITABLE
+    assert style_at(4, 4) == lexer.STRING  # Quote of value in list
+    assert style_at(4, 5) == lexer.STRING + lexer.EDITABLE
+
+    editor.set_values({("dhrwodn", "dh1", "kk"): -15})
+    app.processEvents()
+    assert [style_at(10, col) for col in range(12, 16)] == [
+        lexer.NUMBER + lexer.EDITABLE
+    ] * 3 + [lexer.OPERATOR]
+    editor.close()
+
+
+def test_editor_pool(app):
+    """Test that released editors are reused with the shared theme."""
+    parent = QWidget()
+    pool = EditorPool(max_size=1)
+    left, right = pool.acquire(JSON_EXAMPLE, parent), pool.acquire("[1]", parent)
+    assert left.theme is right.theme
+    lexer = left.lexer()
+    assert lexer.color(lexer.NUMBER + lexer.EDITABLE) == left.theme.number
+    assert lexer.paper(lexer.NUMBER + lexer.EDITABLE) == left.theme.paper_editable
+    assert lexer.paper(lexer.OPERATOR) == left.theme.paper
+
+    session = CompareSession(left, right)
+    left.show_search_panel()
+    pool.release(left)
+    pool.release(right)  # Deleted, pool is full.
+    assert len(pool) == 1 and left.compare_session is None and session.diff is None
+    assert not left.search_panel.isVisible()
+
+    parent_new = QWidget()
+    editor = pool.acquire('{"kk": 1}', parent_new, {"kk": [ValueData("one", "1")]})
+    assert editor is left and len(pool) == 0
+    assert (pool.n_created, pool.n_reused) == (2, 1)
+    assert editor.parent() is parent_new
+    assert editor.selection_widget.parentWidget() is parent_new
+    assert editor.text() == '{\n  "kk": 1\n}'
+    editor.undo()  # Loading can not be undone.
+    assert editor.text() == '{\n  "kk": 1\n}'
+    widget = editor.selection_widget
+    widget.show_at_line(1)
+    assert widget.model().rowCount() == 1 and len(widget.models) == 1
+
+    values = [ValueData("one", "1")]
+    editor.load('{"a": {"kk": 1}, "b": {"kk": 1}}', {"kk": values})
+    assert widget.models == {}
+    assert widget.model_of(editor.line_infos[2].val_list) is widget.model_of(
+        editor.line_infos[5].val_list
+    )
+
+
+def test_file_reloader(app, tmp_path):
+    """Test that values changed on disk are written and edits are kept."""
+    path = str(tmp_path / "a.json")
+    text = ContainerLineInfo(JSON_EXAMPLE, {}).json_str
+    with open(path, "w") as fp:
+        fp.write(text)
+    editor = JsonValueEditor.from_file(path)
+    watcher = FileWatcher(3600, use_inotify=False)  # Checked by test.
+    reloader = editor.watch_file(path, watcher)
+    conflicts = []
+    reloader.reloaded.connect(conflicts.extend)
+    editor.set_values({("dhrwodn", "dh1", "kk"): 11})
+
+    lines = text.split("\n")
+    lines[10] = lines[10].replace("55", "12")
+    lines[15] = lines[15].replace("55", "66")
+    with open(path, "w") as fp:
+        fp.write("\n".join(lines))
+    reloader.check()
+    app.processEvents()
+    assert editor.text(10) == '      "kk": 11,\n'
+    assert editor.text(15) == lines[15] + "\n"
+    assert [conflict.path for conflict in conflicts] == [("dhrwodn", "dh1", "kk")]
+    assert editor.to_dict()["dhrwodn"]["dh2"]["kk"] == 66
+
+    doc = json.loads(text)
+    doc["dhrwodn"]["dh1"]["new"] = 1
+    with open(path, "w") as fp:
+        json.dump(doc, fp)
+    editor.setCursorPosition(15, 6)
+    conflicts.clear()
+    reloader.check()
+    app.processEvents()
+    assert editor.to_dict()["dhrwodn"]["dh1"] == {
+        "kk": 11,
+        "yy": "widn",
+        "sdknw": [1, 2, 3],
+        "new": 1,
+    }
+    assert editor.line_infos.path(editor.getCursorPosition()[0]) == (
+        "dhrwodn",
+        "dh2",
+        "kk",
+    )
+    assert [conflict.remote for conflict in conflicts] == ["55"]
+    watcher.stop()
+    editor.unwatch_file()
+
+
+def test_validation(app):
+    """Test that the typed values are validated and underlined."""
+    editor = JsonValueEditor(JSON_EXAMPLE)
+    editor.set_schema(SCHEMA)
+    invalid = JsonValueEditor.INDICATOR_INVALID
+
+    def is_underlined(line_no):
+        pos = editor.positionFromLineIndex(line_no, editor.pos_of_value(line_no)[0])
+        return bool(editor.SendScintilla(editor.SCI_INDICATORVALUEAT, invalid, pos))
+
+    assert editor.validation_errors() == {("glossary1",): "[7] 8 > 7"}
+    assert is_underlined(1) and not is_underlined(10)
+
+    start, _ = editor.pos_of_value(10)
+    editor.insertAt("e", 10, start + 2)  # 55e
+    assert not editor.is_valid() and is_underlined(10)
+    editor.set_values({("dhrwodn", "dh1", "kk"): 61})
+    assert editor.validation_errors()[("dhrwodn", "dh1", "kk")] == "61 > 60"
+    editor.set_values({("dhrwodn", "dh1", "kk"): 6, ("glossary1",): [1, 2]})
+    assert editor.is_valid() and not is_underlined(10) and not is_underlined(1)
+
+    editor.set_values({("dhrwodn", "dh1", "kk"): 61})
+    editor.set_schema(None)
+    assert editor.is_valid() and not is_underlined(10)
+
+    _, end = editor.pos_of_value(26)  # "fc" has no schema.
+    editor.insertAt("e", 26, end)
+    editor.set_schema(SCHEMA)
+    assert not editor.is_valid() and is_underlined(26)
+    assert editor.validation_errors()[("fc",)].endswith("is not a valid number")
+    editor.set_schema(None)
+    assert not editor.is_valid() and is_underlined(26)
+
+
+def test_validation_of_elements(app):
+    """Test that a keystroke in a numeric list checks the edited elements only."""
+    editor = JsonValueEditor(json.dumps({"l": list(range(100000)), "s": "a"}))
+    lines_parsed = []
+    validate_line = editor.validation.validate_line
+    editor.validation.validate_line = lambda line_no, line: (
+        lines_parsed.append(line_no) or validate_line(line_no, line)
+    )
+    start, _ = editor.pos_of_value(1)
+    editor.insertAt("7", 1, start)  # 70, 1
+    editor.insertAt("x", 2, editor.pos_of_value(2)[0])
+    assert editor.is_valid() and lines_parsed == []
+
+    editor.insertAt(",", 1, start + 5)  # 70, 1,, 2
+    assert lines_parsed == []
+    assert editor.validation.errors == {1: "'' is not a valid number of numeric list"}
+    editor.insertAt("3", 1, start + 5)  # 70, 13,, 2
+    assert lines_parsed == [1] and not editor.is_valid()
+    editor.SendScintilla(
+        editor.SCI_DELETERANGE, editor.positionFromLineIndex(1, start + 6), 1
+    )
+    assert editor.is_valid()
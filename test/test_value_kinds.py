@@ -0,0 +1,139 @@
+r"""Test value kinds.
+
+:author: ok97465
+:Date created: 26.10.17 21:58:37
+"""
+# %% Import
+# Standard library imports
+import re
+
+# Third party imports
+import pytest
+
+# Local imports
+from json_core.json_infos import ContainerLineInfo
+from json_core.value_kinds import (
+    INT_SPEC,
+    KINDS,
+    CharClass,
+    ValueKind,
+    ValueKindRegistry,
+    ValueKindSpec,
+)
+
+JSON_KINDS = """{"b": true, "n": null, "i": -3, "f": 2.5, "h": "0x1F", "s": "\\u00e9",
+ "l": [1, 2.5], "sl": ["a", "0xA"]}"""
+
+
+def test_kind_of_lines():
+    """Test that each line stores the kind of its value."""
+    line_infos = ContainerLineInfo(JSON_KINDS, {})
+    kinds = {
+        line_infos.path(line_no): line_infos.kinds[line_no]
+        for line_no in range(len(line_infos))
+        if line_infos.kinds[line_no] != ValueKind.NONE
+    }
+    assert kinds == {
+        ("b",): ValueKind.BOOL,
+        ("n",): ValueKind.NULL,
+        ("i",): ValueKind.NUM,
+        ("f",): ValueKind.NUM,
+        ("h",): ValueKind.HEX_STR,
+        ("s",): ValueKind.STR,
+        ("l",): ValueKind.NUM_LIST,
+        ("sl", 0): ValueKind.STR_LIST,
+        ("sl", 1): ValueKind.HEX_STR,
+    }
+
+    doc = line_infos.json_str.splitlines()
+    for line_no, line in enumerate(doc):
+        start, end = line_infos.pos_of_value(line_no)
+        assert line_infos.pos_of_value(line_no, line) == (start, end)
+    assert doc[1][slice(*line_infos.pos_of_value(1))] == "true"
+    assert doc[5][slice(*line_infos.pos_of_value(5))] == "0x1F"
+
+
+def test_chars_allowed():
+    """Test the classifier of characters and the value lists of literals."""
+    line_infos = ContainerLineInfo(JSON_KINDS, {})
+    assert "1" in line_infos[3].chars_allowed
+    assert "." in line_infos[3].chars_allowed  # Integer is NUM.
+    assert "." in line_infos[4].chars_allowed
+    assert "g" not in line_infos[5].chars_allowed
+    assert "é" in line_infos[6].chars_allowed
+    assert "" not in line_infos[6].chars_allowed
+    assert '"' not in line_infos[6].chars_allowed
+    assert not line_infos[1].chars_allowed
+    assert [val_data.data for val_data in line_infos[1].val_list] == ["true", "false"]
+    assert [val_data.data for val_data in line_infos[2].val_list] == ["null"]
+
+    chars = CharClass("ab", allow_non_ascii=True)
+    assert chars.contains_all("abbaé")
+    assert not chars.contains_all("abc")
+    assert not chars.contains_all("a\n")
+
+    assert line_infos.text_of_value(1, False) == "false"
+    assert line_infos.text_of_value(2, None) == "null"  # Set by its value list.
+    assert line_infos.text_of_value(5, "0xff") == "0xff"
+    with pytest.raises(ValueError):
+        line_infos.text_of_value(5, "xyz")
+    assert line_infos.text_of_value(3, 1.5) == "1.5"
+
+
+def test_integer_kind():
+    """Test that integers are integral only if INT_SPEC is registered."""
+    KINDS.register(INT_SPEC)
+    try:
+        line_infos = ContainerLineInfo(JSON_KINDS, {})
+        assert line_infos.kinds[3] == ValueKind.INT
+        assert "." not in line_infos[3].chars_allowed
+        assert line_infos.text_of_value(3, 7) == "7"
+        with pytest.raises(ValueError):
+            line_infos.text_of_value(3, 1.5)
+    finally:
+        KINDS.unregister(ValueKind.INT)
+    assert ContainerLineInfo(JSON_KINDS, {}).kinds[3] == ValueKind.NUM
+
+
+def test_span_of_value():
+    """Test the span of values in quotes, brackets and of empty line."""
+    assert KINDS[ValueKind.STR].span(7, '  "a": "bc",') == (8, 10)
+    assert KINDS[ValueKind.NUM_LIST].span(7, '  "l": [1, 2]') == (8, 12)
+    assert KINDS[ValueKind.NUM].span(7, '  "i": -3,') == (7, 9)
+    assert KINDS[ValueKind.NUM].span(0, "") == (0, 0)
+    assert KINDS.classify((1, 2.5)) == ValueKind.NUM_LIST
+    assert KINDS.classify([1, None]) == ValueKind.NONE
+
+
+def test_register_kind():
+    """Test that a registered kind is used by the formatter and the line index."""
+    date = re.compile(r"\d{4}-\d{2}-\d{2}")
+    registry = ValueKindRegistry(spec for spec in KINDS.specs if spec is not None)
+    registry.register(
+        ValueKindSpec(
+            20,
+            "date",
+            CharClass("0123456789-"),
+            '"',
+            types=(str,),
+            detect=lambda value, _: date.fullmatch(value) is not None,
+            priority=3,
+        )
+    )
+    assert registry.classify("2026-10-17") == 20
+    assert registry.classify("0x1F") == ValueKind.HEX_STR
+    assert registry.classify(True) == ValueKind.BOOL
+    assert registry.classify(7) == ValueKind.NUM
+    registry.register(INT_SPEC)
+    assert registry.classify(7) == ValueKind.INT
+    assert registry.classify([1, "a"], True) == ValueKind.NONE
+    assert KINDS.classify("2026-10-17") == ValueKind.STR
+
+    KINDS.register(registry[20])
+    try:
+        line_infos = ContainerLineInfo('{"day": "2026-10-17"}', {})
+        assert line_infos.kinds[1] == 20
+        assert "a" not in line_infos[1].chars_allowed
+        assert line_infos.pos_of_value(1) == (10, 20)
+    finally:
+        KINDS.unregister(20)
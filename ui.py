@@ -3,29 +3,117 @@
 # Standard library imports
 import sys
 import json
-from typing import Tuple
+import threading
+from array import array
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 # Third party imports
 import qdarkstyle
-from PyQt5.Qsci import QsciLexerJSON, QsciScintilla
-from PyQt5.QtCore import QPoint, Qt
-from PyQt5.QtGui import QColor, QFont, QKeyEvent, QMouseEvent
+from PyQt5.Qsci import QsciLexer, QsciScintilla
+from PyQt5.QtCore import (
+    QAbstractListModel,
+    QAbstractTableModel,
+    QEvent,
+    QModelIndex,
+    QObject,
+    QPoint,
+    Qt,
+    pyqtSignal,
+)
+from PyQt5.QtGui import QColor, QKeyEvent, QKeySequence, QMouseEvent
 from PyQt5.QtWidgets import (
     QApplication,
-    QListWidget,
-    QListWidgetItem,
     QMainWindow,
+    QLineEdit,
     QListView,
+    QShortcut,
     QGridLayout,
+    QTableView,
+    QVBoxLayout,
     QWidget,
 )
 
 # Local imports
-from json_infos import ContainerLineInfo, ValueData, ValueKind
+from json_core import perf
+from json_core.document_cache import DocumentCache
+from json_core.file_reload import Conflict, Delta, FileWatcher, ReloadState
+from json_core.index_cache import IndexCache
+from json_core.json_diff import StructuralDiff, end_line, next_line
+from json_core.json_infos import (
+    ContainerLineInfo,
+    ElementOffsets,
+    JsonPath,
+    LoadCancelled,
+    ValueData,
+    ValueKind,
+    ValueListIndex,
+    json_pointer,
+    set_by_path,
+)
+from json_core.json_patterns import PathPatternIndex
+from json_core.json_schema import SchemaValidation, compile_schema
+from json_core.json_search import SearchIndex
+from json_core.lazy_document import LazyDocument
+from json_core.numeric_arrays import Number, NumericArray, numpy_available
+from json_lexer import LineIndexLexer, Theme, shared_theme
+
+
+class ValueListModel(QAbstractListModel):
+    """Model of value list filtered by the prefix of display."""
+
+    def __init__(self, val_list: List[ValueData], parent=None) -> None:
+        """."""
+        super().__init__(parent)
+        self.val_list = val_list
+        self.backgrounds = shared_theme().list_backgrounds
+        self.index_of_list: Optional[ValueListIndex] = None  # Built at first filter.
+        self.rows: Optional[array] = None  # None is all rows.
+        self.n_row: int = len(val_list)
+        self.prefix: str = ""
+
+    def set_prefix(self, prefix: str):
+        """Filter the rows by the prefix of display."""
+        self.beginResetModel()
+        self.prefix = prefix
+        if not prefix:
+            self.rows = None
+        else:
+            if self.index_of_list is None:
+                self.index_of_list = ValueListIndex(self.val_list)
+            self.rows = self.index_of_list.filter(prefix)
+        self.n_row = len(self.val_list) if self.rows is None else len(self.rows)
+        self.endResetModel()
 
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Override Qt method."""
+        return 0 if parent.isValid() else self.n_row
 
-class SelectionWidget(QListWidget):
-    """Selection list widget."""
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        """Override Qt method."""
+        row = index.row()
+        if role == Qt.BackgroundRole:
+            return self.backgrounds[row % 2]
+        if role not in (Qt.DisplayRole, Qt.UserRole):
+            return None
+        if self.rows is not None:
+            row = self.rows[row]
+        val_data = self.val_list[row]
+        return val_data.display if role == Qt.DisplayRole else val_data.data
+
+
+@perf.instrument
+class SelectionWidget(QListView):
+    """Selection list widget.
+
+    Rows are drawn only when visible, and characters typed in the widget filter
+    the rows by the prefix of display. The lines which have the same value list
+    share one model, and the models are dropped when the document is replaced.
+    """
+
+    N_ROW_SAMPLE = 64  # Rows measured for the width of widget.
+    N_ROW_VISIBLE = 12
 
     def __init__(self, editor, ancestor) -> None:
         """."""
@@ -35,18 +123,24 @@ class SelectionWidget(QListWidget):
         self.setWindowFlags(Qt.SubWindow | Qt.FramelessWindowHint)
         self.hide()
         self.line_no: int = 0
+        # id(val_list): (val_list, model). val_list is kept, so its id is not reused.
+        self.models: Dict[int, Tuple[List[ValueData], ValueListModel]] = {}
+        editor.loaded.connect(self.clear_models)
 
         self.setMinimumWidth(300)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)  # Rows are laid out in idle time.
+        self.setBatchSize(256)
         self.setAutoScroll(True)
         self.setSpacing(2)
-        self.itemClicked.connect(self.item_selected)
+        self.clicked.connect(self.item_selected)
 
     def keyPressEvent(self, e: QKeyEvent):
         """Override Qt method."""
-        key = e.key()
+        key, key_char = e.key(), e.text()
+        model = self.model()
 
         if key in (Qt.Key_Return, Qt.Key_Enter):
             self.item_selected()
@@ -61,12 +155,40 @@ class SelectionWidget(QListWidget):
             Qt.Key_End,
         ):
             super().keyPressEvent(e)
+        elif model is None:
+            return
+        elif key == Qt.Key_Backspace:
+            self.set_prefix(model.prefix[:-1])
+        elif key_char and key_char.isprintable():
+            self.set_prefix(model.prefix + key_char)
+
+    def model_of(self, val_list: List[ValueData]) -> ValueListModel:
+        """Return the model of val_list, which is created at the first call."""
+        _, model = self.models.get(id(val_list), (None, None))
+        if model is None:
+            model = ValueListModel(val_list, self)
+            self.models[id(val_list)] = (val_list, model)
+        return model
+
+    def clear_models(self):
+        """Delete the models of the value lists of the previous document."""
+        if not self.models:
+            return
+        self.setModel(None)
+        for _, model in self.models.values():
+            model.deleteLater()
+        self.models = {}
+
+    def set_prefix(self, prefix: str):
+        """Filter the list by prefix."""
+        self.model().set_prefix(prefix)
+        self.setCurrentIndex(self.model().index(0))
 
-    def item_selected(self, item=None):
+    def item_selected(self, index: Optional[QModelIndex] = None):
         """Perform the item selected action."""
-        if item is None:
-            item = self.currentItem()
-        data = item.data(Qt.UserRole)
+        if index is None:
+            index = self.currentIndex()
+        data = index.data(Qt.UserRole) if index.isValid() else None
 
         if data:
             editor = self.editor
@@ -102,6 +224,7 @@ class SelectionWidget(QListWidget):
         self.hide()
         super().focusOutEvent(e)
 
+    @perf.hot_path()
     def show_at_line(self, line_no: int):
         """Show widget in editor."""
         self.line_no = line_no
@@ -110,82 +233,925 @@ class SelectionWidget(QListWidget):
         if val_list is None:
             self.hide()
             return
-        self.clear()
-
-        for idx, val_data in enumerate(val_list):
-            item = QListWidgetItem()
-            item.setData(Qt.DisplayRole, val_data.display)
-            item.setData(Qt.UserRole, val_data.data)
-            if idx % 2:
-                item.setBackground(QColor(20, 20, 49))
-            else:
-                item.setBackground(QColor(18, 32, 49))
-            self.addItem(item)
+
+        model = self.model_of(val_list)
+        model.set_prefix("")
+        if self.model() is not model:
+            self.setModel(model)
 
         self.show()
         self.setFocus()
         self.raise_()
 
         self.move_to_val_pos(line_no)
-        self.setCurrentRow(0)
+        self.setCurrentIndex(model.index(0))
         scroll_bar = self.verticalScrollBar()
 
+        # Only a part of rows is measured, so the cost does not depend on the rows.
+        n_row = model.rowCount()
+        width = max(
+            (
+                self.sizeHintForIndex(model.index(row)).width()
+                for row in range(min(n_row, self.N_ROW_SAMPLE))
+            ),
+            default=0,
+        )
         self.setFixedSize(
-            self.sizeHintForColumn(0)
-            + 4 * (self.frameWidth() + self.spacing())
-            + scroll_bar.width(),
-            self.sizeHintForRow(0) * self.count()
+            width + 4 * (self.frameWidth() + self.spacing()) + scroll_bar.width(),
+            self.sizeHintForRow(0) * min(n_row, self.N_ROW_VISIBLE)
             + 4 * (self.frameWidth() + self.spacing()),
         )
 
 
-class JsonValueEditor(QsciScintilla):
-    """."""
+class ArrayTableModel(QAbstractTableModel):
+    """Numbers of the numeric list in rows of n_col elements.
+
+    Row r shows the elements from r * n_col, and only the visible cells are read
+    from the array.
+    """
 
-    def __init__(self, json_str: str, parent=None, key_val_list={}):
+    def __init__(self, editor, line_no: int, n_col: int = 10) -> None:
         """."""
+        super().__init__(editor)
+        self.editor = editor
+        self.line_no = line_no
+        self.n_col = n_col
+        self.path = editor.line_infos.path(line_no)
+        self.n_element = len(self.array())
+        editor.value_modified.connect(self.refresh)
+
+    def array(self) -> NumericArray:
+        """Return the array of editor. Empty array if the list is not an array."""
+        array = self.editor.array_of(self.line_no)
+        return NumericArray([]) if array is None else array
+
+    def refresh(self, line_no: int):
+        """Read the array again after the list is modified."""
+        if line_no != self.line_no:
+            return
+        self.beginResetModel()
+        self.n_element = len(self.array())
+        self.endResetModel()
+
+    def element_of(self, index: QModelIndex) -> int:
+        """Return the element of cell, -1 if the cell has no element."""
+        idx = index.row() * self.n_col + index.column()
+        return idx if index.isValid() and idx < self.n_element else -1
+
+    def index_of_element(self, idx: int) -> QModelIndex:
+        """Return the cell of element."""
+        return self.index(idx // self.n_col, idx % self.n_col)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Override Qt method."""
+        return 0 if parent.isValid() else -(-self.n_element // self.n_col)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        """Override Qt method."""
+        return 0 if parent.isValid() else self.n_col
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        """Override Qt method."""
+        idx = self.element_of(index)
+        if idx < 0 or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return self.array().format(idx, idx + 1)
+
+    def headerData(self, section: int, orientation, role: int = Qt.DisplayRole):
+        """Show the index of the first element of row."""
+        if role != Qt.DisplayRole:
+            return None
+        return str(section * self.n_col if orientation == Qt.Vertical else section)
+
+    def flags(self, index: QModelIndex):
+        """Override Qt method."""
+        if self.element_of(index) < 0:
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled | Qt.ItemIsEditable
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.EditRole) -> bool:
+        """Set the element to the number typed in the cell."""
+        idx = self.element_of(index)
+        if idx < 0 or role != Qt.EditRole:
+            return False
+        try:
+            self.editor.fill_values(self.path, json.loads(value), idx, idx + 1)
+        except ValueError:
+            return False
+        return True
+
+
+class ArrayView(QTableView):
+    """Chunked view of the numeric list. Ctrl+V pastes column at the current cell."""
+
+    def __init__(self, editor, line_no: int, n_col: int = 10) -> None:
+        """."""
+        super().__init__(editor)
+        self.setWindowFlags(Qt.Tool)
+        self.setWindowTitle(json_pointer(editor.line_infos.path(line_no)) or "/")
+        self.setModel(ArrayTableModel(editor, line_no, n_col))
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 4)
+        self.resize(720, 480)
+
+    def keyPressEvent(self, e: QKeyEvent):
+        """Override Qt method."""
+        model = self.model()
+        idx = model.element_of(self.currentIndex())
+        if e.matches(QKeySequence.Paste) and idx >= 0:
+            try:
+                model.editor.paste_column(
+                    model.path, QApplication.clipboard().text(), idx
+                )
+            except ValueError:
+                pass
+        else:
+            super().keyPressEvent(e)
+
+
+def delete_when_done(obj: QObject, future: Future):
+    """Delete obj in its thread when the work of future is finished or cancelled.
+
+    obj is not deleted while the worker emits its signals.
+    """
+
+    def delete_later(_):
+        try:
+            obj.deleteLater()
+        except RuntimeError:  # Deleted with its parent.
+            pass
+
+    future.add_done_callback(delete_later)
+
+
+class DocumentLoader(QObject):
+    """Parse, format and index json on worker thread.
+
+    Signals are emitted from the worker thread, so the connected slots of objects
+    living in GUI thread are called in GUI thread. The loader is deleted when
+    loading is finished or cancelled.
+    """
+
+    progress = pyqtSignal(str, int)  # stage, number of lines indexed
+    loaded = pyqtSignal(object)  # ContainerLineInfo
+    failed = pyqtSignal(object)  # Exception
+
+    _executor: Optional[Executor] = None
+
+    @classmethod
+    def shared_executor(cls) -> Executor:
+        """Return the thread pool shared by loaders."""
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(thread_name_prefix="json_loader")
+        return cls._executor
+
+    def __init__(
+        self,
+        json_str: str,
+        key_val_list,
+        parent=None,
+        cache: Optional[DocumentCache] = None,
+    ) -> None:
+        """Document is taken from or kept in cache if it is given."""
         super().__init__(parent)
-        json_lexer = QsciLexerJSON(self)
-
-        # Dark Color setting
-        default_c = "#c0c9e9"
-        json_lexer.setDefaultPaper(QColor("#1a1b26"))
-        json_lexer.setColor(QColor(default_c), 0)  # Default
-        json_lexer.setColor(QColor("#e39d64"), 1)  # Number
-        json_lexer.setColor(QColor("#9ece6a"), 2)  # String
-        json_lexer.setColor(QColor(default_c), 3)  # Unclosed String
-        json_lexer.setColor(QColor("#7aa2f7"), 4)  # Property
-        json_lexer.setColor(QColor(default_c), 5)  # EscapeSequnece
-        json_lexer.setColor(QColor(default_c), 6)  # CommentLine
-        json_lexer.setColor(QColor(default_c), 7)  # CommentBlock
-        json_lexer.setColor(QColor(default_c), 8)  # Operator (parenthesis)
-        json_lexer.setColor(QColor(default_c), 9)  # IRI
-        json_lexer.setColor(QColor(default_c), 10)  # IRICompact
-        json_lexer.setColor(QColor(default_c), 11)  # Keyword
-        json_lexer.setColor(QColor(default_c), 12)  # KeywordLD
-        json_lexer.setPaper(QColor("#db4b4b"), 13)  # Error
-        json_lexer.setColor(QColor("#4bdbdb"), 13)  # Error
-        json_lexer.setFont(QFont("Courier new", 12))
+        self.json_str = json_str
+        self.key_val_list = key_val_list
+        self.cache = cache
+        self.cancelled = threading.Event()
+        self.future: Optional[Future] = None
+
+    def start(self, executor: Optional[Executor] = None):
+        """Start loading on executor(shared thread pool if None)."""
+        if executor is None:
+            executor = self.shared_executor()
+        self.future = executor.submit(self.run)
+        delete_when_done(self, self.future)
+
+    def cancel(self):
+        """Cancel loading. loaded is not emitted after this."""
+        self.cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def run(self):
+        """Load json. This is called in worker thread."""
+        try:
+            if self.cache is None:
+                line_infos = ContainerLineInfo(
+                    self.json_str, self.key_val_list, self.report_progress
+                )
+            else:
+                line_infos = self.cache.get(
+                    self.json_str, self.key_val_list, self.report_progress
+                )
+        except LoadCancelled:
+            return
+        except Exception as e:  # Reported to GUI thread.
+            self.failed.emit(e)
+            return
+        if not self.cancelled.is_set():
+            self.loaded.emit(line_infos)
+
+    def report_progress(self, stage: str, n_line: int):
+        """Emit progress, and stop if loading is cancelled."""
+        if self.cancelled.is_set():
+            raise LoadCancelled()
+        self.progress.emit(stage, n_line)
+
 
+class SearchIndexBuilder(QObject):
+    """Build SearchIndex of the lines of editor on worker thread.
+
+    The lines are taken when the builder is created, and the lines modified after
+    that are kept in modified to be indexed again. The lines are dropped when the
+    index is built, and the builder is deleted when its work is finished or the
+    document is replaced.
+    """
+
+    built = pyqtSignal(object)  # SearchIndex
+
+    def __init__(self, editor: "JsonValueEditor") -> None:
+        """."""
+        super().__init__(editor)
+        self.line_infos = editor.line_infos
+        self.get_line = editor.text
+        self.lines: Optional[List[str]] = editor.text().split("\n")
+        self.modified: List[int] = []
+        self.future: Optional[Future] = None
+
+    def start(self, executor: Optional[Executor] = None):
+        """Start building on executor(thread pool of loaders if None)."""
+        if executor is None:
+            executor = DocumentLoader.shared_executor()
+        self.future = executor.submit(self.run)
+        delete_when_done(self, self.future)
+
+    def run(self):
+        """Build the index. This is called in worker thread."""
+        search_index = SearchIndex(self.line_infos, self.get_line, self.lines)
+        self.lines = None
+        self.built.emit(search_index)
+
+
+@perf.instrument
+class FileReloader(QObject):
+    """Reload the file of editor when it is changed on disk.
+
+    The delta is found on the thread of watcher, and only the changed values are
+    written into editor, as one undo action. The lines edited in editor are kept,
+    and the values changed both on disk and in editor are emitted as conflicts.
+    If the structure is changed, the editor shows the new document with the edits
+    written again, and the cursor stays on its path.
+    """
+
+    delta_ready = pyqtSignal(object)  # Delta, emitted on the thread of watcher.
+    reloaded = pyqtSignal(list)  # Conflicts
+    reload_failed = pyqtSignal(object)  # Exception
+
+    def __init__(
+        self,
+        editor: "JsonValueEditor",
+        path: str,
+        watcher: Optional[FileWatcher] = None,
+    ) -> None:
+        """The editor shows the file of path now."""
+        super().__init__(editor)
+        self.editor = editor
+        self.path = path
+        self.state = ReloadState(editor.line_infos)
+        self.lines_edited: Set[int] = set()
+        self.conflicts: List[Conflict] = []
+        self.applying = False
+        editor.value_modified.connect(self.on_value_modified)
+        editor.loaded.connect(self.on_loaded)
+        self.delta_ready.connect(perf.slot(self.apply))
+        self.watcher = watcher or FileWatcher.shared()
+        self.watcher.watch(path, self.check)
+
+    def close(self):
+        """Stop watching."""
+        self.watcher.unwatch(self.path, self.check)
+        self.editor.value_modified.disconnect(self.on_value_modified)
+        self.editor.loaded.disconnect(self.on_loaded)
+
+    def on_value_modified(self, line_no: int):
+        """Remember the line edited in editor."""
+        if not self.applying:
+            self.lines_edited.add(line_no)
+
+    def on_loaded(self):
+        """Base on the document loaded by others."""
+        if not self.applying:
+            self.state = ReloadState(self.editor.line_infos)
+            self.lines_edited = set()
+
+    def check(self, path: Optional[str] = None):
+        """Read the file and emit the delta. This is called on watcher thread."""
+        state = self.state
+        try:
+            with open(self.path, "r", encoding="utf-8") as fp:
+                delta = state.delta(fp.read())
+        except (OSError, ValueError) as error:  # Being written, or invalid.
+            self.reload_failed.emit(error)
+            return
+        if delta is not None:
+            self.delta_ready.emit((state, delta))
+
+    @perf.hot_path()
+    def apply(self, state_and_delta: Tuple[ReloadState, Delta]):
+        """Write the delta into editor."""
+        state, delta = state_and_delta
+        if state is not self.state or delta.version != state.version:
+            DocumentLoader.shared_executor().submit(self.check)  # Stale
+            return
+        editor = self.editor
+        get_line = editor.text
+        if delta.line_infos is None:
+            writes, conflicts = state.resolve(delta, get_line)
+        else:
+            edits = state.local_edits(self.lines_edited, get_line)
+            writes, conflicts = self._install(delta, edits)
+        # Values of disk are not edits, but the edits written again are.
+        self.applying = delta.line_infos is None
+        try:
+            editor.replace_spans(
+                [
+                    (line_no, *editor.pos_of_value(line_no), text)
+                    for line_no, text in writes
+                ]
+            )
+        finally:
+            self.applying = False
+        self.conflicts = conflicts
+        self.reloaded.emit(conflicts)
+
+    def _install(
+        self, delta: Delta, edits: Dict[JsonPath, Tuple[str, str]]
+    ) -> Tuple[List[Tuple[int, str]], List[Conflict]]:
+        """Show the new document, keeping the view on the paths of cursor."""
+        editor = self.editor
+        line_infos = editor.line_infos
+        line_cursor, col_cursor = editor.getCursorPosition()
+        line_first = editor.firstVisibleLine()
+        path_cursor = line_infos.path(min(line_cursor, len(line_infos) - 1))
+        path_first = line_infos.path(min(line_first, len(line_infos) - 1))
+
+        self.applying = True
+        try:
+            editor.install_line_infos(delta.line_infos)
+        finally:
+            self.applying = False
+        self.state = ReloadState(delta.line_infos, delta.lines)
+        self.lines_edited = set()
+        writes, conflicts = self.state.merge_edits(edits)
+
+        new = delta.line_infos
+        lines = []
+        for path, line_no in ((path_cursor, line_cursor), (path_first, line_first)):
+            try:
+                lines.append(new.line_of_path(path))
+            except KeyError:
+                lines.append(min(line_no, len(new) - 1))
+        editor.setFirstVisibleLine(lines[1])
+        editor.setCursorPosition(lines[0], col_cursor)
+        return writes, conflicts
+
+
+@perf.instrument
+class JsonValueEditor(QsciScintilla):
+    """.
+
+    If load_async is True, json is loaded on worker thread(executor or the thread
+    pool shared by editors) and the editor is read-only until loaded is emitted.
+
+    If array_threshold is given and NumPy is available, numeric lists with at least
+    array_threshold elements are held as NumericArray for the bulk operations, and
+    Ctrl+E shows the list in rows of ArrayView.
+
+    If cache is given, the editor attaches to the document cached by another editor
+    without loading, and the document loaded is kept in cache.
+
+    Ctrl+F shows SearchPanel, and the search index is built on worker thread at the
+    first search and updated for the modified values.
+
+    Colours and font are taken from theme(shared_theme if None). unload and load
+    reuse the editor for another document, see EditorPool.
+
+    watch_file reloads the file changed on disk without losing the edits, see
+    FileReloader.
+
+    Every modified value is validated again by its kind and the schema of
+    set_schema, and the invalid values are underlined by INDICATOR_INVALID.
+    """
+
+    INDICATOR_INVALID = 10
+
+    loaded = pyqtSignal()
+    load_progress = pyqtSignal(str, int)  # stage, number of lines indexed
+    load_failed = pyqtSignal(object)  # Exception
+    value_modified = pyqtSignal(int)  # line_no, emitted after its span is updated.
+    search_index_ready = pyqtSignal()
+
+    def __init__(
+        self,
+        json_str: str,
+        parent=None,
+        key_val_list={},
+        load_async: bool = False,
+        executor: Optional[Executor] = None,
+        array_threshold: Optional[int] = None,
+        cache: Optional[DocumentCache] = None,
+        theme: Optional[Theme] = None,
+    ):
+        """."""
+        super().__init__(parent)
+        self.theme = theme = theme or shared_theme()
         self.setCaretLineVisible(True)
-        self.setCaretForegroundColor(QColor("#aaaaaa"))
+        self.setCaretForegroundColor(theme.caret)
         self.setCaretWidth(2)
-        self.setCaretLineBackgroundColor(QColor("#272727"))
+        self.setCaretLineBackgroundColor(theme.caret_line)
         # Color setting End
 
         self.setMargins(0)
-        self.setLexer(json_lexer)
-        self.line_infos = ContainerLineInfo(json_str, key_val_list)
-        self.setText(self.line_infos.json_str)
+        self.line_infos = ContainerLineInfo("{}", {})  # Until json_str is loaded.
+        self.setLexer(self.create_lexer())
+        self.span_update_suspended = False
+        self.SCN_MODIFIED.connect(perf.slot(self.on_modified))
+        self.obj_cached = None  # Snapshot of to_dict.
+        if array_threshold is not None and not numpy_available():
+            array_threshold = None
+        self.array_threshold = array_threshold
+        self.arrays: Dict[int, NumericArray] = {}  # line_no: array of numeric list
+        self.compare_session: Optional["CompareSession"] = None
+        self.search_index: Optional[SearchIndex] = None
+        self.index_builder: Optional[SearchIndexBuilder] = None
+        self.search_panel: Optional["SearchPanel"] = None
+        self.file_reloader: Optional[FileReloader] = None
+        self.value_modified.connect(self.update_search_index)
+        self.schema: Optional[PathPatternIndex] = None  # Compiled by set_schema
+        self.validation = SchemaValidation(self.line_infos)
+        self.indicatorDefine(QsciScintilla.SquiggleIndicator, self.INDICATOR_INVALID)
+        self.setIndicatorForegroundColor(QColor("#db4b4b"), self.INDICATOR_INVALID)
+        self.value_modified.connect(self.validate_value)
+        # line_no and columns of the text edited while value_modified is emitted.
+        self.modified_cols: Optional[Tuple[int, int, int]] = None
 
         self.mouse_clicked = False
 
         # selection widget
         self.selection_widget = SelectionWidget(self, parent)
 
+        self.loader: Optional[DocumentLoader] = None
+        self.load(json_str, key_val_list, load_async, executor, cache)
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        parent=None,
+        key_val_list={},
+        index_cache: Optional[IndexCache] = None,
+        watch: bool = False,
+    ) -> "JsonValueEditor":
+        """Return editor of the json file.
+
+        If index_cache is given, the formatted text and line index are loaded from
+        its entry of the file, and the entry is written if it is not valid. If watch
+        is True, the file is reloaded when it is changed on disk.
+        """
+        editor = cls("{}", parent, key_val_list)
+        if index_cache is None:
+            with open(path, "r", encoding="utf-8") as fp:
+                line_infos = ContainerLineInfo(fp.read(), key_val_list)
+        else:
+            line_infos = index_cache.open(path, key_val_list)
+        editor.install_line_infos(line_infos)
+        if watch:
+            editor.watch_file(path)
+        return editor
+
+    def create_lexer(self) -> QsciLexer:
+        """Return the lexer of editor, which styles the lines on screen."""
+        return LineIndexLexer(self, self.theme)
+
+    def load(
+        self,
+        json_str: str,
+        key_val_list={},
+        load_async: bool = False,
+        executor: Optional[Executor] = None,
+        cache: Optional[DocumentCache] = None,
+    ):
+        """Show json_str. The arguments are the same as the constructor."""
+        self.cancel_load()
+        line_infos = None if cache is None else cache.find(json_str, key_val_list)
+        if line_infos is not None:
+            self.install_line_infos(line_infos)
+        elif load_async:
+            self.setReadOnly(True)
+            self.loader = DocumentLoader(json_str, key_val_list, self, cache)
+            self.loader.progress.connect(self.load_progress)
+            self.loader.loaded.connect(self.on_loaded)
+            self.loader.failed.connect(self.on_load_failed)
+            self.loader.start(executor)
+        elif cache is not None:
+            self.install_line_infos(cache.get(json_str, key_val_list))
+        else:
+            self.install_line_infos(ContainerLineInfo(json_str, key_val_list))
+
+    def watch_file(
+        self, path: str, watcher: Optional[FileWatcher] = None
+    ) -> FileReloader:
+        """Reload the file of path, which the editor shows, when it is changed.
+
+        watcher is the shared FileWatcher if None.
+        """
+        self.unwatch_file()
+        self.file_reloader = FileReloader(self, path, watcher)
+        return self.file_reloader
+
+    def unwatch_file(self):
+        """Stop reloading the file."""
+        if self.file_reloader is not None:
+            self.file_reloader.close()
+            self.file_reloader.deleteLater()
+            self.file_reloader = None
+
+    def unload(self):
+        """Leave compare mode, hide the popups and clear the document.
+
+        The slots connected by the owner of editor are not disconnected.
+        """
+        self.cancel_load()
+        self.unwatch_file()
+        if self.compare_session is not None:
+            self.compare_session.close()
+        if self.search_panel is not None:
+            self.search_panel.hide()
+        self.selection_widget.hide()
+        self.schema = None
+        self.install_line_infos(ContainerLineInfo("{}", {}))
+
+    def reparent(self, parent):
+        """Move editor and its selection widget to parent."""
+        self.setParent(parent)
+        widget = self.selection_widget
+        widget.setParent(parent, widget.windowFlags())
+        widget.parent = parent
+        widget.hide()
+
+    def install_line_infos(self, line_infos: ContainerLineInfo):
+        """Show the json of line_infos and make the editor editable."""
+        self.loader = None
+        self.line_infos = line_infos
+        self.obj_cached = None
+        self.arrays = {}
+        self.search_index = self.index_builder = None
+        self.span_update_suspended = True
+        try:
+            self.setText(line_infos.json_str)
+        finally:
+            self.span_update_suspended = False
+        self.SendScintilla(self.SCI_EMPTYUNDOBUFFER)  # Loading can not be undone.
+        self.setReadOnly(False)
+        self.validate_document()
+        self.loaded.emit()
+
+    def on_loaded(self, line_infos: ContainerLineInfo):
+        """Install the result of loader unless loading is cancelled."""
+        if self.loader is not None and not self.loader.cancelled.is_set():
+            self.install_line_infos(line_infos)
+
+    def on_load_failed(self, error: Exception):
+        """Forward the error of loader."""
+        self.loader = None
+        self.load_failed.emit(error)
+
+    def is_loading(self) -> bool:
+        """Return True if json is being loaded on worker thread."""
+        return self.loader is not None
+
+    def cancel_load(self):
+        """Cancel loading. The editor stays empty and read-only."""
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+
+    def build_search_index(self, executor: Optional[Executor] = None):
+        """Build the search index on worker thread if it is not built or building.
+
+        search_index_ready is emitted when the index is ready.
+        """
+        if self.search_index is None and self.index_builder is None:
+            if self.is_loading():
+                return
+            self.index_builder = SearchIndexBuilder(self)
+            self.index_builder.built.connect(self.on_search_index_built)
+            self.index_builder.start(executor)
+
+    def on_search_index_built(self, search_index: SearchIndex):
+        """Install the index, and index the values modified while it is built."""
+        builder = self.index_builder
+        if builder is None or search_index.line_infos is not self.line_infos:
+            return  # Document is replaced.
+        self.index_builder = None
+        for line_no in builder.modified:
+            search_index.update_value(line_no)
+        self.search_index = search_index
+        self.search_index_ready.emit()
+
+    def update_search_index(self, line_no: int):
+        """Index the modified value again."""
+        if self.search_index is not None:
+            self.search_index.update_value(line_no)
+        elif self.index_builder is not None:
+            self.index_builder.modified.append(line_no)
+
+    def set_schema(self, schema: Optional[dict]):
+        """Validate the values by schema, the subset of JSON Schema in json_schema.
+
+        ValueError is raised if schema can not be compiled. None removes the schema.
+        The values edited or invalid before are validated again, as they may be
+        invalid by their kinds out of schema.
+        """
+        self.schema = None if schema is None else compile_schema(schema)
+        lines_again = set(self.validation.errors) | self.line_infos.dirty_lines
+        line_last = self.lines() - 1
+        self.clearIndicatorRange(
+            0, 0, line_last, self.lineLength(line_last), self.INDICATOR_INVALID
+        )
+        self.validate_document()
+        for line_no in sorted(lines_again - set(self.validation.errors)):
+            self.validate_value(line_no)
+
+    def validate_document(self):
+        """Validate the values which have the schema and underline the errors.
+
+        The values out of schema came from parsed json, so they are valid.
+        """
+        self.validation = SchemaValidation(self.line_infos, self.schema)
+        for line_no in self.validation.validate_all(self.text):
+            self._underline_value(line_no)
+
+    def validate_value(self, line_no: int):
+        """Validate the modified value only, and update its underline.
+
+        A valid value without validator is not parsed on a keystroke: a string can
+        not be broken by the characters typed, and only the edited elements of a
+        numeric list are checked.
+        """
+        validation = self.validation
+        if line_no not in validation.validators and line_no not in validation.errors:
+            kind = self.line_infos.kinds[line_no]
+            if kind == ValueKind.STR:
+                return
+            edit = self.modified_cols
+            if kind == ValueKind.NUM_LIST and edit is not None and edit[0] == line_no:
+                elements = self.elements_of(line_no)
+                if len(elements) > 1:  # "[]" is valid, "" as an element is not.
+                    pos_value = self.pos_of_value(line_no)
+                    texts = []
+                    for idx in range(
+                        elements.element_at(edit[1]), elements.element_at(edit[2]) + 1
+                    ):
+                        start, end = elements.span(idx, *pos_value)
+                        texts.append(
+                            self.text(
+                                self.positionFromLineIndex(line_no, start),
+                                self.positionFromLineIndex(line_no, end),
+                            )
+                        )
+                    if validation.validate_elements(line_no, texts) is not None:
+                        self._underline_value(line_no)
+                    return
+        self.clearIndicatorRange(
+            line_no, 0, line_no, self.lineLength(line_no), self.INDICATOR_INVALID
+        )
+        if self.validation.validate_line(line_no, self.text(line_no)) is not None:
+            self._underline_value(line_no)
+
+    def _underline_value(self, line_no: int):
+        """Underline the value of the line, or the place of empty value."""
+        start, end = self.pos_of_value(line_no)
+        self.fillIndicatorRange(
+            line_no, start, line_no, max(end, start + 1), self.INDICATOR_INVALID
+        )
+
+    def is_valid(self) -> bool:
+        """Return True if no value has an error. The errors are not validated again."""
+        return self.validation.is_valid()
+
+    def validation_errors(self) -> Dict[JsonPath, str]:
+        """Return the reasons of the invalid values by their paths."""
+        path = self.line_infos.path
+        return {
+            path(line_no): error
+            for line_no, error in sorted(self.validation.errors.items())
+        }
+
+    def show_search_panel(self) -> "SearchPanel":
+        """Show the search panel of editor(Ctrl+F)."""
+        if self.search_panel is None:
+            self.search_panel = SearchPanel(self)
+        self.search_panel.show_panel()
+        return self.search_panel
+
+    def go_to_line(self, line_no: int):
+        """Select the value of the line, or put the cursor on the container."""
+        self.ensureLineVisible(line_no)
+        if self.line_infos.kinds[line_no] == ValueKind.NONE:
+            self.set_cursor_pos(line_no, 0)
+        else:
+            start, end = self.pos_of_value(line_no)
+            self.setSelection(line_no, start, line_no, end)
+
+    @perf.hot_path()
+    def set_values(self, values: Dict[JsonPath, Any]):
+        """Set values of paths as one undo action.
+
+        All values are checked against the kind, allowed characters and value list
+        of their lines before the document is modified, and ValueError(KeyError for
+        unknown path) is raised if any of them does not fit. Painting and the
+        modification notifications of Scintilla are suspended while the values are
+        replaced, and the spans are fixed in the same pass.
+        """
+        line_infos = self.line_infos
+        replacements = []
+        for path, value in values.items():
+            line_no = line_infos.line_of_path(tuple(path))
+            text = line_infos.text_of_value(line_no, value)
+            replacements.append((line_no, *line_infos.pos_of_value(line_no), text))
+        self.replace_spans(replacements)
+
+    def replace_spans(
+        self,
+        replacements: List[Tuple[int, int, int, str]],
+        arrays: Optional[Dict[int, NumericArray]] = None,
+    ):
+        """Replace the columns of (line_no, start, end, text) as one undo action.
+
+        Painting and the modification notifications of Scintilla are suspended while
+        the text is replaced, and the spans are fixed in the same pass. arrays(line_no:
+        array) are held for the lines whose new text is the text of array before
+        value_modified is emitted, so they are not read from the text again.
+        """
+        line_infos = self.line_infos
+        mod_event_mask = self.SendScintilla(self.SCI_GETMODEVENTMASK)
+        self.setUpdatesEnabled(False)
+        self.SendScintilla(self.SCI_SETMODEVENTMASK, 0)
+        self.beginUndoAction()
+        try:
+            for line_no, start, end, text in replacements:
+                self.SendScintilla(
+                    self.SCI_SETTARGETRANGE,
+                    self.positionFromLineIndex(line_no, start),
+                    self.positionFromLineIndex(line_no, end),
+                )
+                text_bytes = text.encode("utf-8")
+                self.SendScintilla(self.SCI_REPLACETARGET, len(text_bytes), text_bytes)
+                line_infos.update_span(line_no, start, len(text) - (end - start))
+                line_infos.invalidate_elements(line_no)
+                self.arrays.pop(line_no, None)
+        finally:
+            self.endUndoAction()
+            self.SendScintilla(self.SCI_SETMODEVENTMASK, mod_event_mask)
+            self.setUpdatesEnabled(True)
+        if arrays:
+            self.arrays.update(arrays)
+        if replacements:
+            self.textChanged.emit()
+            for line_no, _, _, _ in replacements:
+                self.value_modified.emit(line_no)
+
+    def array_of(self, line_no: int) -> Optional[NumericArray]:
+        """Return NumericArray of the numeric list in the line.
+
+        None is returned if the array mode is off, or the line is not a numeric list
+        of array_threshold elements at least.
+        """
+        if (
+            self.array_threshold is None
+            or self.line_infos.kinds[line_no] != ValueKind.NUM_LIST
+        ):
+            return None
+        array = self.arrays.get(line_no, None)
+        if array is None:
+            start, end = self.pos_of_value(line_no)
+            text = self.text(line_no)[start:end]
+            if text.count(",") + 1 < self.array_threshold:
+                return None
+            try:
+                array = NumericArray.from_text(text)
+            except ValueError:  # Being typed.
+                return None
+            self.arrays[line_no] = array
+        return array
+
+    @perf.hot_path()
+    def apply_to_array(
+        self, path: JsonPath, operation: Callable[[NumericArray], Tuple[int, int]]
+    ):
+        """Apply operation of NumericArray and replace the text of elements modified.
+
+        operation returns the range of elements modified. ValueError is raised if
+        the value of path is not held as NumericArray.
+        """
+        line_no = self.line_infos.line_of_path(tuple(path))
+        array = self.array_of(line_no)
+        if array is None:
+            raise ValueError("{} is not held as numeric array".format(path))
+        start, stop = operation(array)
+        if start == stop:
+            return
+
+        col_start, col_end = pos_value = self.pos_of_value(line_no)
+        if start > 0 or stop < len(array):
+            elements = self.elements_of(line_no)
+            col_start = elements.span(start, *pos_value)[0]
+            col_end = elements.span(stop - 1, *pos_value)[1]
+        text = (" " if start > 0 else "") + array.format(start, stop)
+        self.replace_spans([(line_no, col_start, col_end, text)], {line_no: array})
+
+    def scale_values(
+        self, path: JsonPath, factor: Number, start: int = 0, stop: Optional[int] = None
+    ):
+        """Multiply the elements of numeric list in [start, stop) by factor."""
+        self.apply_to_array(path, lambda array: array.scale(factor, start, stop))
+
+    def offset_values(
+        self, path: JsonPath, delta: Number, start: int = 0, stop: Optional[int] = None
+    ):
+        """Add delta to the elements of numeric list in [start, stop)."""
+        self.apply_to_array(path, lambda array: array.offset(delta, start, stop))
+
+    def fill_values(
+        self, path: JsonPath, value: Number, start: int = 0, stop: Optional[int] = None
+    ):
+        """Set the elements of numeric list in [start, stop) to value."""
+        self.apply_to_array(path, lambda array: array.fill(value, start, stop))
+
+    def paste_column(
+        self, path: JsonPath, column: Union[str, List[Number]], start: int = 0
+    ):
+        """Set the elements of numeric list from start to the numbers of column.
+
+        column can be the text of numbers in lines copied from spreadsheet.
+        """
+        self.apply_to_array(path, lambda array: array.paste_column(column, start))
+
+    def show_array_view(self, line_no: int) -> Optional[ArrayView]:
+        """Show the numeric list of the line in ArrayView."""
+        if self.array_of(line_no) is None:
+            return None
+        view = ArrayView(self, line_no)
+        view.show()
+        return view
+
+    @staticmethod
+    def perf_stats() -> Dict[str, Dict]:
+        """Return the stats of hot paths collected while perf is enabled.
+
+        Instrumentation is enabled by perf.enable() or JSON_VALUE_EDITOR_PERF=1.
+        """
+        return perf.stats()
+
+    @perf.hot_path()
+    def changed_values(self) -> Dict[JsonPath, Any]:
+        """Return {path: value} of values modified since the last to_dict.
+
+        Only the modified values are parsed. ValueError is raised if a modified
+        value is not valid json.
+        """
+        line_infos = self.line_infos
+        changed = {}
+        for line_no in sorted(line_infos.dirty_lines):
+            if line_infos.kinds[line_no] == ValueKind.NONE:
+                continue
+            literal = line_infos.literal_of_value(line_no, self.text(line_no))
+            changed[line_infos.path(line_no)] = json.loads(literal)
+        return changed
+
+    def json_patch(self) -> List[dict]:
+        """Return json patch(RFC 6902) of values modified since the last to_dict."""
+        return [
+            {"op": "replace", "path": json_pointer(path), "value": value}
+            for path, value in self.changed_values().items()
+        ]
+
+    @perf.hot_path()
     def to_dict(self) -> dict:
-        """To dict."""
-        return json.loads(self.text())
+        """To dict.
+
+        The document is parsed only at the first call. After that, the modified
+        values are applied to the cached object which is returned, so do not modify
+        the returned object.
+        """
+        if self.obj_cached is None:
+            self.obj_cached = json.loads(self.text())
+        else:
+            for path, value in self.changed_values().items():
+                self.obj_cached = set_by_path(self.obj_cached, path, value)
+        self.line_infos.dirty_lines.clear()
+        return self.obj_cached
 
     def start_pos_of_value(self, line_no: int) -> int:
         """Return the starting position of Value in the line."""
@@ -193,13 +1159,45 @@ class JsonValueEditor(QsciScintilla):
 
     def end_pos_of_value(self, line_no: int) -> int:
         """Return the ending position of Value in the line."""
-        line = self.text(line_no)
-        return self.line_infos.end_pos_of_value(line_no, line)
+        return self.line_infos.end_pos_of_value(line_no)
 
     def pos_of_value(self, line_no: int) -> Tuple[int, int]:
         """Return the starting, ending position of Value in the line."""
-        line = self.text(line_no)
-        return self.line_infos.pos_of_value(line_no, line)
+        return self.line_infos.pos_of_value(line_no)
+
+    @perf.hot_path()
+    def on_modified(self, position: int, mod_type: int, text, length: int, *args):
+        """Update the span of value by the modification of Scintilla."""
+        if self.span_update_suspended:
+            return
+        if not mod_type & (self.SC_MOD_INSERTTEXT | self.SC_MOD_DELETETEXT):
+            return
+        # This editor does not insert line break, so only one line is modified.
+        line_no, pos_col = self.lineIndexFromPosition(position)
+        self.arrays.pop(line_no, None)
+        if text is None or b"," in text:  # Elements of list are changed.
+            self.line_infos.invalidate_elements(line_no)
+        delta = len(text.decode("utf-8")) if text is not None else length
+        if mod_type & self.SC_MOD_DELETETEXT:
+            delta = -delta
+        self.line_infos.update_span(line_no, pos_col, delta)
+        self.modified_cols = (line_no, pos_col, pos_col + max(delta, 0))
+        self.value_modified.emit(line_no)
+        self.modified_cols = None
+
+    def elements_of(self, line_no: int) -> ElementOffsets:
+        """Return the offsets of elements of the NUM_LIST line."""
+        return self.line_infos.elements_of(line_no, self.text)
+
+    def go_to_element(self, line_no: int, idx: int):
+        """Select idx-th element of the NUM_LIST line. idx is clipped."""
+        elements = self.elements_of(line_no)
+        idx = min(max(idx, 0), len(elements) - 1)
+        start, end = elements.span(idx, *self.pos_of_value(line_no))
+        pos_start = self.positionFromLineIndex(line_no, start)
+        while start < end and self.SendScintilla(self.SCI_GETCHARAT, pos_start) == 32:
+            start, pos_start = start + 1, pos_start + 1  # Skip spaces after comma.
+        self.setSelection(line_no, start, line_no, end)
 
     def get_cusor_pos_from_qmousepos(self, point: QPoint) -> Tuple[int, int]:
         """Convert position of mouse to position of cursor."""
@@ -217,6 +1215,7 @@ class JsonValueEditor(QsciScintilla):
 
         self.setCursorPosition(line_no, pos_col)
 
+    @perf.hot_path()
     def mousePressEvent(self, e: QMouseEvent) -> None:
         """Prevent select property of json."""
         line_no, pos_col = self.get_cusor_pos_from_qmousepos(e.pos())
@@ -228,6 +1227,7 @@ class JsonValueEditor(QsciScintilla):
         else:
             self.set_cursor_pos(line_no, pos_col)
 
+    @perf.hot_path()
     def mouseReleaseEvent(self, e: QMouseEvent) -> None:
         """Prevent select property of json."""
         self.mouse_clicked = False
@@ -236,6 +1236,7 @@ class JsonValueEditor(QsciScintilla):
         line_no, _ = self.get_cusor_pos_from_qmousepos(e.pos())
         self.selection_widget.show_at_line(line_no)
 
+    @perf.hot_path()
     def mouseDoubleClickEvent(self, e: QMouseEvent) -> None:
         """Prevent select property of json."""
         line_no, pos_col = self.get_cusor_pos_from_qmousepos(e.pos())
@@ -263,6 +1264,7 @@ class JsonValueEditor(QsciScintilla):
         else:
             return line[col_num - 1]
 
+    @perf.hot_path()
     def validate_cursor_pos(self):
         """Validate the cursor position."""
         line_no, pos_col = self.getCursorPosition()
@@ -272,6 +1274,7 @@ class JsonValueEditor(QsciScintilla):
         elif pos_col > end_col:
             self.setCursorPosition(line_no, end_col)
 
+    @perf.hot_path()
     def validate_selection(self):
         """Validate the selection."""
         line_no0, pos_sel_start, line_no1, pos_sel_end = self.getSelection()
@@ -298,25 +1301,26 @@ class JsonValueEditor(QsciScintilla):
             pos_sel_end_new, pos_sel_start_new = pos_sel_start_new, pos_sel_end_new
         self.setSelection(line_no, pos_sel_start_new, line_no, pos_sel_end_new)
 
-        # If Json value type is NUM_LIST and text_selected has comma, change selection.
-        val_type = self.line_infos[line_no].val_type
-        if val_type != ValueKind.NUM_LIST:
-            return
-
-        text_selected = self.selectedText()
-        if "," not in text_selected:
+        # If Json value type is NUM_LIST and selection has comma, change selection.
+        if self.line_infos.kinds[line_no] != ValueKind.NUM_LIST:
             return
 
         line_no, pos_cursor = self.getCursorPosition()
         line_no0, pos_sel_start, line_no1, pos_sel_end = self.getSelection()
-        line = self.text(line_no)
+        elements = self.elements_of(line_no)
+        idx_start = elements.element_at(pos_sel_start)
+        idx_end = elements.element_at(pos_sel_end)
+        if idx_start == idx_end:
+            return
+
         if pos_cursor == pos_sel_start:
-            pos_sel_start_new = line[:pos_sel_end].rfind(",") + 1
+            pos_sel_start_new = elements.comma(idx_end - 1) + 1
             self.setSelection(line_no, pos_sel_end, line_no, pos_sel_start_new)
         else:
-            pos_sel_end_new = line[pos_sel_start:].find(",") + pos_sel_start
+            pos_sel_end_new = elements.comma(idx_start)
             self.setSelection(line_no, pos_sel_start, line_no, pos_sel_end_new)
 
+    @perf.hot_path()
     def keyPressEvent(self, e: QKeyEvent) -> None:
         """Process key event."""
         line_no, _ = self.getCursorPosition()
@@ -330,6 +1334,13 @@ class JsonValueEditor(QsciScintilla):
             return
         if ctrl_only_pressed and key in (Qt.Key_Z, Qt.Key_Y, Qt.Key_C):  # shortcut
             super().keyPressEvent(e)
+        elif ctrl_only_pressed and key == Qt.Key_E:
+            self.show_array_view(line_no)
+        elif ctrl_only_pressed and key == Qt.Key_F:
+            self.show_search_panel()
+        elif key == Qt.Key_F8 and self.compare_session is not None:
+            backward = bool(e.modifiers() & Qt.ShiftModifier)
+            self.compare_session.go_next(self, backward)
         elif key in [
             Qt.Key_Left,
             Qt.Key_Right,
@@ -343,9 +1354,15 @@ class JsonValueEditor(QsciScintilla):
             super().keyPressEvent(e)
         elif val_list and key == Qt.Key_Tab:
             self.selection_widget.show_at_line(line_no)
+        elif key in (Qt.Key_Tab, Qt.Key_Backtab) and (
+            self.line_infos.kinds[line_no] == ValueKind.NUM_LIST
+        ):  # Next or previous element.
+            _, pos_col = self.getCursorPosition()
+            idx = self.elements_of(line_no).element_at(pos_col)
+            self.go_to_element(line_no, idx + (1 if key == Qt.Key_Tab else -1))
         elif self.hasSelectedText():
             if key_char in chars_allowed or key in (Qt.Key_Backspace, Qt.Key_Delete):
-                if set(self.selectedText()) <= set(chars_allowed):
+                if chars_allowed.contains_all(self.selectedText()):
                     super().keyPressEvent(e)
         elif key_char in chars_allowed:
             super().keyPressEvent(e)
@@ -366,6 +1383,430 @@ class JsonValueEditor(QsciScintilla):
             self.selection_widget.show_at_line(line_no_new)
 
 
+@perf.instrument
+class LazyJsonEditor(JsonValueEditor):
+    """Editor of the expanded part of LazyDocument.
+
+    Return(Enter) on the line of container expands or folds it. The values modified
+    in the editor are moved to the document before the lines are written again, so
+    undo history is reset when a container is expanded or folded.
+    """
+
+    def __init__(
+        self, document: Union[str, LazyDocument], parent=None, key_val_list={}
+    ):
+        """document is LazyDocument or the path of json file."""
+        if not isinstance(document, LazyDocument):
+            document = LazyDocument(document)
+        self.document = document
+        if not isinstance(key_val_list, PathPatternIndex):
+            key_val_list = PathPatternIndex(key_val_list)
+        super().__init__("{}", parent, key_val_list)
+        self.key_val_list = key_val_list
+        self.render()
+
+    def flush(self):
+        """Move the values modified in the editor to the document.
+
+        ValueError is raised if a modified value is not valid json.
+        """
+        line_infos = self.line_infos
+        for line_no in sorted(line_infos.dirty_lines):
+            if line_infos.kinds[line_no] == ValueKind.NONE:
+                continue
+            literal = line_infos.literal_of_value(line_no, self.text(line_no))
+            self.document.set_literal(line_infos.path(line_no), literal)
+        line_infos.dirty_lines.clear()
+
+    @perf.hot_path()
+    def render(self):
+        """Write the lines of the expanded part of document again."""
+        self.flush()
+        line_no, pos_col = self.getCursorPosition()
+        first_line = self.firstVisibleLine()
+        self.install_line_infos(
+            ContainerLineInfo.from_lines(
+                self.document.iterlines_with_index(), self.key_val_list
+            )
+        )
+        line_no = min(line_no, self.lines() - 1)
+        self.setFirstVisibleLine(first_line)
+        self.setCursorPosition(line_no, min(pos_col, self.lineLength(line_no)))
+
+    def expand(self, path: JsonPath):
+        """Expand the container of path and its ancestors."""
+        self.flush()
+        self.document.expand(tuple(path))
+        self.render()
+
+    def collapse(self, path: JsonPath):
+        """Fold the container of path."""
+        self.flush()
+        self.document.collapse(tuple(path))
+        self.render()
+
+    def toggle(self, line_no: int):
+        """Expand or fold the container of the line."""
+        if self.line_infos.kinds[line_no] != ValueKind.NONE:
+            return
+        path = self.line_infos.path(line_no)
+        if path in self.document.expanded:
+            self.collapse(path)
+        elif self.document.is_expandable(path):
+            self.expand(path)
+
+    def save(self):
+        """Write the modified values to the file."""
+        self.flush()
+        self.document.save()
+
+    def to_dict(self) -> Any:
+        """Return the whole document parsed with the modified values."""
+        self.flush()
+        return self.document.value(())
+
+    def keyPressEvent(self, e: QKeyEvent) -> None:
+        """Process key event."""
+        if not self.mouse_clicked and e.key() in (Qt.Key_Return, Qt.Key_Enter):
+            line_no, _ = self.getCursorPosition()
+            try:
+                self.toggle(line_no)
+            except ValueError:
+                pass  # Modified value is not valid yet.
+            return
+        super().keyPressEvent(e)
+
+
+class EditorPool:
+    """Editors released by the closed panes, which are reused for new panes.
+
+    A reused editor keeps its Scintilla widget, lexer and popups, so only the
+    document is loaded. options are the keyword arguments of editor_class except
+    the document(array_threshold, theme, ...), which are the same for all editors
+    of pool.
+    """
+
+    def __init__(self, max_size: int = 16, editor_class=None, **options) -> None:
+        """."""
+        self.max_size = max_size
+        self.editor_class = editor_class or JsonValueEditor
+        self.options = options
+        self.editors: List[JsonValueEditor] = []
+        self.n_reused = self.n_created = 0
+
+    def __len__(self) -> int:
+        """Return the number of editors waiting for reuse."""
+        return len(self.editors)
+
+    def acquire(
+        self,
+        json_str: str,
+        parent=None,
+        key_val_list={},
+        load_async: bool = False,
+        executor: Optional[Executor] = None,
+        cache: Optional[DocumentCache] = None,
+    ) -> JsonValueEditor:
+        """Return editor of json_str, reused if one is released."""
+        if not self.editors:
+            self.n_created += 1
+            return self.editor_class(
+                json_str,
+                parent,
+                key_val_list,
+                load_async=load_async,
+                executor=executor,
+                cache=cache,
+                **self.options,
+            )
+        self.n_reused += 1
+        editor = self.editors.pop()
+        editor.reparent(parent)
+        editor.load(json_str, key_val_list, load_async, executor, cache)
+        if parent is not None:  # Shown with parent as the new editor is.
+            editor.show()
+        return editor
+
+    def release(self, editor: JsonValueEditor):
+        """Take editor of the closed pane. It is deleted if pool is full."""
+        editor.unload()
+        if len(self.editors) >= self.max_size:
+            editor.reparent(None)
+            editor.selection_widget.deleteLater()
+            editor.deleteLater()
+            return
+        editor.reparent(None)  # Hidden
+        self.editors.append(editor)
+
+    def clear(self):
+        """Delete the editors waiting for reuse."""
+        for editor in self.editors:
+            editor.selection_widget.deleteLater()
+            editor.deleteLater()
+        self.editors = []
+
+
+@perf.instrument
+class CompareSession(QObject):
+    """Compare mode of two editors.
+
+    Values which differ are highlighted in both editors, and the values which the
+    other editor has not are highlighted in lines. The highlight is updated for the
+    modified lines only. F8(Shift+F8) moves to the next(previous) difference, and
+    the other editor follows to the same path.
+    """
+
+    INDICATOR_CHANGED = 8
+    INDICATOR_MISSING = 9
+
+    def __init__(self, left: JsonValueEditor, right: JsonValueEditor):
+        """."""
+        super().__init__(left)
+        self.left, self.right = left, right
+        self.diff: Optional[StructuralDiff] = None
+        self.rebuild_slot = perf.slot(self.rebuild)
+        for editor in (left, right):
+            for indicator, color in (
+                (self.INDICATOR_CHANGED, "#e0af68"),
+                (self.INDICATOR_MISSING, "#9ece6a" if editor is right else "#db4b4b"),
+            ):
+                editor.indicatorDefine(QsciScintilla.StraightBoxIndicator, indicator)
+                editor.setIndicatorForegroundColor(QColor(color), indicator)
+                editor.SendScintilla(editor.SCI_INDICSETALPHA, indicator, 80)
+            editor.compare_session = self
+            editor.loaded.connect(self.rebuild_slot)
+        left.value_modified.connect(self.on_left_modified)
+        right.value_modified.connect(self.on_right_modified)
+        self.rebuild()
+
+    def close(self):
+        """Clear the highlight and leave compare mode."""
+        for editor in (self.left, self.right):
+            self._clear(editor, 0, editor.lines() - 1)
+            editor.compare_session = None
+            editor.loaded.disconnect(self.rebuild_slot)
+        self.left.value_modified.disconnect(self.on_left_modified)
+        self.right.value_modified.disconnect(self.on_right_modified)
+        self.diff = None
+
+    @perf.hot_path()
+    def rebuild(self):
+        """Compare the documents of editors and highlight all the differences."""
+        left, right = self.left, self.right
+        if left.is_loading() or right.is_loading():
+            return
+        self.diff = diff = StructuralDiff(
+            left.line_infos,
+            right.line_infos,
+            left.text,
+            right.text,
+            left.text().split("\n"),
+            right.text().split("\n"),
+        )
+        for editor in (left, right):
+            self._clear(editor, 0, editor.lines() - 1)
+        for line_left in diff.changed:
+            self._paint_pair(line_left, diff.pairs[line_left])
+        for editor, lines in ((left, diff.removed), (right, diff.added)):
+            for line_no in lines:
+                self._fill_lines(editor, line_no, self.INDICATOR_MISSING)
+
+    def _clear(self, editor: JsonValueEditor, line_from: int, line_to: int):
+        """Clear the highlight of the lines."""
+        for indicator in (self.INDICATOR_CHANGED, self.INDICATOR_MISSING):
+            editor.clearIndicatorRange(
+                line_from, 0, line_to, editor.lineLength(line_to), indicator
+            )
+
+    def _fill_lines(self, editor: JsonValueEditor, line_no: int, indicator: int):
+        """Highlight the lines of the value(container) of the line."""
+        line_end = end_line(editor.line_infos, line_no)
+        editor.fillIndicatorRange(
+            line_no, 0, line_end, editor.lineLength(line_end), indicator
+        )
+
+    def _paint_pair(self, line_left: int, line_right: int):
+        """Highlight the pair of lines by the state of diff."""
+        for editor, line_no in ((self.left, line_left), (self.right, line_right)):
+            self._clear(editor, line_no, line_no)
+            if line_left not in self.diff.changed:
+                continue
+            if editor.line_infos.kinds[line_no] == ValueKind.NONE:  # Container
+                self._fill_lines(editor, line_no, self.INDICATOR_CHANGED)
+            else:
+                start, end = editor.pos_of_value(line_no)
+                editor.fillIndicatorRange(
+                    line_no, start, line_no, end, self.INDICATOR_CHANGED
+                )
+
+    def on_left_modified(self, line_no: int):
+        """Compare the modified line of left again."""
+        if self.diff is not None and line_no in self.diff.pairs:
+            self.diff.update_left(line_no)
+            self._paint_pair(line_no, self.diff.pairs[line_no])
+
+    def on_right_modified(self, line_no: int):
+        """Compare the modified line of right again."""
+        if self.diff is not None and line_no in self.diff.pairs_right:
+            self.diff.update_right(line_no)
+            self._paint_pair(self.diff.pairs_right[line_no], line_no)
+
+    def go_next(self, editor: JsonValueEditor, backward: bool = False) -> int:
+        """Move to the next difference of editor, and return its line(-1 if none).
+
+        The other editor moves to the value of the same path if it has.
+        """
+        if self.diff is None:
+            return -1
+        is_left = editor is self.left
+        lines = self.diff.lines_of_left() if is_left else self.diff.lines_of_right()
+        line_no = next_line(lines, editor.getCursorPosition()[0], backward)
+        if line_no < 0:
+            return -1
+        other = self.right if is_left else self.left
+        for target, target_line in (
+            (editor, line_no),
+            (other, self.diff.partner(line_no, is_left)),
+        ):
+            if target_line >= 0:
+                target.go_to_line(target_line)
+        return line_no
+
+
+class SearchResultModel(QAbstractListModel):
+    """Lines of the result of query, which are taken from the index as viewed."""
+
+    N_FETCH = 256  # Lines taken at once.
+
+    def __init__(self, editor: JsonValueEditor) -> None:
+        """."""
+        super().__init__(editor)
+        self.editor = editor
+        self.lines: List[int] = []
+        self.results: Iterator[int] = iter(())
+        self.is_exhausted = True
+
+    def set_results(self, results):
+        """Show the lines of results, which are taken lazily."""
+        self.beginResetModel()
+        self.lines = []
+        self.results = iter(results)
+        self.is_exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        """Override Qt method."""
+        return 0 if parent.isValid() else len(self.lines)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        """Override Qt method."""
+        return not parent.isValid() and not self.is_exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Override Qt method."""
+        lines = list(islice(self.results, self.N_FETCH))
+        self.is_exhausted = len(lines) < self.N_FETCH
+        if lines:
+            row = len(self.lines)
+            self.beginInsertRows(QModelIndex(), row, row + len(lines) - 1)
+            self.lines.extend(lines)
+            self.endInsertRows()
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        """Override Qt method."""
+        line_no = self.lines[index.row()]
+        if role == Qt.UserRole:
+            return line_no
+        if role != Qt.DisplayRole:
+            return None
+        editor = self.editor
+        pointer = json_pointer(editor.line_infos.path(line_no))
+        if editor.line_infos.kinds[line_no] == ValueKind.NONE:
+            return "{}: {}".format(line_no + 1, pointer)
+        start, end = editor.pos_of_value(line_no)
+        value = editor.text(line_no)[start:end]
+        return "{}: {} = {}".format(line_no + 1, pointer, value)
+
+
+class SearchPanel(QWidget):
+    """Search of keys, paths and values of editor(see json_search for query).
+
+    Results are listed as the query is typed, and the value of the current result
+    is selected in editor. Return moves the focus to editor, and Escape hides the
+    panel.
+    """
+
+    def __init__(self, editor: JsonValueEditor) -> None:
+        """."""
+        super().__init__(editor, Qt.Tool)
+        self.editor = editor
+        self.setWindowTitle("Search")
+        self.query_edit = QLineEdit(self)
+        self.query_edit.setPlaceholderText('key, "key", ~fuzzy, path.*, =value, lo..hi')
+        self.result_view = QListView(self)
+        self.result_view.setUniformItemSizes(True)
+        self.model = SearchResultModel(editor)
+        self.result_view.setModel(self.model)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.addWidget(self.query_edit)
+        layout.addWidget(self.result_view)
+        self.resize(480, 320)
+
+        self.query_edit.textChanged.connect(self.search)
+        self.query_edit.returnPressed.connect(self.accept)
+        self.query_edit.installEventFilter(self)
+        self.result_view.selectionModel().currentChanged.connect(self.on_current)
+        self.result_view.activated.connect(self.accept)
+        editor.search_index_ready.connect(self.search)
+
+    def show_panel(self):
+        """Show the panel with the query selected, and build the index if needed."""
+        self.editor.build_search_index()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def search(self):
+        """List the results of query. Nothing is listed until the index is ready."""
+        search_index = self.editor.search_index
+        query = self.query_edit.text()
+        try:
+            results = search_index.search(query) if search_index is not None else []
+        except ValueError:  # Invalid path pattern being typed.
+            results = []
+        self.model.set_results(results)
+        if self.model.rowCount():
+            self.result_view.setCurrentIndex(self.model.index(0))
+
+    def on_current(self, index: QModelIndex):
+        """Select the value of the current result in editor."""
+        if index.isValid():
+            self.editor.go_to_line(index.data(Qt.UserRole))
+
+    def accept(self):
+        """Move the focus to editor at the current result."""
+        index = self.result_view.currentIndex()
+        if index.isValid():
+            self.editor.go_to_line(index.data(Qt.UserRole))
+            self.editor.setFocus()
+
+    def eventFilter(self, obj, e) -> bool:
+        """Move the current result by arrow keys in the query."""
+        if obj is self.query_edit and e.type() == QEvent.KeyPress:
+            if e.key() in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+                QApplication.sendEvent(self.result_view, e)
+                return True
+            if e.key() == Qt.Key_Escape:
+                self.hide()
+                self.editor.setFocus()
+                return True
+        return super().eventFilter(obj, e)
+
+
 class MainWindow(QMainWindow):
     """Mainwindow."""
 
@@ -390,16 +1831,35 @@ class MainWindow(QMainWindow):
         }
         super().__init__(parent)
         layout = QGridLayout()
-        layout.addWidget(JsonValueEditor(json_example, self, key_val_list), 0, 0)
-        layout.addWidget(JsonValueEditor(json_example, self, key_val_list), 0, 1)
-        layout.addWidget(JsonValueEditor(json_example, self, key_val_list), 1, 0)
-        layout.addWidget(JsonValueEditor(json_example, self, key_val_list), 1, 1)
+        self.document_cache = DocumentCache()  # Editors share one index.
+        self.editor_pool = EditorPool()  # Editors of closed panes are reused.
+        self.editors: List[JsonValueEditor] = []
+        for row, col in ((0, 0), (0, 1), (1, 0), (1, 1)):
+            editor = self.editor_pool.acquire(
+                json_example,
+                self,
+                key_val_list,
+                load_async=True,
+                cache=self.document_cache,
+            )
+            layout.addWidget(editor, row, col)
+            self.editors.append(editor)
+        self.compare_session: Optional[CompareSession] = None
+        QShortcut(QKeySequence("Ctrl+D"), self, self.toggle_compare)
 
         w = QWidget(self)
         w.setLayout(layout)
         self.setMinimumSize(800, 600)
         self.setCentralWidget(w)
 
+    def toggle_compare(self):
+        """Compare the editors of the first row(Ctrl+D)."""
+        if self.compare_session is None:
+            self.compare_session = CompareSession(*self.editors[:2])
+        else:
+            self.compare_session.close()
+            self.compare_session = None
+
 
 if __name__ == "__main__":
     app = QApplication.instance()
@@ -409,6 +1869,10 @@ if __name__ == "__main__":
         pass
 
     app.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
-    mainwindow = MainWindow(None)
+    if len(sys.argv) > 1:  # Large file is opened lazily.
+        mainwindow = LazyJsonEditor(sys.argv[1])
+        mainwindow.resize(800, 600)
+    else:
+        mainwindow = MainWindow(None)
     mainwindow.show()
     app.exec_()
@@ -0,0 +1,13 @@
+r"""Old path of json_core.value_kinds, which is the same module.
+
+:author: ok97465
+:Date created: 26.10.20 10:07:07
+"""
+# %% Import
+# Standard library imports
+import sys
+
+# Local imports
+from json_core import value_kinds
+
+sys.modules[__name__] = value_kinds